@@ -0,0 +1,87 @@
+from xml.etree import ElementTree
+import os
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+VARIAVEL_BACKEND = 'GERADOR_DOC_XML'
+BACKENDS = ('lxml', 'etree')
+
+
+def obter_backend_padrao():
+    """Obtém o backend de análise dos XSD definido no ambiente ou, na sua
+        ausência, o mais rápido disponível.
+
+    Returns:
+        str: 'lxml' ou 'etree'.
+    """
+    nome = os.environ.get(VARIAVEL_BACKEND)
+
+    if nome in BACKENDS and (nome == 'etree' or etree is not None):
+        return nome
+
+    return 'lxml' if etree is not None else 'etree'
+
+
+BACKEND = obter_backend_padrao()
+
+
+def validar_backend(nome):
+    """Verifica se um backend de análise dos XSD pode ser usado.
+
+    Args:
+        nome (str): 'lxml' ou 'etree'.
+
+    Raises:
+        Exception: Backend desconhecido ou lxml não instalado.
+    """
+    if nome not in BACKENDS:
+        raise Exception('Backend de análise desconhecido: {}'.format(nome))
+
+    if nome == 'lxml' and etree is None:
+        raise Exception('O backend lxml exige o pacote lxml instalado')
+
+
+def definir_backend(nome):
+    """Define o backend padrão de análise dos XSD do processo.
+
+    O backend também é registrado no ambiente, para que os processos criados
+    pelo pool usem o mesmo backend.
+
+    Args:
+        nome (str): 'lxml' ou 'etree'.
+
+    Raises:
+        Exception: Backend desconhecido ou lxml não instalado.
+    """
+    global BACKEND
+
+    validar_backend(nome)
+
+    BACKEND = nome
+    os.environ[VARIAVEL_BACKEND] = nome
+
+
+def analisar(caminho, backend=None):
+    """Analisa um arquivo XSD.
+
+    Com o lxml, os comentários e as instruções de processamento são
+    descartados, como no ElementTree, para que os filhos de cada elemento
+    sejam sempre elementos do XSD.
+
+    Args:
+        caminho (str): Caminho do arquivo.
+
+        backend (str, optional): 'lxml' ou 'etree'. Defaults to None, que
+            usa o backend padrão do processo.
+
+    Returns:
+        Element: Elemento raiz do XSD.
+    """
+    if (backend or BACKEND) == 'lxml':
+        return etree.parse(caminho, etree.XMLParser(
+            remove_comments=True, remove_pis=True)).getroot()
+
+    return ElementTree.parse(caminho).getroot()
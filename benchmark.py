@@ -0,0 +1,278 @@
+from corpus_sintetico import GeradorCorpus
+from esquema import ler_esquema
+from leiaute import Leiaute
+from links import GrafoLinks
+from regras import ler_catalogo
+from tabelas import gerar_tabelas
+from xsd_html import agrupar_referencias
+from xsd_html import escrever_regras
+from xsd_html import obter_caminho_tabelas
+import analise_xml
+import cinto_utilidades as cinto
+
+import argparse
+import json
+import os
+import tempfile
+from time import perf_counter
+
+FASES = (
+    ('analise', 'Análise dos XSD'),
+    ('construcao', 'Construção dos leiautes'),
+    ('texto', 'gerar_texto'),
+    ('html', 'gerar_html'),
+    ('renderizacao', 'renderizar'),
+    ('regras', 'Página de regras'),
+    ('tabelas', 'Tabelas'),
+    ('links', 'Verificação de links'),
+)
+
+
+def medir(executar, preparar=None, repeticoes=3):
+    """Mede o menor tempo de execução de uma fase.
+
+    Args:
+        executar (callable): Função medida. Recebe o resultado de preparar,
+            quando informado.
+
+        preparar (callable, optional): Função executada antes de cada
+            repetição, fora da medição. Defaults to None.
+
+        repeticoes (int, optional): Quantidade de repetições. Defaults to 3.
+
+    Returns:
+        tuple: Menor tempo em segundos e resultado da última repetição.
+    """
+    melhor = None
+
+    for _ in range(repeticoes):
+        argumentos = () if preparar is None else (preparar(),)
+
+        inicio = perf_counter()
+        resultado = executar(*argumentos)
+        tempo = perf_counter() - inicio
+
+        if melhor is None or tempo < melhor:
+            melhor = tempo
+
+    return melhor, resultado
+
+
+def contar_itens(item):
+    """Conta os itens de uma árvore de itens de leiaute.
+
+    Args:
+        item (ItemLeiaute): Raiz da árvore.
+
+    Returns:
+        int: Quantidade de itens.
+    """
+    return 1 + sum(contar_itens(filho) for filho in item.filhos)
+
+
+def medir_fases(caminho_leiaute, caminho_tabelas, repeticoes=3):
+    """Mede separadamente cada fase da geração da documentação de uma versão.
+
+    Cada fase é medida isoladamente, a partir das saídas da fase anterior:
+    construção a partir dos XSD já analisados, renderização a partir de
+    leiautes já construídos, e assim por diante. Os arquivos gerados não são
+    gravados em disco.
+
+    Args:
+        caminho_leiaute (str): Diretório que contém os XSD da versão.
+
+        caminho_tabelas (str): Diretório que contém os arquivos das tabelas.
+
+        repeticoes (int, optional): Quantidade de repetições de cada fase.
+            Defaults to 3.
+
+    Returns:
+        dict: Tempo de cada fase em segundos e contadores da versão.
+    """
+    caminho_tipos = os.path.join(caminho_leiaute, 'tipos.xsd')
+    caminho_regras = os.path.join(caminho_leiaute, 'regras.txt')
+    caminhos = sorted([
+        os.path.join(caminho_leiaute, identificador)
+        for identificador in os.listdir(caminho_leiaute)
+        if identificador.startswith('evt')])
+
+    resultado = {}
+
+    resultado['analise'], xmls = medir(
+        lambda: (cinto.obter_tipos_globais(caminho_tipos),
+                 [ler_esquema(caminho) for caminho in caminhos]),
+        repeticoes=repeticoes)
+
+    # Cada repetição recebe um registro de tipos novo, para que as facetas e
+    # extensões já analisadas não sejam reaproveitadas entre repetições.
+    resultado['construcao'], leiautes = medir(
+        lambda tipos_globais: [
+            Leiaute(xml, tipos_globais) for xml in xmls[1]],
+        lambda: cinto.obter_tipos_globais(caminho_tipos),
+        repeticoes)
+
+    resultado['texto'], _ = medir(
+        lambda: [leiaute.gerar_texto() for leiaute in leiautes],
+        repeticoes=repeticoes)
+
+    resultado['html'], _ = medir(
+        lambda: [leiaute.gerar_html() for leiaute in leiautes],
+        repeticoes=repeticoes)
+
+    resultado['renderizacao'], _ = medir(
+        lambda: [leiaute.renderizar() for leiaute in leiautes],
+        repeticoes=repeticoes)
+
+    def gerar_regras():
+        grafo = GrafoLinks()
+        regras = ler_catalogo(caminho_regras)
+        regras.registrar_links(grafo)
+        escrever_regras(
+            [], regras, agrupar_referencias(leiautes), grafo)
+
+        return grafo, regras
+
+    resultado['regras'], (grafo_regras, regras) = medir(
+        gerar_regras, repeticoes=repeticoes)
+
+    resultado['tabelas'], tabelas = medir(
+        lambda: gerar_tabelas(caminho_tabelas), repeticoes=repeticoes)
+
+    def verificar_links():
+        grafo = GrafoLinks()
+
+        for pagina, ancoras in grafo_regras.ancoras.items():
+            grafo.registrar_ancoras(pagina, ancoras)
+
+        for (pagina, destino, ancora), origem in grafo_regras.links.items():
+            grafo.registrar_link(pagina, destino, ancora, origem)
+
+        for regra in regras.regras:
+            grafo.registrar_ancora('index.html', regra)
+            grafo.registrar_link('index.html', 'regras.html', regra, regra)
+
+        grafo.registrar_ancoras('tabelas.html', tabelas[2])
+        grafo.registrar_ancoras(
+            'tabelas.html', ['t_{}'.format(tabela) for tabela in tabelas[2]])
+
+        for leiaute in leiautes:
+            grafo.registrar_ancoras('index.html', leiaute.ancoras)
+            grafo.registrar_links('index.html', leiaute.links)
+
+        return grafo.verificar()
+
+    resultado['links'], ausentes = medir(
+        verificar_links, repeticoes=repeticoes)
+
+    resultado['eventos'] = len(leiautes)
+    resultado['itens'] = sum(
+        contar_itens(leiaute.raiz) for leiaute in leiautes)
+    resultado['links_quebrados'] = len(ausentes)
+
+    return resultado
+
+
+def imprimir_resultados(resultados):
+    """Imprime os tempos de cada fase para cada conjunto e backend medidos.
+
+    A coluna de microssegundos por item permite verificar se cada fase cresce
+    linearmente com o tamanho do conjunto.
+
+    Args:
+        resultados (list): Resultados de medir_fases, com o conjunto e o
+            backend de análise dos XSD.
+    """
+    for resultado in resultados:
+        print('{} ({}): {} eventos, {} itens'.format(
+            resultado['conjunto'], resultado['backend'],
+            resultado['eventos'], resultado['itens']))
+
+        for fase, descricao in FASES:
+            print('  {:<26}{:>10.4f} s{:>10.2f} µs/item'.format(
+                descricao, resultado[fase],
+                resultado[fase] * 1e6 / resultado['itens']))
+
+        if resultado['links_quebrados']:
+            print('  Links quebrados: ', resultado['links_quebrados'])
+
+
+def main():
+    """Ponto de entrada da linha de comando.
+    """
+    analisador = argparse.ArgumentParser(
+        description='Mede as fases da geração da documentação em conjuntos '
+                    'sintéticos de leiautes de tamanhos crescentes ou em uma '
+                    'versão existente.')
+    analisador.add_argument(
+        '--leiautes', metavar='CAMINHO_LEIAUTES',
+        help='Diretório de uma versão existente, medido no lugar dos '
+             'conjuntos sintéticos.')
+    analisador.add_argument(
+        '--backends', nargs='+', choices=analise_xml.BACKENDS,
+        default=[analise_xml.BACKEND],
+        help='Bibliotecas de análise dos XSD comparadas.')
+    analisador.add_argument(
+        '--escalas', nargs='+', type=int, default=[1, 2, 4], metavar='N',
+        help='Multiplicadores da quantidade de eventos, regras e linhas '
+             'das tabelas.')
+    analisador.add_argument(
+        '--eventos', type=int, default=20,
+        help='Quantidade de eventos na escala 1.')
+    analisador.add_argument('--profundidade', type=int, default=4)
+    analisador.add_argument('--largura', type=int, default=6)
+    analisador.add_argument('--semente', type=int, default=1)
+    analisador.add_argument(
+        '--repeticoes', type=int, default=3,
+        help='Repetições de cada fase; o menor tempo é informado.')
+    analisador.add_argument(
+        '--destino', metavar='DIRETORIO',
+        help='Diretório onde os conjuntos são gravados. Por padrão, um '
+             'diretório temporário.')
+    analisador.add_argument(
+        '--json', metavar='ARQUIVO',
+        help='Arquivo que recebe os resultados em JSON.')
+    argumentos = analisador.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporario:
+        destino = argumentos.destino or temporario
+        conjuntos = []
+
+        if argumentos.leiautes is not None:
+            conjuntos.append((argumentos.leiautes, argumentos.leiautes))
+        else:
+            for escala in argumentos.escalas:
+                caminho = os.path.join(destino, 'escala_{}'.format(escala))
+
+                GeradorCorpus(
+                    semente=argumentos.semente,
+                    eventos=argumentos.eventos * escala,
+                    profundidade=argumentos.profundidade,
+                    largura=argumentos.largura,
+                    regras=40 * escala,
+                    linhas_tabela=60 * escala).gravar(caminho)
+
+                conjuntos.append((
+                    'Escala {}'.format(escala),
+                    os.path.join(caminho, 'v_S_01_00')))
+
+        resultados = []
+
+        for conjunto, caminho_leiaute in conjuntos:
+            for backend in argumentos.backends:
+                analise_xml.definir_backend(backend)
+
+                resultado = medir_fases(
+                    caminho_leiaute, obter_caminho_tabelas(caminho_leiaute),
+                    argumentos.repeticoes)
+                resultado.update(conjunto=conjunto, backend=backend)
+                resultados.append(resultado)
+
+    imprimir_resultados(resultados)
+
+    if argumentos.json is not None:
+        with open(argumentos.json, 'w', encoding='utf8') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,414 @@
+from contextlib import ExitStack
+import heapq
+import json
+import os
+import pickle
+import re
+import sys
+import unicodedata
+import cinto_utilidades as cinto
+
+# As marcações HTML, as entidades e os atributos são reconhecidos na mesma
+# passagem que os termos, mas não geram termos.
+TERMO = re.compile(r'<[^>]*>|&\w+;|\w+="[^"]*"|(\w\w+)')
+
+# Quantidade máxima de lotes de termos intercalados de uma só vez, o que
+# limita os arquivos abertos simultaneamente.
+LOTES_INTERCALADOS = 64
+
+# Quantidade de documentos ou de termos reunidos em cada parte do JSON
+# entregue ao escritor.
+TAMANHO_PARTE = 1000
+
+
+def normalizar(texto):
+    """Normaliza um texto para a busca, sem acentos e em minúsculas.
+
+    Os caracteres sem equivalente ASCII após a decomposição são descartados.
+
+    Args:
+        texto (str): Texto original.
+
+    Returns:
+        str: Texto normalizado.
+    """
+    if not texto.isascii():
+        texto = unicodedata.normalize('NFKD', texto).encode(
+            'ascii', 'ignore').decode('ascii')
+
+    return texto.lower()
+
+
+def serializar(valor):
+    """Serializa um valor em JSON compacto.
+
+    Args:
+        valor (object): Valor serializado.
+
+    Returns:
+        str: Valor em JSON.
+    """
+    return json.dumps(valor, ensure_ascii=False, separators=(',', ':'))
+
+
+def extrair_termos(textos):
+    """Extrai os termos de busca de um conjunto de textos.
+
+    As marcações HTML, as entidades e o endereço das referências a itens são
+    descartados. Termos com um único caractere são ignorados.
+
+    Args:
+        textos (iterable): Textos examinados. Valores None são ignorados.
+
+    Returns:
+        set: Termos normalizados.
+    """
+    # Os textos são examinados de uma só vez, o que evita repetir as
+    # substituições e a normalização para cada texto curto.
+    texto = '\n'.join([texto for texto in textos if texto])
+
+    if '{' in texto:
+        texto = cinto.REFERENCIA.sub(
+            lambda ocorrencia: ocorrencia[1] or ocorrencia[2], texto)
+
+    termos = set(TERMO.findall(normalizar(texto)))
+    termos.discard('')
+
+    return termos
+
+
+class IndiceBusca:
+    """Representa o índice invertido usado na busca das páginas geradas.
+
+    Cada documento é um destino de link (página e âncora) com um rótulo para
+    exibição. O índice é gravado em JSON com os termos em ordem alfabética,
+    o que permite a busca por prefixo com uma busca binária no navegador:
+
+        {
+            "paginas": ["index.html", ...],
+            "documentos": [[índice da página, âncora, rótulo], ...],
+            "termos": [[termo, [índices dos documentos]], ...]
+        }
+    """
+
+    def __init__(self):
+        """Inicia uma nova instância da classe IndiceBusca.
+        """
+        self.paginas = {}
+        self.documentos = []
+        self.termos = {}
+
+    def adicionar(self, pagina, ancora, rotulo, termos):
+        """Adiciona um documento ao índice.
+
+        Args:
+            pagina (str): Página que contém o documento.
+
+            ancora (str): Âncora do documento na página.
+
+            rotulo (str): Rótulo exibido no resultado da busca.
+
+            termos (iterable): Termos normalizados do documento.
+        """
+        if pagina not in self.paginas:
+            self.paginas[pagina] = len(self.paginas)
+
+        indice = len(self.documentos)
+        self.documentos.append((self.paginas[pagina], ancora, rotulo))
+
+        for termo in termos:
+            documentos = self.termos.get(termo)
+
+            if documentos is None:
+                self.termos[termo] = [indice]
+            else:
+                documentos.append(indice)
+
+    def adicionar_documentos(self, pagina, documentos):
+        """Adiciona ao índice os documentos de uma mesma página.
+
+        Args:
+            pagina (str): Página que contém os documentos.
+
+            documentos (iterable): Âncora, rótulo e termos de cada documento.
+        """
+        for ancora, rotulo, termos in documentos:
+            self.adicionar(pagina, ancora, rotulo, termos)
+
+    def gerar(self):
+        """Gera o conteúdo do índice.
+
+        Returns:
+            dict: Páginas, documentos e termos do índice.
+        """
+        return {
+            'paginas': list(self.paginas),
+            'documentos': self.documentos,
+            'termos': sorted(self.termos.items()),
+        }
+
+    def serializar(self):
+        """Serializa o índice em JSON compacto.
+
+        Returns:
+            str: Conteúdo do arquivo do índice.
+        """
+        return serializar(self.gerar())
+
+    def gravar(self, caminho):
+        """Grava o índice em JSON compacto.
+
+        Args:
+            caminho (str): Caminho do arquivo do índice.
+        """
+        # O índice é serializado de uma vez: json.dump grava em pequenos
+        # pedaços e é bem mais lento em arquivos grandes.
+        conteudo = self.serializar()
+
+        with cinto.obter_arquivo(caminho, 'w') as arquivo:
+            arquivo.write(conteudo)
+
+
+class IndiceBuscaExterno:
+    """Representa o índice de busca montado em disco, usado com o limite de
+        memória.
+
+    Os eventos podem ser adicionados em qualquer ordem. Os documentos de cada
+    evento são gravados em um arquivo próprio; os termos são acumulados como
+    linhas "termo, evento e documento" e gravados em lotes ordenados quando
+    excedem o limite. Na serialização, os lotes são intercalados e o JSON é
+    gerado aos poucos, com o mesmo conteúdo do IndiceBusca, sem que o índice
+    completo seja mantido em memória. Os documentos das demais páginas, em
+    pequeno número, são mantidos em memória e seguem os dos eventos.
+    """
+
+    def __init__(self, caminho_temporario, pagina_eventos, limite):
+        """Inicia uma nova instância da classe IndiceBuscaExterno.
+
+        Args:
+            caminho_temporario (str): Diretório dos arquivos temporários.
+
+            pagina_eventos (str): Página que contém os documentos dos
+                eventos.
+
+            limite (int): Tamanho máximo, em bytes, ocupado pelas linhas de
+                termos mantidas em memória.
+        """
+        self.caminho_temporario = caminho_temporario
+        self.pagina_eventos = pagina_eventos
+        self.limite = limite
+        self.quantidades = {}
+        self.linhas = []
+        self.tamanho = 0
+        self.lotes = []
+        self.gravados = 0
+        self.documentos = []
+
+    def obter_caminho(self, nome):
+        """Obtém o caminho de um arquivo temporário do índice.
+
+        Args:
+            nome (str): Nome do arquivo.
+
+        Returns:
+            str: Caminho do arquivo.
+        """
+        return os.path.join(self.caminho_temporario, 'busca_{}'.format(nome))
+
+    def adicionar_evento(self, codigo, documentos):
+        """Adiciona ao índice os documentos de um evento.
+
+        Args:
+            codigo (str): Código do evento, que define a sua posição no
+                índice.
+
+            documentos (list): Âncora, rótulo e termos de cada documento.
+        """
+        with open(self.obter_caminho(codigo), 'wb') as arquivo:
+            pickle.dump([(ancora, rotulo) for ancora, rotulo, _ in documentos],
+                        arquivo, pickle.HIGHEST_PROTOCOL)
+
+        # Os termos contêm apenas letras, dígitos e sublinhados, e a
+        # tabulação precede todos eles: a ordem das linhas é a ordem dos
+        # termos, dos códigos e dos documentos.
+        for indice, (_, _, termos) in enumerate(documentos):
+            for termo in termos:
+                linha = '{}\t0\t{}\t{:08d}\n'.format(termo, codigo, indice)
+                self.linhas.append(linha)
+                self.tamanho += sys.getsizeof(linha)
+
+        self.quantidades[codigo] = len(documentos)
+
+        if self.tamanho > self.limite:
+            self.gravar_lote(self.linhas)
+            self.linhas = []
+            self.tamanho = 0
+
+    def adicionar(self, pagina, ancora, rotulo, termos):
+        """Adiciona ao índice um documento de outra página, posicionado após
+            os documentos dos eventos e os adicionados anteriormente.
+
+        Args:
+            pagina (str): Página que contém o documento.
+
+            ancora (str): Âncora do documento na página.
+
+            rotulo (str): Rótulo exibido no resultado da busca.
+
+            termos (iterable): Termos normalizados do documento.
+        """
+        self.documentos.append((pagina, ancora, rotulo, termos))
+
+    def adicionar_documentos(self, pagina, documentos):
+        """Adiciona ao índice os documentos de uma mesma página.
+
+        Args:
+            pagina (str): Página que contém os documentos.
+
+            documentos (iterable): Âncora, rótulo e termos de cada documento.
+        """
+        for ancora, rotulo, termos in documentos:
+            self.adicionar(pagina, ancora, rotulo, termos)
+
+    def gravar_lote(self, linhas):
+        """Grava um lote ordenado de linhas de termos.
+
+        Args:
+            linhas (iterable): Linhas do lote. Listas são ordenadas antes da
+                gravação; os demais iteráveis já devem estar ordenados.
+        """
+        if isinstance(linhas, list):
+            linhas.sort()
+
+        caminho = self.obter_caminho('{}.lote'.format(self.gravados))
+        self.gravados += 1
+
+        with cinto.obter_arquivo(caminho, 'w') as arquivo:
+            arquivo.writelines(linhas)
+
+        self.lotes.append(caminho)
+
+    def reduzir_lotes(self):
+        """Intercala os lotes gravados em grupos até que possam ser abertos
+            de uma só vez.
+        """
+        while len(self.lotes) > LOTES_INTERCALADOS:
+            grupo = self.lotes[:LOTES_INTERCALADOS]
+            self.lotes = self.lotes[LOTES_INTERCALADOS:]
+
+            with ExitStack() as pilha:
+                self.gravar_lote(heapq.merge(*[
+                    pilha.enter_context(cinto.obter_arquivo(caminho))
+                    for caminho in grupo]))
+
+            for caminho in grupo:
+                os.remove(caminho)
+
+    def iterar_termos(self, inicios, total):
+        """Percorre os termos do índice em ordem alfabética.
+
+        Args:
+            inicios (dict): Índice do primeiro documento de cada evento.
+
+            total (int): Quantidade de documentos dos eventos.
+
+        Yields:
+            tuple: Termo e índices dos documentos que o contêm, em ordem
+                crescente.
+        """
+        linhas = self.linhas
+        linhas.sort()
+        self.linhas = []
+
+        extras = sorted(['{}\t1\t{:08d}\n'.format(termo, total + indice)
+                         for indice, (_, _, _, termos)
+                         in enumerate(self.documentos) for termo in termos])
+
+        self.reduzir_lotes()
+
+        with ExitStack() as pilha:
+            arquivos = [pilha.enter_context(cinto.obter_arquivo(caminho))
+                        for caminho in self.lotes]
+
+            atual = None
+            documentos = []
+
+            for linha in heapq.merge(linhas, extras, *arquivos):
+                termo, grupo, resto = linha[:-1].split('\t', 2)
+
+                if grupo == '0':
+                    codigo, indice = resto.split('\t')
+                    indice = inicios[codigo] + int(indice)
+                else:
+                    indice = int(resto)
+
+                if termo != atual:
+                    if atual is not None:
+                        yield atual, documentos
+
+                    atual = termo
+                    documentos = []
+
+                documentos.append(indice)
+
+            if atual is not None:
+                yield atual, documentos
+
+    def serializar(self):
+        """Serializa o índice em JSON compacto, aos poucos.
+
+        Yields:
+            str: Partes do conteúdo do arquivo do índice.
+        """
+        codigos = sorted(self.quantidades)
+        inicios = {}
+        total = 0
+
+        for codigo in codigos:
+            inicios[codigo] = total
+            total += self.quantidades[codigo]
+
+        paginas = {}
+
+        if total:
+            paginas[self.pagina_eventos] = 0
+
+        for pagina, _, _, _ in self.documentos:
+            paginas.setdefault(pagina, len(paginas))
+
+        yield '{{"paginas":{},"documentos":['.format(serializar(list(paginas)))
+
+        separador = ''
+
+        for codigo in codigos:
+            with open(self.obter_caminho(codigo), 'rb') as arquivo:
+                documentos = pickle.load(arquivo)
+
+            if documentos:
+                yield separador + ','.join([serializar(
+                    (paginas[self.pagina_eventos], ancora, rotulo))
+                    for ancora, rotulo in documentos])
+                separador = ','
+
+        if self.documentos:
+            yield separador + ','.join([serializar(
+                (paginas[pagina], ancora, rotulo))
+                for pagina, ancora, rotulo, _ in self.documentos])
+
+        yield '],"termos":['
+
+        partes = []
+        separador = ''
+
+        for termo in self.iterar_termos(inicios, total):
+            partes.append(serializar(termo))
+
+            if len(partes) == TAMANHO_PARTE:
+                yield separador + ','.join(partes)
+                partes = []
+                separador = ','
+
+        if partes:
+            yield separador + ','.join(partes)
+
+        yield ']}'
@@ -0,0 +1,243 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import busca
+import cinto_utilidades as cinto
+import emissores
+import esquema
+import leiaute
+import modelos
+import referencias
+import tipos
+
+EXTENSAO = '.pickle'
+
+
+class CacheLeiautes:
+    """Representa o cache em disco dos leiautes já construídos e renderizados.
+
+    Cada entrada é indexada pelo hash dos insumos que a produziram e do código
+    que constrói e renderiza o leiaute. Quando o tamanho total ultrapassa o
+    limite, as entradas usadas há mais tempo são descartadas.
+    """
+
+    def __init__(self, diretorio, limite=200 * 1024 * 1024):
+        """Inicia uma nova instância da classe CacheLeiautes.
+
+        Args:
+            diretorio (str): Diretório onde as entradas são gravadas.
+
+            limite (int, optional): Tamanho máximo do cache em bytes.
+                Defaults to 200 MiB.
+        """
+        self.diretorio = diretorio
+        self.limite = limite
+        self.versao_codigo = ''.join(
+            cinto.calcular_hash(modulo.__file__)
+            for modulo in (leiaute, emissores, esquema, busca, cinto, modelos,
+                           referencias, tipos))
+
+        os.makedirs(diretorio, exist_ok=True)
+
+    def calcular_chave(self, *partes):
+        """Calcula a chave de uma entrada no cache.
+
+        Args:
+            partes (str): Identificação da entrada e hashes dos insumos.
+
+        Returns:
+            str: Chave da entrada.
+        """
+        return hashlib.sha256(
+            '|'.join(partes + (self.versao_codigo,)).encode()).hexdigest()
+
+    def obter_caminho(self, chave):
+        """Obtém o caminho do arquivo de uma entrada.
+
+        Args:
+            chave (str): Chave da entrada.
+
+        Returns:
+            str: Caminho do arquivo.
+        """
+        return os.path.join(self.diretorio, chave + EXTENSAO)
+
+    def obter(self, chave):
+        """Obtém um item do cache.
+
+        Args:
+            chave (str): Chave da entrada.
+
+        Returns:
+            object: Item armazenado ou None, caso não exista ou não possa ser
+                lido.
+        """
+        caminho = self.obter_caminho(chave)
+
+        try:
+            with open(caminho, 'rb') as arquivo:
+                item = pickle.load(arquivo)
+
+            os.utime(caminho)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Uma entrada truncada ou gravada com classes que não existem mais
+            # pode falhar de várias formas; ela é descartada e o item é
+            # construído novamente.
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+
+            return None
+
+        return item
+
+    def gravar(self, chave, item):
+        """Grava um item no cache.
+
+        Args:
+            chave (str): Chave da entrada.
+
+            item (object): Item serializável.
+        """
+        descritor, temporario = tempfile.mkstemp(
+            dir=self.diretorio, suffix='.tmp')
+
+        with os.fdopen(descritor, 'wb') as arquivo:
+            pickle.dump(item, arquivo, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temporario, self.obter_caminho(chave))
+
+    def descartar_excedentes(self):
+        """Remove as entradas usadas há mais tempo até que o tamanho total do
+            cache fique dentro do limite.
+
+        Returns:
+            int: Quantidade de entradas removidas.
+        """
+        entradas = []
+
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith(EXTENSAO):
+                estado = os.stat(os.path.join(self.diretorio, nome))
+                entradas.append((estado.st_mtime, estado.st_size, nome))
+
+        total = sum(entrada[1] for entrada in entradas)
+        removidas = 0
+
+        for _, tamanho, nome in sorted(entradas):
+            if total <= self.limite:
+                break
+
+            os.remove(os.path.join(self.diretorio, nome))
+            total -= tamanho
+            removidas += 1
+
+        return removidas
+
+    def limpar(self):
+        """Remove todas as entradas do cache.
+
+        Returns:
+            int: Quantidade de entradas removidas.
+        """
+        removidas = 0
+
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith((EXTENSAO, '.tmp')):
+                os.remove(os.path.join(self.diretorio, nome))
+                removidas += 1
+
+        return removidas
+
+
+class CacheMemoria:
+    """Representa um cache em memória dos leiautes já construídos e
+        renderizados, usado entre as gerações sucessivas do modo de
+        observação.
+
+    As chaves são calculadas como no CacheLeiautes. Cada chamada de
+    descartar_excedentes remove as entradas que não foram usadas desde a
+    chamada anterior, o que mantém apenas os eventos da geração mais recente.
+    """
+
+    def __init__(self):
+        """Inicia uma nova instância da classe CacheMemoria.
+        """
+        self.trava = threading.Lock()
+        self.itens = {}
+        self.usadas = set()
+
+    def calcular_chave(self, *partes):
+        """Calcula a chave de uma entrada no cache.
+
+        Args:
+            partes (str): Identificação da entrada e hashes dos insumos.
+
+        Returns:
+            str: Chave da entrada.
+        """
+        return '|'.join(partes)
+
+    def obter(self, chave):
+        """Obtém um item do cache.
+
+        Args:
+            chave (str): Chave da entrada.
+
+        Returns:
+            object: Item armazenado ou None, caso não exista.
+        """
+        with self.trava:
+            item = self.itens.get(chave)
+
+            if item is not None:
+                self.usadas.add(chave)
+
+        return item
+
+    def gravar(self, chave, item):
+        """Grava um item no cache.
+
+        Args:
+            chave (str): Chave da entrada.
+
+            item (object): Item armazenado.
+        """
+        with self.trava:
+            self.itens[chave] = item
+            self.usadas.add(chave)
+
+    def descartar_excedentes(self):
+        """Remove as entradas que não foram usadas desde a chamada anterior.
+
+        Returns:
+            int: Quantidade de entradas removidas.
+        """
+        with self.trava:
+            removidas = [chave for chave in self.itens
+                         if chave not in self.usadas]
+
+            for chave in removidas:
+                del self.itens[chave]
+
+            self.usadas = set()
+
+        return len(removidas)
+
+    def limpar(self):
+        """Remove todas as entradas do cache.
+
+        Returns:
+            int: Quantidade de entradas removidas.
+        """
+        with self.trava:
+            removidas = len(self.itens)
+            self.itens = {}
+            self.usadas = set()
+
+        return removidas
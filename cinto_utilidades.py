@@ -1,8 +1,21 @@
+import hashlib
+import os
 import re
+import sys
 from modelos import Geral
+import esquema
+import tipos
 
-RES = 'base:restriction'
-NS = {'base': 'http://www.w3.org/2001/XMLSchema'}
+REFERENCIA = re.compile(r'\{([^\{\}]*)\}\(([^()]+)\)')
+TABELA = re.compile(r'Tabela (\d{2})')
+
+# Diretório dos ativos das páginas, ao lado do código e independente do
+# diretório de trabalho.
+DIRETORIO_ATIVOS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'ativos')
+
+MESES = ('janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho', 'julho',
+         'agosto', 'setembro', 'outubro', 'novembro', 'dezembro')
 
 
 def codificar_sobrescrito(texto):
@@ -20,6 +33,56 @@ def codificar_sobrescrito(texto):
         return texto
 
 
+def calcular_hash(caminho):
+    """Calcula o hash do conteúdo de um arquivo ou diretório.
+
+    Args:
+        caminho (str): Caminho do arquivo ou diretório.
+
+    Returns:
+        str: Hash SHA-256 do conteúdo em hexadecimal.
+    """
+    resumo = hashlib.sha256()
+
+    if os.path.isdir(caminho):
+        for nome in sorted(os.listdir(caminho)):
+            resumo.update(nome.encode('utf8'))
+            resumo.update(calcular_hash(os.path.join(caminho, nome)).encode())
+    else:
+        with open(caminho, 'rb') as arquivo:
+            resumo.update(arquivo.read())
+
+    return resumo.hexdigest()
+
+
+def calcular_assinatura_tipos(nomes, resumos):
+    """Calcula a assinatura de um conjunto de tipos e dos tipos dos quais eles
+        dependem.
+
+    Args:
+        nomes (set): Nomes dos tipos referenciados diretamente.
+
+        resumos (dict): Resumos dos tipos, conforme resumir_tipos.
+
+    Returns:
+        str: Assinatura com o nome e o hash de cada tipo alcançado.
+    """
+    pendentes = list(nomes)
+    alcancados = set()
+
+    while pendentes:
+        nome = pendentes.pop()
+
+        if nome in alcancados or nome not in resumos:
+            continue
+
+        alcancados.add(nome)
+        pendentes.extend(resumos[nome][1])
+
+    return ';'.join(
+        '{}:{}'.format(nome, resumos[nome][0]) for nome in sorted(alcancados))
+
+
 def obter_arquivo(caminho, modo='r'):
     """Obtém o stream de um arquivo.
 
@@ -32,80 +95,243 @@ def obter_arquivo(caminho, modo='r'):
     return open(caminho, modo, encoding='utf8')
 
 
+def internalizar(texto):
+    """Obtém a cópia única de um texto repetido entre itens e eventos.
+
+    Args:
+        texto (str): Texto que será compartilhado.
+
+    Returns:
+        str: Texto internalizado ou o próprio valor, caso não seja um texto.
+    """
+    return sys.intern(texto) if isinstance(texto, str) else texto
+
+
+def ler_arquivo(caminho):
+    """Lê todo o conteúdo de um arquivo texto.
+
+    Args:
+        caminho (str): Caminho do arquivo.
+
+    Returns:
+        str: Conteúdo do arquivo.
+    """
+    with obter_arquivo(caminho) as arquivo:
+        return arquivo.read()
+
+
+def formatar_mes(data):
+    """Formata o mês e o ano de uma data por extenso, em português.
+
+    O nome do mês não depende do locale do processo.
+
+    Args:
+        data (date): Data formatada.
+
+    Returns:
+        str: Mês e ano, como em 'Janeiro de 2024'.
+    """
+    return '{} de {}'.format(MESES[data.month - 1], data.year).capitalize()
+
+
+def obter_tipos_referenciados(xml):
+    """Obtém os nomes dos tipos T_ e TS_ referenciados em um XSD.
+
+    Args:
+        xml (NoEsquema): XSD que será examinado.
+
+    Returns:
+        set: Nomes dos tipos referenciados pelos atributos type e base.
+    """
+    nomes = set()
+
+    for elemento in xml.iterar():
+        for atributo in ('type', 'base'):
+            valor = elemento.get(atributo)
+
+            if valor is not None and valor.startswith(('T_', 'TS_')):
+                nomes.add(valor)
+
+    return nomes
+
+
+def obter_tipos_globais(caminho, backend=None):
+    """Obtém o conjunto de tipos reutilizáveis definidos em um XSD.
+
+    Args:
+        caminho (str): Caminho do arquivo tipos.xsd.
+
+        backend (str, optional): Backend de análise, 'lxml' ou 'etree'.
+            Defaults to None, que usa o backend padrão do processo.
+
+    Returns:
+        RegistroTipos: Elementos do XSD indexados pelo atributo name.
+    """
+    return tipos.RegistroTipos({
+        tipo.get('name'): tipo
+        for tipo in esquema.ler_esquema(caminho, backend).filhos})
+
+
 def obter_restriction_final(restriction, tipos_globais):
     """Obtém o elemento restriction final de uma cadeia de reuso.
 
     Args:
-        restriction (Element): XSD que define o elemento inicial.
+        restriction (NoEsquema): XSD que define o elemento inicial.
 
         tipos_globais (dict): Conjunto de tipos reutilizáveis.
 
     Returns:
-        Element: Último elemento da cadeia.
+        NoEsquema: Último elemento da cadeia.
     """
     base = restriction.get('base')
     if base and base.startswith('TS_'):
-        proximo = tipos_globais[base].find(RES, NS)
+        proximo = tipos_globais[base].filho('restriction')
         if proximo is not None:
             return obter_restriction_final(proximo, tipos_globais)
     else:
         return restriction
 
 
-def resolver_referencias(texto, item):
-    """Identifica referências em um texto e as substitui por links HTML.
+def resumir_tipos(tipos_globais):
+    """Resume os tipos reutilizáveis para a identificação de alterações.
 
     Args:
-        texto (str): Texto com referências.
+        tipos_globais (dict): Conjunto de tipos reutilizáveis.
+
+    Returns:
+        dict: Hash da definição e tipos referenciados, indexados pelo nome do
+            tipo.
+    """
+    return {
+        nome: (hashlib.sha256(
+                   repr(tipo.obter_assinatura()).encode()).hexdigest(),
+               obter_tipos_referenciados(tipo))
+        for nome, tipo in tipos_globais.items() if nome is not None}
+
+
+def resolver_endereco(endereco, item):
+    """Resolve o endereço de uma referência relativa ao item contextual.
+
+    Os ancestrais do item são obtidos do índice do seu Leiaute, sem percorrer
+    a hierarquia.
+
+    Args:
+        endereco (str): Endereço informado na referência.
 
         item (ItemLeiaute): Item contextual da referência.
 
     Returns:
-        str: Texto com links.
+        str: Caminho do item referenciado ou None, caso o endereço suba além
+            da raiz do Leiaute.
+    """
+    if endereco.startswith('../'):
+        saltos = endereco.count('../')
+        ancestrais = item.leiaute.ancestrais[item.caminho]
+        indice = saltos if item.categoria.agrupadora() else saltos + 1
+
+        if indice >= len(ancestrais):
+            return None
+
+        return endereco.replace('../' * saltos, ancestrais[indice] + '_')
+
+    elif endereco.startswith('/'):
+        return endereco.replace('/', item.leiaute.codigo[2:] + '_')
+
+    elif endereco.startswith('./'):
+        ancestrais = item.leiaute.ancestrais[item.caminho]
+        prefixo = ancestrais[0 if item.categoria.agrupadora() else 1]
+
+        return '_'.join((prefixo, endereco[2:]))
+
+    return endereco
+
+
+def substituir_referencia(ocorrencia, item):
+    """Substitui uma referência por um link HTML para o item referenciado.
+
+    Referências a itens inexistentes são registradas no Leiaute e mantidas
+    sem link quando o endereço não puder ser resolvido.
+
+    Args:
+        ocorrencia (Match): Referência encontrada no texto.
+
+        item (ItemLeiaute): Item contextual da referência.
+
+    Returns:
+        str: Link para o item referenciado.
+    """
+    nome, endereco = ocorrencia.groups()
+    endereco_final = resolver_endereco(endereco, item)
+    leiaute = item.leiaute
+
+    if endereco_final is None:
+        leiaute.referencias_invalidas.add((endereco, item.caminho))
+
+        return ocorrencia.group(0)
+
+    # Durante a construção o índice ainda está incompleto; essas referências
+    # são verificadas ao final da construção do Leiaute.
+    if leiaute.raiz is not None and endereco_final not in leiaute.ancestrais:
+        leiaute.referencias_invalidas.add((endereco_final, item.caminho))
+
+    item.registrar_link('index.html', endereco_final)
+
+    if nome == '':
+        nome = endereco_final.split('_')[-1]
+
+    return Geral.LINK.format(endereco_final, nome)
+
+
+def escapar_html(texto):
+    """Substitui os caracteres reservados do HTML em um texto.
+
+    Args:
+        texto (str): Texto original.
+
+    Returns:
+        str: Texto com os caracteres substituídos.
     """
-    texto = texto.translate(str.maketrans({
+    return texto.translate(str.maketrans({
         '"': '&quot;',
         '>': '&gt;',
         '<': '&lt;',
     }))
 
-    for ocorrencia in re.findall(r'\{([^\{\}]*)\}\(([^()]+)\)', texto):
-        nome = ocorrencia[0]
-        endereco = ocorrencia[1]
 
-        if endereco.startswith('../'):
-            item_final = item
-            saltos = endereco.count('../')
+def possui_referencias(texto):
+    """Indica se um texto possui referências a itens ou a tabelas.
+
+    Args:
+        texto (str): Texto verificado.
 
-            if not item.categoria.agrupadora():
-                item_final = item.pai
+    Returns:
+        bool: True se o texto possuir referências; False em caso contrário.
+    """
+    return (REFERENCIA.search(texto) is not None
+            or TABELA.search(texto) is not None)
 
-            for salto in range(saltos):
-                item_final = item_final.pai
 
-            endereco = endereco.replace(
-                '../' * saltos, item_final.caminho + '_')
+def resolver_referencias(texto, item):
+    """Identifica referências em um texto e as substitui por links HTML.
 
-        elif endereco.startswith('/'):
-            endereco = endereco.replace('/', item.leiaute.codigo[2:] + '_')
+    Os destinos dos links gerados são registrados no item contextual.
 
-        elif endereco.startswith('./'):
-            if item.categoria.agrupadora():
-                prefixo = item.caminho
-            else:
-                prefixo = item.pai.caminho
-            endereco = '_'.join((prefixo, endereco[2:]))
+    Args:
+        texto (str): Texto com referências.
+
+        item (ItemLeiaute): Item contextual da referência.
+
+    Returns:
+        str: Texto com links.
+    """
+    item.leiaute.contadores['resolver_referencias'] += 1
 
-        nome_final = nome
+    texto = escapar_html(texto)
 
-        if nome == '':
-            nome_final = endereco.split('_')[-1]
+    texto = REFERENCIA.sub(
+        lambda ocorrencia: substituir_referencia(ocorrencia, item), texto)
 
-        texto = texto.replace(
-            '{{{}}}({})'.format(nome, ocorrencia[1]),
-            Geral.LINK.format(endereco, nome_final))
+    for tabela in TABELA.findall(texto):
+        item.registrar_link('tabelas.html', tabela)
 
-    return re.sub(
-        r'Tabela (\d{2})',
-        '<a href="tabelas.html#\\1">Tabela \\1</a>',
-        texto)
+    return TABELA.sub('<a href="tabelas.html#\\1">Tabela \\1</a>', texto)
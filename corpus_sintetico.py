@@ -0,0 +1,663 @@
+import argparse
+import os
+import random
+
+CABECALHO_XSD = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"'
+    ' xmlns:ds="http://www.w3.org/2000/09/xmldsig#"'
+    ' elementFormDefault="qualified">\n')
+
+RODAPE_XSD = '</xs:schema>\n'
+
+TIPOS_FIXOS = (
+    ('TS_Id', ['Identificação única do evento.'],
+     '<xs:restriction base="xs:ID">\n'
+     '      <xs:length value="36"/>\n'
+     '    </xs:restriction>'),
+    ('TS_cpf', ['Número do CPF.', 'Validação: Deve ser um CPF válido.'],
+     '<xs:restriction base="xs:string">\n'
+     '      <xs:pattern value="\\d{11}"/>\n'
+     '    </xs:restriction>'),
+    ('TS_cpfTrab', ['CPF do trabalhador.'],
+     '<xs:restriction base="TS_cpf"/>'),
+    ('TS_nrInsc', ['Número de inscrição.'],
+     '<xs:restriction base="xs:string">\n'
+     '      <xs:pattern value="\\d{8}|\\d{11}|\\d{14}"/>\n'
+     '    </xs:restriction>'),
+    ('TS_perApur', ['Período de apuração.'],
+     '<xs:restriction base="xs:string">\n'
+     '      <xs:pattern value="\\d{4}(-\\d{2})?"/>\n'
+     '    </xs:restriction>'),
+    ('TS_valor', ['Valor monetário.'],
+     '<xs:restriction base="xs:decimal">\n'
+     '      <xs:totalDigits value="14"/>\n'
+     '      <xs:fractionDigits value="2"/>\n'
+     '    </xs:restriction>'),
+    ('TS_texto', ['Texto livre.'],
+     '<xs:restriction base="xs:string">\n'
+     '      <xs:minLength value="1"/>\n'
+     '      <xs:maxLength value="100"/>\n'
+     '    </xs:restriction>'),
+    ('TS_codigo', ['Código alfanumérico.'],
+     '<xs:restriction base="xs:string">\n'
+     '      <xs:pattern value="\\w{1,30}"/>\n'
+     '    </xs:restriction>'),
+)
+
+
+def gerar_annotation(textos, recuo):
+    """Gera um elemento annotation com um documentation para cada texto.
+
+    Args:
+        textos (list): Textos dos elementos documentation.
+
+        recuo (int): Quantidade de espaços antes do elemento.
+
+    Returns:
+        str: Elemento annotation.
+    """
+    espaco = ' ' * recuo
+    linhas = ['{}<xs:annotation>\n'.format(espaco)]
+
+    for texto in textos:
+        linhas.append('{}  <xs:documentation>{}</xs:documentation>\n'.format(
+            espaco, texto))
+
+    linhas.append('{}</xs:annotation>\n'.format(espaco))
+
+    return ''.join(linhas)
+
+
+class GeradorCorpus:
+    """Representa o gerador de um conjunto sintético de leiautes do eSocial.
+
+    O conjunto contém tipos.xsd, os XSD dos eventos, regras.txt e os arquivos
+    das tabelas, com as mesmas construções encontradas nos leiautes reais:
+    tipos simples reutilizados, enumerações com e sem grupos, tipos compostos
+    T_ reutilizados e estendidos, referências relativas, regras e tabelas com
+    células mescladas. A mesma semente gera sempre o mesmo conjunto.
+    """
+
+    def __init__(self, semente=1, eventos=20, profundidade=4, largura=6,
+                 enumeracoes=8, valores_enumeracao=25, tipos_compostos=6,
+                 reuso_compostos=0.3, regras=40, tabelas=6, linhas_tabela=60):
+        """Inicia uma nova instância da classe GeradorCorpus.
+
+        Args:
+            semente (int, optional): Semente dos sorteios. Defaults to 1.
+
+            eventos (int, optional): Quantidade de eventos. Defaults to 20.
+
+            profundidade (int, optional): Nível máximo dos grupos de cada
+                evento. Defaults to 4.
+
+            largura (int, optional): Quantidade máxima de filhos de cada
+                grupo. Defaults to 6.
+
+            enumeracoes (int, optional): Quantidade de tipos enumerados.
+                Defaults to 8.
+
+            valores_enumeracao (int, optional): Quantidade máxima de valores
+                de cada tipo enumerado. Defaults to 25.
+
+            tipos_compostos (int, optional): Quantidade de tipos compostos T_
+                reutilizáveis. Defaults to 6.
+
+            reuso_compostos (float, optional): Probabilidade de um subgrupo
+                usar um tipo composto em vez de uma definição própria.
+                Defaults to 0.3.
+
+            regras (int, optional): Quantidade de regras. Defaults to 40.
+
+            tabelas (int, optional): Quantidade de tabelas. Defaults to 6.
+
+            linhas_tabela (int, optional): Quantidade de linhas de cada
+                tabela. Defaults to 60.
+        """
+        self.aleatorio = random.Random(semente)
+        self.eventos = eventos
+        self.profundidade = profundidade
+        self.largura = largura
+        self.enumeracoes = enumeracoes
+        self.valores_enumeracao = valores_enumeracao
+        self.tipos_compostos = tipos_compostos
+        self.reuso_compostos = reuso_compostos
+        self.tabelas = tabelas
+        self.linhas_tabela = linhas_tabela
+        self.regras = ['REGRA_SINTETICA_{:03d}'.format(indice)
+                       for indice in range(regras)]
+        self.tipos_simples = []
+        self.nomes_compostos = []
+
+    def sortear_regras(self):
+        """Sorteia as regras associadas a um item.
+
+        Returns:
+            list: Documentações REGRA do item.
+        """
+        return ['REGRA:{}'.format(regra) for regra in self.aleatorio.sample(
+            self.regras, min(len(self.regras), self.aleatorio.randint(0, 2)))]
+
+    def distribuir_regras(self, indice):
+        """Obtém as regras associadas ao grupo principal de um evento.
+
+        As regras são distribuídas entre os eventos para que todas tenham ao
+        menos uma ocorrência, como exige a página de regras.
+
+        Args:
+            indice (int): Índice do evento.
+
+        Returns:
+            list: Documentações REGRA do grupo.
+        """
+        return ['REGRA:{}'.format(regra)
+                for regra in self.regras[indice::max(1, self.eventos)]]
+
+    def gerar_tipos(self):
+        """Gera o arquivo tipos.xsd.
+
+        Returns:
+            str: Conteúdo do arquivo.
+        """
+        partes = [CABECALHO_XSD]
+
+        for nome, textos, restriction in TIPOS_FIXOS:
+            partes.append(
+                '  <xs:simpleType name="{}">\n'.format(nome)
+                + gerar_annotation(textos, 4)
+                + '    {}\n'.format(restriction)
+                + '  </xs:simpleType>\n')
+
+            if nome != 'TS_Id':
+                self.tipos_simples.append(nome)
+
+        for indice in range(self.enumeracoes):
+            partes.append(self.gerar_enumeracao(indice))
+
+        for indice in range(self.tipos_compostos):
+            partes.append(self.gerar_tipo_composto(indice))
+
+        partes.append(RODAPE_XSD)
+
+        return ''.join(partes)
+
+    def gerar_enumeracao(self, indice):
+        """Gera um tipo simples enumerado.
+
+        Os tipos alternam entre valores sem descrição, valores descritos com
+        grupos e referências a tabelas e valores descritos.
+
+        Args:
+            indice (int): Índice do tipo.
+
+        Returns:
+            str: Definição do tipo.
+        """
+        nome = 'TS_enum{}'.format(indice)
+        estilo = indice % 3
+        quantidade = self.aleatorio.randint(
+            2, max(2, min(self.valores_enumeracao, 4 + indice * 3)))
+
+        linhas = [
+            '  <xs:simpleType name="{}">\n'.format(nome),
+            gerar_annotation([
+                'Tipo enumerado {}.'.format(indice),
+                'Validação: Deve ser um dos valores listados.'], 4),
+            '    <xs:restriction base="{}">\n'.format(
+                'xs:string' if estilo == 1 else 'xs:byte')]
+
+        for valor in range(1, quantidade + 1):
+            texto_valor = 'V{:02d}'.format(valor) if estilo == 1 else str(valor)
+
+            if estilo == 2:
+                linhas.append('      <xs:enumeration value="{}"/>\n'.format(
+                    texto_valor))
+            else:
+                if estilo == 1 and valor == 1:
+                    textos = ['Grupo de valores',
+                              'Opção {} conforme Tabela 01'.format(valor)]
+                else:
+                    textos = ['Opção ^^{}^^ &lt;n&gt; "aspas"'.format(valor)]
+
+                linhas.append(
+                    '      <xs:enumeration value="{}">\n'.format(texto_valor)
+                    + gerar_annotation(textos, 8)
+                    + '      </xs:enumeration>\n')
+
+        linhas.append('    </xs:restriction>\n  </xs:simpleType>\n')
+        self.tipos_simples.append(nome)
+
+        return ''.join(linhas)
+
+    def gerar_tipo_composto(self, indice):
+        """Gera um tipo composto T_ reutilizável.
+
+        Args:
+            indice (int): Índice do tipo.
+
+        Returns:
+            str: Definição do tipo.
+        """
+        nome = 'T_composto{}'.format(indice)
+        self.nomes_compostos.append(nome)
+
+        linhas = [
+            '  <xs:complexType name="{}">\n'.format(nome),
+            gerar_annotation([
+                'Grupo composto reutilizável {}.'.format(indice),
+                'CHAVE_GRUPO: {campo0}'] + self.sortear_regras(), 4),
+            '    <xs:sequence>\n']
+
+        for campo in range(self.aleatorio.randint(2, 5)):
+            linhas.append(
+                '      <xs:element name="campo{}" type="{}"{}>\n'.format(
+                    campo, self.aleatorio.choice(self.tipos_simples),
+                    ' minOccurs="0"' if campo % 2 else '')
+                + gerar_annotation([
+                    'Campo {} do composto {}. Ver {{campo0}}(./campo0).'
+                    .format(campo, indice),
+                    'Informação complementar.'], 8)
+                + '      </xs:element>\n')
+
+        linhas.append('    </xs:sequence>\n  </xs:complexType>\n')
+
+        return ''.join(linhas)
+
+    def gerar_campo(self, nome, recuo, irmaos, nivel):
+        """Gera um elemento simples de um evento.
+
+        Args:
+            nome (str): Nome do elemento.
+
+            recuo (int): Quantidade de espaços antes do elemento.
+
+            irmaos (list): Nomes dos campos do mesmo grupo.
+
+            nivel (int): Nível do elemento.
+
+        Returns:
+            str: Definição do elemento.
+        """
+        aleatorio = self.aleatorio
+        espaco = ' ' * recuo
+        sorteio = aleatorio.random()
+        ocorrencia = aleatorio.choice(['', ' minOccurs="0"', ''])
+        textos = ['Campo {} em nível {}.'.format(nome, nivel)]
+
+        if irmaos:
+            irmao = aleatorio.choice(irmaos)
+            textos.append(
+                'Validação: Se informado, ver {{{0}}}(./{0}) e Tabela {1:02d}.'
+                .format(irmao, aleatorio.randint(1, max(1, self.tabelas))))
+
+        if aleatorio.random() < 0.2:
+            textos.append('Origem: Campo de origem {}(/ideEvento_tpAmb).')
+
+        if aleatorio.random() < 0.1:
+            textos.append('Evento de origem: S-1000.')
+
+        if aleatorio.random() < 0.1:
+            textos.append('DESCRICAO_COMPLETA:Descrição completa do campo.')
+            textos.append('Segunda linha da descrição completa.')
+
+        textos += self.sortear_regras()
+
+        if sorteio < 0.55:
+            return (
+                '{}<xs:element name="{}" type="{}"{}>\n'.format(
+                    espaco, nome, aleatorio.choice(self.tipos_simples),
+                    ocorrencia)
+                + gerar_annotation(textos, recuo + 2)
+                + '{}</xs:element>\n'.format(espaco))
+        elif sorteio < 0.65:
+            return (
+                '{}<xs:element name="{}" type="xs:date"{}>\n'.format(
+                    espaco, nome, ocorrencia)
+                + gerar_annotation(textos, recuo + 2)
+                + '{}</xs:element>\n'.format(espaco))
+
+        return (
+            '{}<xs:element name="{}"{}>\n'.format(espaco, nome, ocorrencia)
+            + gerar_annotation(textos, recuo + 2)
+            + '{0}  <xs:simpleType>\n'
+              '{0}    <xs:restriction base="xs:string">\n'
+              '{0}      <xs:minLength value="1"/>\n'
+              '{0}      <xs:maxLength value="{1}"/>\n'
+              '{0}    </xs:restriction>\n'
+              '{0}  </xs:simpleType>\n'
+              '{0}</xs:element>\n'.format(espaco, aleatorio.randint(1, 60)))
+
+    def gerar_grupo(self, nome, recuo, nivel, irmaos_pai):
+        """Gera um grupo de um evento e, recursivamente, os seus filhos.
+
+        Args:
+            nome (str): Nome do grupo.
+
+            recuo (int): Quantidade de espaços antes do grupo.
+
+            nivel (int): Nível do grupo.
+
+            irmaos_pai (list): Nomes dos campos do grupo pai.
+
+        Returns:
+            str: Definição do grupo.
+        """
+        aleatorio = self.aleatorio
+        espaco = ' ' * recuo
+        textos = ['Grupo {}.'.format(nome)]
+
+        if irmaos_pai and nivel > 3:
+            irmao = aleatorio.choice(irmaos_pai)
+            textos.append('Informações relativas a {{{0}}}(../{0}).'.format(
+                irmao))
+
+        textos += self.sortear_regras()
+
+        filhos = ['{}{}'.format(nome[:3], indice)
+                  for indice in range(aleatorio.randint(2, max(2, self.largura)))]
+        campos = [filho for indice, filho in enumerate(filhos)
+                  if indice % 3 != 2]
+
+        textos.append('CHAVE_GRUPO: {' + campos[0] + '}')
+        textos.append('CONDICAO_GRUPO: {}'.format(aleatorio.choice([
+            'O', 'OC', 'N',
+            'O (se {{{0}}}(./{0}) = [1]); N (nos demais casos)'.format(
+                campos[0])])))
+
+        maximo = aleatorio.choice(
+            ['', ' maxOccurs="unbounded"', ' maxOccurs="99"'])
+        agrupador = 'sequence'
+
+        if nivel > 3 and aleatorio.random() < 0.15:
+            agrupador = 'choice'
+
+        linhas = [
+            '{}<xs:element name="{}" minOccurs="0"{}>\n'.format(
+                espaco, nome, maximo),
+            gerar_annotation(textos, recuo + 2),
+            '{}  <xs:complexType>\n'.format(espaco),
+            '{}    <xs:{}>\n'.format(espaco, agrupador)]
+
+        for indice, filho in enumerate(filhos):
+            if indice % 3 == 2 and nivel < self.profundidade:
+                if (self.nomes_compostos
+                        and aleatorio.random() < self.reuso_compostos):
+                    linhas.append(
+                        '{}      <xs:element name="{}" type="{}"'
+                        ' minOccurs="0"/>\n'.format(
+                            espaco, filho,
+                            aleatorio.choice(self.nomes_compostos)))
+                else:
+                    linhas.append(self.gerar_grupo(
+                        filho, recuo + 6, nivel + 1, campos))
+            else:
+                linhas.append(self.gerar_campo(
+                    filho, recuo + 6, campos, nivel + 1))
+
+        linhas.append('{}    </xs:{}>\n'.format(espaco, agrupador))
+        linhas.append('{0}  </xs:complexType>\n{0}</xs:element>\n'.format(
+            espaco))
+
+        return ''.join(linhas)
+
+    def gerar_evento(self, indice):
+        """Gera o XSD de um evento.
+
+        Args:
+            indice (int): Índice do evento.
+
+        Returns:
+            tuple: Nome do evento e conteúdo do XSD.
+        """
+        aleatorio = self.aleatorio
+        nome = 'evtSintetico{:03d}'.format(indice)
+
+        partes = [
+            CABECALHO_XSD,
+            '  <xs:include schemaLocation="tipos.xsd"/>\n',
+            '  <xs:complexType name="T_ideEvento_local">\n'
+            + gerar_annotation(['Informações de identificação do evento.'], 4)
+            + '    <xs:sequence>\n'
+              '      <xs:element name="tpAmb" type="TS_enum0">\n'
+            + gerar_annotation(['Identificação do ambiente.'], 8)
+            + '      </xs:element>\n'
+              '      <xs:element name="procEmi" type="TS_enum1">\n'
+            + gerar_annotation(['Processo de emissão.'], 8)
+            + '      </xs:element>\n'
+              '    </xs:sequence>\n'
+              '  </xs:complexType>\n',
+            '  <xs:complexType name="T_estendido_local">\n'
+            '    <xs:complexContent>\n'
+            '      <xs:extension base="{}">\n'
+            '        <xs:sequence>\n'
+            '          <xs:element name="extra" type="TS_texto">\n'.format(
+                aleatorio.choice(self.nomes_compostos))
+            + gerar_annotation(['Campo adicional da extensão.'], 12)
+            + '          </xs:element>\n'
+              '        </xs:sequence>\n'
+              '      </xs:extension>\n'
+              '    </xs:complexContent>\n'
+              '  </xs:complexType>\n',
+            '  <xs:element name="eSocial">\n'
+            + gerar_annotation(['S-{} - Evento sintético {}'.format(
+                1000 + indice * 5, indice)], 4)
+            + '    <xs:complexType>\n'
+              '      <xs:sequence>\n'
+              '        <xs:element name="{}">\n'.format(nome)
+            + gerar_annotation([
+                'Evento sintético número {}.'.format(indice),
+                'CHAVE_GRUPO: {Id*}',
+                'DESCRICAO_COMPLETA:Descrição completa do evento.']
+                + self.distribuir_regras(indice), 10)
+            + '          <xs:complexType>\n'
+              '            <xs:sequence>\n'
+              '              <xs:element name="ideEvento"'
+              ' type="T_ideEvento_local">\n'
+            + gerar_annotation([
+                'Informações de identificação do evento.',
+                'CONDICAO_GRUPO: O'], 16)
+            + '              </xs:element>\n'
+              '              <xs:element name="ideEmpregador" type="{}">\n'
+              .format(aleatorio.choice(self.nomes_compostos))
+            + gerar_annotation([
+                'Informações de identificação do empregador.',
+                'CONDICAO_GRUPO: O'], 16)
+            + '              </xs:element>\n'
+              '              <xs:element name="estendido"'
+              ' type="T_estendido_local" minOccurs="0">\n'
+            + gerar_annotation(['Grupo estendido.', 'CONDICAO_GRUPO: OC'], 16)
+            + '              </xs:element>\n']
+
+        for grupo in range(aleatorio.randint(1, 3)):
+            partes.append(self.gerar_grupo(
+                'info{}'.format(grupo), 14, 3, ['ideEvento']))
+
+        partes.append(
+            '            </xs:sequence>\n'
+            '            <xs:attribute name="Id" use="required" type="TS_Id"/>\n'
+            '          </xs:complexType>\n'
+            '        </xs:element>\n'
+            '        <xs:element ref="ds:Signature"/>\n'
+            '      </xs:sequence>\n'
+            '    </xs:complexType>\n'
+            '  </xs:element>\n')
+        partes.append(RODAPE_XSD)
+
+        return nome, ''.join(partes)
+
+    def gerar_regras(self):
+        """Gera o arquivo regras.txt.
+
+        Returns:
+            str: Conteúdo do arquivo.
+        """
+        blocos = []
+
+        for indice, regra in enumerate(self.regras):
+            linhas = [regra]
+
+            for linha in range(self.aleatorio.randint(1, 4)):
+                texto = ('Texto {} da regra {} com <marcação> e comparação'
+                         ' a > b.'.format(linha, indice))
+
+                if self.aleatorio.random() < 0.3:
+                    texto += ' Ver {}.'.format(self.aleatorio.choice(self.regras))
+
+                linhas.append(texto)
+
+            blocos.append('\n'.join(linhas) + '\n')
+
+        return '\n'.join(blocos)
+
+    def gerar_tabela(self, numero):
+        """Gera o arquivo de uma tabela.
+
+        As tabelas ímpares com mais de três colunas têm cabeçalho em duas
+        linhas. O corpo tem células mescladas em linhas e colunas,
+        sub-cabeçalhos e marcações de itálico e negrito, seguido de anexos.
+
+        Args:
+            numero (int): Número da tabela.
+
+        Returns:
+            str: Conteúdo do arquivo.
+        """
+        aleatorio = self.aleatorio
+        colunas = aleatorio.randint(3, 5)
+        larguras = [100 // colunas] * colunas
+        larguras[-1] += 100 - sum(larguras)
+
+        linhas = ['Tabela sintética {}#{}'.format(
+            numero, ' '.join([str(largura) for largura in larguras]))]
+        cabecalho = ['Código', '<Descrição'] + [
+            'Coluna {}'.format(coluna) for coluna in range(2, colunas)]
+
+        if colunas > 3 and numero % 2:
+            cabecalho[-1] = '>'
+            linhas.append('|'.join(cabecalho))
+            linhas.append('|'.join(['^', '^'] + [
+                'Sub {}'.format(coluna) for coluna in range(2, colunas)]))
+        else:
+            linhas.append('|'.join(cabecalho))
+
+        for linha in range(self.linhas_tabela):
+            celulas = []
+
+            for coluna in range(colunas):
+                # A última linha nunca continua uma mesclagem, pois a
+                # correção das mesclagens no fim do arquivo conta os anexos.
+                if (0 < linha < self.linhas_tabela - 1 and coluna == 0
+                        and aleatorio.random() < 0.2):
+                    celulas.append('^')
+                elif coluna > 1 and aleatorio.random() < 0.1:
+                    celulas.append('>')
+                elif coluna == 1 and aleatorio.random() < 0.05:
+                    celulas.append('--C3--##Sub-cabeçalho {}##'.format(linha))
+                elif aleatorio.random() < 0.1:
+                    celulas.append('__v{}.{}__'.format(linha, coluna))
+                else:
+                    celulas.append('v{}.{}'.format(linha, coluna))
+
+            linhas.append('|'.join(celulas))
+
+        linhas.extend([
+            '===',
+            'Observação da tabela.',
+            '>texto largura fixa 1',
+            '>texto largura fixa 2',
+            'Nota final.'])
+
+        return '\n'.join(linhas) + '\n'
+
+    def gravar(self, destino, versoes=('v_S_01_00',)):
+        """Grava o conjunto sintético em um diretório.
+
+        Cada versão recebe os mesmos XSD e regras. As tabelas são gravadas no
+        diretório de destino e também nas versões de simplificação, onde a
+        geração da documentação as procura.
+
+        Args:
+            destino (str): Diretório de destino.
+
+            versoes (list, optional): Nomes dos diretórios das versões.
+                Defaults to ('v_S_01_00',).
+        """
+        tabelas = [('{:02d}.txt'.format(numero), self.gerar_tabela(numero))
+                   for numero in range(1, self.tabelas + 1)]
+        tipos = self.gerar_tipos()
+        eventos = [self.gerar_evento(indice) for indice in range(self.eventos)]
+        regras = self.gerar_regras()
+
+        arquivos = [(os.path.join(destino, 'tabelas', nome), conteudo)
+                    for nome, conteudo in tabelas]
+
+        for versao in versoes:
+            raiz = os.path.join(destino, versao)
+
+            os.makedirs(os.path.join(raiz, 'doc', 'saida'), exist_ok=True)
+            os.makedirs(os.path.join(raiz, 'doc', 'txt'), exist_ok=True)
+
+            arquivos.append((os.path.join(raiz, 'tipos.xsd'), tipos))
+            arquivos.append((os.path.join(raiz, 'regras.txt'), regras))
+            arquivos.append((
+                os.path.join(raiz, 'doc', 'menu'),
+                '<div class="navbar-item">'
+                '<a href="index.html">Leiautes</a></div>'))
+            arquivos.append((
+                os.path.join(raiz, 'doc', 'parametros_texto_inicial'),
+                'VERSAO = s-1.2\n'
+                'PUBLICACAO = Nota Técnica nº 01/2026 consolidada\n'
+                'DATA = Outubro de 2026\n'
+                'DETALHES = <p>Versão sintética</p>'))
+
+            for nome, conteudo in eventos:
+                arquivos.append((
+                    os.path.join(raiz, '{}.xsd'.format(nome)), conteudo))
+
+            if versao.endswith('simplificacao'):
+                for nome, conteudo in tabelas:
+                    arquivos.append((
+                        os.path.join(raiz, 'tabelas', nome), conteudo))
+
+        for caminho, conteudo in arquivos:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+
+            with open(caminho, 'w', encoding='utf8') as arquivo:
+                arquivo.write(conteudo)
+
+
+def main():
+    """Ponto de entrada da linha de comando.
+    """
+    analisador = argparse.ArgumentParser(
+        description='Gera um conjunto sintético de leiautes do eSocial.')
+    analisador.add_argument(
+        'destino', metavar='DIRETORIO',
+        help='Diretório onde o conjunto é gravado.')
+    analisador.add_argument(
+        '--versoes', nargs='+', default=['v_S_01_00'], metavar='VERSAO',
+        help='Nomes dos diretórios das versões.')
+    analisador.add_argument('--semente', type=int, default=1)
+    analisador.add_argument('--eventos', type=int, default=20)
+    analisador.add_argument('--profundidade', type=int, default=4)
+    analisador.add_argument('--largura', type=int, default=6)
+    analisador.add_argument('--enumeracoes', type=int, default=8)
+    analisador.add_argument('--valores-enumeracao', type=int, default=25)
+    analisador.add_argument('--tipos-compostos', type=int, default=6)
+    analisador.add_argument('--reuso-compostos', type=float, default=0.3)
+    analisador.add_argument('--regras', type=int, default=40)
+    analisador.add_argument('--tabelas', type=int, default=6)
+    analisador.add_argument('--linhas-tabela', type=int, default=60)
+    argumentos = analisador.parse_args()
+
+    GeradorCorpus(
+        argumentos.semente, argumentos.eventos, argumentos.profundidade,
+        argumentos.largura, argumentos.enumeracoes,
+        argumentos.valores_enumeracao, argumentos.tipos_compostos,
+        argumentos.reuso_compostos, argumentos.regras, argumentos.tabelas,
+        argumentos.linhas_tabela).gravar(argumentos.destino, argumentos.versoes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,519 @@
+from modelos import Diferenca
+from modelos import Geral
+from cache import CacheLeiautes
+from referencias import obter_ancora
+import cinto_utilidades as cinto
+import paralelo
+
+import argparse
+import hashlib
+import json
+import os
+from time import perf_counter
+
+# Propriedades comparadas em cada item, com os rótulos usados no relatório.
+CAMPOS = (
+    ('categoria', 'Elemento'),
+    ('ocorrencia', 'Ocorrência'),
+    ('tipo', 'Tipo'),
+    ('tamanho', 'Tamanho'),
+    ('decimais', 'Decimais'),
+    ('valores_validos', 'Valores válidos'),
+    ('regras', 'Regras de validação'),
+    ('descricao', 'Descrição'),
+    ('descricao_completa', 'Descrição completa'),
+    ('validacao', 'Validação'),
+    ('origem', 'Origem'),
+    ('evento_origem', 'Evento de origem'),
+    ('chaves', 'Chave'),
+    ('condicoes', 'Condição'),
+)
+
+SITUACOES = {
+    'alterado': 'Alterado',
+    'incluido': 'Incluído',
+    'excluido': 'Excluído',
+}
+
+
+def obter_campos(item):
+    """Obtém as propriedades comparadas de um item.
+
+    Os valores válidos são obtidos das enumerações originais do tipo, sem as
+    referências resolvidas para HTML.
+
+    Args:
+        item (ItemLeiaute): Item examinado.
+
+    Returns:
+        dict: Valor de cada propriedade, em tipos serializáveis em JSON.
+    """
+    agrupador = item.categoria.agrupadora()
+    valores_validos = {}
+
+    if item.facetas is not None:
+        for valor, cabecalho, texto in item.facetas.enumeracoes:
+            if cabecalho is not None:
+                valores_validos[cabecalho] = ''
+
+            valores_validos[valor] = texto
+
+    return {
+        'categoria': item.categoria.value,
+        'ocorrencia': str(item.gerar_descricao_ocorrencia()),
+        'tipo': '-' if agrupador else item.rotulo_tipo,
+        'tamanho': str(item.gerar_descricao_tamanho()),
+        'decimais': '-' if agrupador else str(item.decimais),
+        'valores_validos': valores_validos,
+        'regras': list(getattr(item, 'regras', ())),
+        'descricao': list(getattr(item, 'descricao', ())),
+        'descricao_completa': list(getattr(item, 'descricao_completa', ())),
+        'validacao': list(getattr(item, 'validacao', ())),
+        'origem': list(getattr(item, 'origem', ())),
+        'evento_origem': list(getattr(item, 'evento_origem', ())),
+        'chaves': list(getattr(item, 'chaves', ())),
+        'condicoes': dict(getattr(item, 'condicoes', {})),
+    }
+
+
+def calcular_hashes(item, hashes):
+    """Calcula o hash de cada subárvore de itens, das folhas para a raiz.
+
+    O hash de um item cobre o seu nome, as suas propriedades e os hashes dos
+    filhos; duas subárvores com o mesmo hash são iguais e não precisam ser
+    percorridas.
+
+    Args:
+        item (ItemLeiaute): Raiz da subárvore.
+
+        hashes (dict): Hashes já calculados, indexados pelo id de cada item,
+            que recebe os hashes da subárvore.
+
+    Returns:
+        bytes: Hash da subárvore.
+    """
+    filhos = [calcular_hashes(filho, hashes) for filho in item.filhos]
+
+    resumo = hashlib.blake2b(digest_size=16)
+    resumo.update(repr((
+        item.nome, tuple(obter_campos(item).values()))).encode())
+
+    for filho in filhos:
+        resumo.update(filho)
+
+    hashes[id(item)] = resumo.digest()
+
+    return hashes[id(item)]
+
+
+def indexar_filhos(item):
+    """Indexa os filhos de um item pelo nome.
+
+    Filhos com o mesmo nome são diferenciados pela ordem em que aparecem.
+
+    Args:
+        item (ItemLeiaute): Item examinado.
+
+    Returns:
+        dict: Filhos indexados pelo nome e pela ordem entre os homônimos.
+    """
+    filhos = {}
+    contagem = {}
+
+    for filho in item.filhos:
+        ordem = contagem.get(filho.nome, 0)
+        contagem[filho.nome] = ordem + 1
+        filhos[(filho.nome, ordem)] = filho
+
+    return filhos
+
+
+def contar_itens(item):
+    """Conta os itens de uma subárvore.
+
+    Args:
+        item (ItemLeiaute): Raiz da subárvore.
+
+    Returns:
+        int: Quantidade de itens, incluindo a raiz.
+    """
+    return 1 + sum([contar_itens(filho) for filho in item.filhos])
+
+
+def descrever_item(situacao, item, **propriedades):
+    """Descreve a alteração de um item.
+
+    Args:
+        situacao (str): Situação do item: alterado, incluido ou excluido.
+
+        item (ItemLeiaute): Item alterado.
+
+        propriedades: Demais propriedades da alteração.
+
+    Returns:
+        dict: Descrição da alteração.
+    """
+    alteracao = {
+        'situacao': situacao,
+        'caminho': item.caminho,
+        'ancora': obter_ancora(item),
+        'trilha': item.gerar_trilha(' > '),
+    }
+    alteracao.update(propriedades)
+
+    return alteracao
+
+
+def comparar_itens(antigo, novo, hashes_antigos, hashes_novos, alteracoes):
+    """Compara duas versões de um item e das suas subárvores.
+
+    Args:
+        antigo (ItemLeiaute): Item na versão antiga.
+
+        novo (ItemLeiaute): Item na versão nova.
+
+        hashes_antigos (dict): Hashes das subárvores da versão antiga.
+
+        hashes_novos (dict): Hashes das subárvores da versão nova.
+
+        alteracoes (list): Lista que recebe as alterações encontradas.
+    """
+    if hashes_antigos[id(antigo)] == hashes_novos[id(novo)]:
+        return
+
+    campos_antigos = obter_campos(antigo)
+    campos_novos = obter_campos(novo)
+
+    campos = [
+        {'campo': campo, 'antes': campos_antigos[campo],
+         'depois': campos_novos[campo]}
+        for campo, _ in CAMPOS if campos_antigos[campo] != campos_novos[campo]]
+
+    if campos:
+        alteracoes.append(descrever_item('alterado', novo, campos=campos))
+
+    filhos_antigos = indexar_filhos(antigo)
+    filhos_novos = indexar_filhos(novo)
+
+    for chave, filho in filhos_antigos.items():
+        if chave not in filhos_novos:
+            alteracoes.append(descrever_item(
+                'excluido', filho, itens=contar_itens(filho)))
+
+    for chave, filho in filhos_novos.items():
+        if chave not in filhos_antigos:
+            alteracoes.append(descrever_item(
+                'incluido', filho, itens=contar_itens(filho)))
+        else:
+            comparar_itens(filhos_antigos[chave], filho, hashes_antigos,
+                           hashes_novos, alteracoes)
+
+
+def comparar_versoes(antigos, novos):
+    """Compara os leiautes de duas versões.
+
+    Args:
+        antigos (list): Leiautes da versão antiga.
+
+        novos (list): Leiautes da versão nova.
+
+    Returns:
+        dict: Resumo da comparação e alterações de cada evento alterado,
+            incluído ou excluído, na ordem dos códigos.
+    """
+    antigos = {leiaute.codigo: leiaute for leiaute in antigos}
+    novos = {leiaute.codigo: leiaute for leiaute in novos}
+
+    resumo = dict.fromkeys(('inalterados', 'alterados', 'incluidos',
+                            'excluidos', 'itens_alterados', 'itens_incluidos',
+                            'itens_excluidos'), 0)
+    eventos = []
+
+    for codigo in sorted(antigos.keys() | novos.keys()):
+        if codigo not in novos:
+            leiaute = antigos[codigo]
+            situacao = 'excluido'
+            alteracoes = []
+        elif codigo not in antigos:
+            leiaute = novos[codigo]
+            situacao = 'incluido'
+            alteracoes = []
+        else:
+            leiaute = novos[codigo]
+            hashes_antigos = {}
+            hashes_novos = {}
+
+            if (calcular_hashes(antigos[codigo].raiz, hashes_antigos)
+                    == calcular_hashes(leiaute.raiz, hashes_novos)):
+                resumo['inalterados'] += 1
+                continue
+
+            situacao = 'alterado'
+            alteracoes = []
+
+            comparar_itens(antigos[codigo].raiz, leiaute.raiz, hashes_antigos,
+                           hashes_novos, alteracoes)
+
+            for alteracao in alteracoes:
+                resumo['itens_{}s'.format(alteracao['situacao'])] += 1
+
+        resumo['{}s'.format(situacao)] += 1
+
+        eventos.append({
+            'codigo': codigo,
+            'descricao': leiaute.descricao,
+            'situacao': situacao,
+            'alteracoes': alteracoes,
+        })
+
+    return {'resumo': resumo, 'eventos': eventos}
+
+
+def formatar_valor(valor):
+    """Formata o valor de uma propriedade para o relatório em HTML.
+
+    Args:
+        valor (object): Valor da propriedade.
+
+    Returns:
+        str: Valor em HTML.
+    """
+    if isinstance(valor, dict):
+        valor = [chave if texto is None else '{} - {}'.format(chave, texto)
+                 for chave, texto in valor.items()]
+
+    if isinstance(valor, list):
+        return '<br>\n'.join([cinto.escapar_html(texto) for texto in valor])
+
+    return cinto.escapar_html(valor)
+
+
+def descrever_campo(rotulo, antes, depois):
+    """Descreve a alteração de uma propriedade no relatório em HTML.
+
+    Nos valores válidos, apenas os valores incluídos, excluídos e com a
+    descrição alterada são exibidos.
+
+    Args:
+        rotulo (str): Rótulo da propriedade.
+
+        antes (object): Valor na versão antiga.
+
+        depois (object): Valor na versão nova.
+
+    Returns:
+        str: Descrição da alteração em HTML.
+    """
+    if isinstance(antes, dict) and isinstance(depois, dict):
+        partes = []
+
+        for titulo, valores in (
+                ('Incluídos', [valor for valor in depois
+                               if valor not in antes]),
+                ('Excluídos', [valor for valor in antes
+                               if valor not in depois]),
+                ('Alterados', [valor for valor in depois if valor in antes
+                               and antes[valor] != depois[valor]])):
+            if valores:
+                partes.append('{}: {}'.format(titulo, cinto.escapar_html(
+                    ', '.join(valores))))
+
+        return '<strong>{}:</strong> {}'.format(rotulo, '; '.join(partes))
+
+    return Diferenca.ALTERACAO.format(
+        rotulo=rotulo, antes=formatar_valor(antes) or '-',
+        depois=formatar_valor(depois) or '-')
+
+
+def gerar_html(comparacao, inicio, fim):
+    """Gera a página de alterações entre duas versões.
+
+    Os links apontam para o index.html da versão nova; os itens excluídos não
+    têm links.
+
+    Args:
+        comparacao (dict): Resultado de comparar_versoes.
+
+        inicio (str): Início da página, com a folha de rosto.
+
+        fim (str): Fim da página.
+
+    Returns:
+        str: Conteúdo HTML da página.
+    """
+    rotulos = dict(CAMPOS)
+    resumo = comparacao['resumo']
+
+    partes = [inicio.replace(
+        'SUBTITULO', 'Alterações nos leiautes').replace(
+        'DESCRICAO', (
+            '<p class="has-text-centered">Eventos alterados: {}; incluídos: '
+            '{}; excluídos: {}; inalterados: {}.</p>\n'.format(
+                resumo['alterados'], resumo['incluidos'],
+                resumo['excluidos'], resumo['inalterados']))).replace(
+        'TITULO', 'eSocial - Alterações nos leiautes').replace(
+        'TEXTO_1', (
+            '<h1 class="title has-text-centered is-3">ALTERAÇÕES NOS LEIAUTES '
+            'DO eSOCIAL<br><br>{} &rarr; {}</h1>'.format(
+                cinto.escapar_html(comparacao['antiga']),
+                cinto.escapar_html(comparacao['nova'])))).replace(
+        'TEXTO_2', '')]
+
+    partes.append('<h2 class="title has-text-centered is-3">Sumário</h2>\n')
+    partes.append('<ul class="sumario">\n')
+
+    for evento in comparacao['eventos']:
+        partes.append(Diferenca.LINHA_INDICE.format(
+            codigo=evento['codigo'], descricao=evento['descricao'],
+            situacao=SITUACOES[evento['situacao']]))
+
+    partes.append('</ul>\n')
+
+    for evento in comparacao['eventos']:
+        partes.append(Diferenca.CABECALHO.format(
+            codigo=evento['codigo'], descricao=evento['descricao'],
+            situacao=SITUACOES[evento['situacao']]))
+
+        for alteracao in evento['alteracoes']:
+            campo = cinto.escapar_html(
+                alteracao['trilha'] or alteracao['caminho'])
+
+            if alteracao['situacao'] == 'alterado':
+                descricao = '<br>\n'.join([descrever_campo(
+                    rotulos[campo_alterado['campo']], campo_alterado['antes'],
+                    campo_alterado['depois'])
+                    for campo_alterado in alteracao['campos']])
+            else:
+                descricao = 'Itens: {}'.format(alteracao['itens'])
+
+            if alteracao['situacao'] != 'excluido':
+                campo = Diferenca.LINK.format(alteracao['ancora'], campo)
+
+            partes.append(Diferenca.LINHA.format(
+                situacao=SITUACOES[alteracao['situacao']], campo=campo,
+                alteracoes=descricao))
+
+        partes.append(Geral.RODAPE_TABELA)
+
+    partes.append(fim)
+
+    return ''.join(partes)
+
+
+def carregar_versao(caminho_leiaute, orquestrador, mensagens=None):
+    """Constrói os leiautes de todos os eventos de uma versão.
+
+    Args:
+        caminho_leiaute (str): Diretório que contém os XSD da versão.
+
+        orquestrador (Orquestrador): Orquestrador que constrói os leiautes.
+
+        mensagens (list, optional): Mensagens da versão, que recebem os
+            tempos do cache. Defaults to None.
+
+    Returns:
+        list: Leiautes da versão.
+    """
+    caminhos = [
+        os.path.join(caminho_leiaute, identificador)
+        for identificador in sorted(os.listdir(caminho_leiaute))
+        if identificador.startswith('evt')]
+
+    return orquestrador.carregar_leiautes(
+        caminhos, os.path.join(caminho_leiaute, 'tipos.xsd'), mensagens)
+
+
+def main():
+    """Ponto de entrada da linha de comando.
+    """
+    analisador = argparse.ArgumentParser(
+        description='Compara os leiautes de duas versões do eSocial e gera '
+                    'um relatório das alterações em JSON e em HTML.')
+    analisador.add_argument(
+        'antiga', metavar='CAMINHO_ANTIGA',
+        help='Diretório que contém os XSD da versão antiga.')
+    analisador.add_argument(
+        'nova', metavar='CAMINHO_NOVA',
+        help='Diretório que contém os XSD da versão nova.')
+    analisador.add_argument(
+        '--saida', metavar='DIRETORIO',
+        help='Diretório que recebe diferencas.json e diferencas.html. Por '
+             'padrão, doc/saida da versão nova.')
+    analisador.add_argument(
+        '-j', '--jobs', type=int, default=1, metavar='N',
+        help='Quantidade de processos usados na construção dos leiautes.')
+    analisador.add_argument(
+        '--cache', metavar='DIRETORIO',
+        help='Diretório do cache dos leiautes já construídos.')
+    analisador.add_argument(
+        '--limite-cache', type=int, default=200, metavar='MB',
+        help='Tamanho máximo do cache em megabytes.')
+    argumentos = analisador.parse_args()
+
+    if argumentos.jobs < 1:
+        analisador.error('--jobs deve ser maior que zero')
+
+    cache = None
+
+    if argumentos.cache is not None:
+        cache = CacheLeiautes(
+            argumentos.cache, argumentos.limite_cache * 1024 * 1024)
+
+    saida = argumentos.saida or os.path.join(argumentos.nova, 'doc', 'saida')
+    orquestrador = paralelo.Orquestrador(argumentos.jobs, cache)
+    versoes = {}
+
+    inicio = perf_counter()
+
+    # As versões são carregadas em paralelo; as mensagens de cada uma são
+    # exibidas de uma só vez, identificadas pelo caminho.
+    def carregar(caminho, orquestrador):
+        mensagens = []
+        versoes[caminho] = carregar_versao(caminho, orquestrador, mensagens)
+
+        if mensagens:
+            print('\n'.join(['Caminho: {}'.format(caminho)] + mensagens))
+
+    orquestrador.executar(
+        list(dict.fromkeys((argumentos.antiga, argumentos.nova))), carregar)
+
+    tempo_construcao = perf_counter() - inicio
+    inicio = perf_counter()
+
+    comparacao = {'antiga': argumentos.antiga, 'nova': argumentos.nova}
+    comparacao.update(comparar_versoes(
+        versoes[argumentos.antiga], versoes[argumentos.nova]))
+
+    tempo_comparacao = perf_counter() - inicio
+
+    caminho_ativos = os.path.join(cinto.DIRETORIO_ATIVOS, '{}')
+    caminho_menu = os.path.join(argumentos.nova, 'doc', 'menu')
+    menu = cinto.ler_arquivo(caminho_menu) if os.path.exists(
+        caminho_menu) else ''
+
+    os.makedirs(saida, exist_ok=True)
+
+    with cinto.obter_arquivo(os.path.join(saida, 'diferencas.json'), 'w') as f:
+        f.write(json.dumps(comparacao, ensure_ascii=False, indent=1))
+
+    with cinto.obter_arquivo(os.path.join(saida, 'diferencas.html'), 'w') as f:
+        f.write(gerar_html(
+            comparacao, cinto.ler_arquivo(caminho_ativos.format('inicio.html')),
+            cinto.ler_arquivo(caminho_ativos.format('fim.html')).replace(
+                'MENU', menu)))
+
+    resumo = comparacao['resumo']
+
+    print('Eventos alterados: {}; incluídos: {}; excluídos: {}; '
+          'inalterados: {}'.format(
+              resumo['alterados'], resumo['incluidos'], resumo['excluidos'],
+              resumo['inalterados']))
+    print('Itens alterados: {}; incluídos: {}; excluídos: {}'.format(
+        resumo['itens_alterados'], resumo['itens_incluidos'],
+        resumo['itens_excluidos']))
+    print('Leiautes construídos em {:.3f} s; comparados em {:.3f} s'.format(
+        tempo_construcao, tempo_comparacao))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,370 @@
+from modelos import Completo
+from modelos import Resumo
+from modelos import Geral
+import busca
+import cinto_utilidades as cinto
+import leiaute
+
+
+class CamposItem:
+    """Representa os campos derivados de um item durante um percurso.
+
+    Cada campo é calculado na primeira vez em que um emissor o solicita e
+    reaproveitado pelos demais emissores do mesmo percurso.
+    """
+
+    __slots__ = ('item', 'valores')
+
+    def __init__(self, item):
+        """Inicia uma nova instância da classe CamposItem.
+
+        Args:
+            item (ItemLeiaute): Item visitado.
+        """
+        self.item = item
+        self.valores = {}
+
+    def obter(self, campo):
+        """Obtém um campo derivado do item.
+
+        Args:
+            campo (str): Nome do campo, igual ao do método gerar_<campo> do
+                ItemLeiaute que o calcula.
+
+        Returns:
+            str: Valor do campo.
+        """
+        valores = self.valores
+
+        if campo not in valores:
+            valores[campo] = getattr(self.item, 'gerar_' + campo)()
+
+        return valores[campo]
+
+
+class Emissor:
+    """Representa um formato de saída alimentado pelo percurso da árvore de
+        itens de um Leiaute.
+
+    Cada emissor acumula as suas partes, na ordem em que os itens são
+    visitados, e decide em quais itens o percurso deve continuar.
+    """
+
+    def __init__(self):
+        """Inicia uma nova instância da classe Emissor.
+        """
+        self.partes = []
+
+    def aceitar(self, item):
+        """Indica se o emissor visita um item filho de um item já visitado.
+
+        Args:
+            item (ItemLeiaute): Item filho.
+
+        Returns:
+            bool: True se o item deve ser visitado; False em caso contrário.
+        """
+        return True
+
+    def visitar(self, item, campos):
+        """Gera as partes de um item.
+
+        Args:
+            item (ItemLeiaute): Item visitado.
+
+            campos (CamposItem): Campos derivados do item.
+
+        Returns:
+            bool: True se os filhos do item devem ser visitados; False em
+                caso contrário.
+        """
+        raise NotImplementedError
+
+    def gerar(self):
+        """Gera a representação acumulada pelo emissor.
+
+        Returns:
+            str: Partes geradas, na ordem do percurso.
+        """
+        return ''.join(self.partes)
+
+
+class EmissorHtmlResumo(Emissor):
+    """Gera a visão resumida do Leiaute em HTML, com apenas os itens
+        agrupadores.
+    """
+
+    def __init__(self, modelo_linha=Resumo.LINHA,
+                 modelo_referencia=Resumo.REFERENCIA):
+        """Inicia uma nova instância da classe EmissorHtmlResumo.
+
+        Args:
+            modelo_linha (str): Modelo de linha comum.
+
+            modelo_referencia (str): Modelo de linha de referência.
+        """
+        super().__init__()
+        self.modelo_linha = modelo_linha
+        self.modelo_referencia = modelo_referencia
+
+    def aceitar(self, item):
+        """Aceita apenas os filhos agrupadores.
+        """
+        return item.categoria.agrupadora()
+
+    def visitar(self, item, campos):
+        """Gera a linha do item. Os filhos de um item repetido não são
+            visitados.
+        """
+        identificador = item.nome
+
+        if item.referencia is not None:
+            identificador = '_'.join((item.pai.nome, identificador))
+
+        item.leiaute.ancoras.add('r_{}'.format(item.caminho))
+        item.registrar_link('index.html', item.caminho)
+
+        self.partes.append(self.modelo_linha.format(
+            link_completo=item.caminho,
+            identificador_evento=item.leiaute.nome,
+            id_nome=identificador,
+            nome=item.nome,
+            pai=campos.obter('link_pai'),
+            nivel=item.nivel,
+            descricao=cinto.resolver_referencias(
+                item.descricao[0].rstrip('.'), item),
+            ocorrencia=campos.obter('descricao_ocorrencia'),
+            chave=item.gerar_descricao_chaves(),
+            condicao=item.gerar_descricao_condicoes(),
+        ))
+
+        if item.referencia is None:
+            return True
+
+        # Os filhos de um item repetido são substituídos por uma referência
+        # ao item original.
+        for filho in item.filhos:
+            if filho.categoria.agrupadora():
+                item.registrar_link(
+                    'index.html', 'r_{}'.format(item.referencia.caminho))
+                item.registrar_link(
+                    'index.html', 'r_{}'.format(item.referencia.pai.caminho))
+
+                self.partes.append(self.modelo_referencia.format(
+                    nome=item.referencia.nome,
+                    nome_pai=item.referencia.pai.nome,
+                    id_pai=item.referencia.pai.caminho,
+                    id=item.referencia.caminho
+                ))
+
+                break
+
+        return False
+
+
+class EmissorHtmlCompleto(Emissor):
+    """Gera a visão completa do Leiaute em HTML.
+    """
+
+    def __init__(self, modelo_linha=Completo.LINHA,
+                 modelo_referencia=Completo.REFERENCIA):
+        """Inicia uma nova instância da classe EmissorHtmlCompleto.
+
+        Args:
+            modelo_linha (str): Modelo de linha comum.
+
+            modelo_referencia (str): Modelo de linha de referência.
+        """
+        super().__init__()
+        self.modelo_linha = modelo_linha
+        self.modelo_referencia = modelo_referencia
+
+    def visitar(self, item, campos):
+        """Gera a linha do item. Os filhos de um item repetido não são
+            visitados.
+        """
+        marcador_grupo = ''
+        nome = item.nome
+        repetido = item.referencia is not None and item.referencia != item
+
+        if item.categoria.agrupadora():
+            marcador_grupo = ' class="grupo"'
+            if item.categoria == leiaute.CategoriaItem.CHOICE:
+                marcador_grupo = ' class="grupo-choice"'
+
+            nome = Geral.LINK.format('r_{}'.format(item.caminho), item.nome)
+            item.registrar_link('index.html', 'r_{}'.format(item.caminho))
+
+        item.leiaute.ancoras.add(item.caminho)
+
+        self.partes.append(self.modelo_linha.format(
+            indice='',
+            caminho=item.caminho,
+            marcador_grupo=marcador_grupo,
+            nome=nome,
+            pai=campos.obter('link_pai'),
+            tipo_elemento=item.categoria.value,
+            tipo=item.rotulo_tipo,
+            ocorrencia=campos.obter('descricao_ocorrencia'),
+            tamanho=campos.obter('descricao_tamanho'),
+            decimais=item.decimais,
+            descricao=item.gerar_descricao(),
+        ))
+
+        if not repetido:
+            return True
+
+        item.registrar_link('index.html', item.referencia.caminho)
+        item.registrar_link('index.html', item.referencia.pai.caminho)
+
+        self.partes.append(self.modelo_referencia.format(
+            nome=item.referencia.nome,
+            id=item.referencia.caminho,
+            nome_pai=item.referencia.pai.nome,
+            id_pai=item.referencia.pai.caminho
+        ))
+
+        return False
+
+
+class EmissorTextoResumo(Emissor):
+    """Gera a visão resumida do Leiaute em texto simples, com apenas os itens
+        agrupadores.
+    """
+
+    def __init__(self, modelo_linha=Resumo.LINHA_TEXTO):
+        """Inicia uma nova instância da classe EmissorTextoResumo.
+
+        Args:
+            modelo_linha (str): Modelo de linha comum.
+        """
+        super().__init__()
+        self.modelo_linha = modelo_linha
+
+    def aceitar(self, item):
+        """Aceita apenas os filhos agrupadores.
+        """
+        return item.categoria.agrupadora()
+
+    def visitar(self, item, campos):
+        """Gera a linha do item.
+        """
+        self.partes.append(self.modelo_linha.format(
+            nivel=item.nivel,
+            nome=item.nome,
+            pai='-' if item.pai is None else item.pai.nome,
+            descricao=item.descricao[0],
+            ocorrencia=campos.obter('descricao_ocorrencia'),
+            chave=item.gerar_descricao_chaves_texto(),
+            condicao=item.gerar_descricao_condicoes_texto(),
+        ))
+
+        return True
+
+
+class EmissorTextoCompleto(Emissor):
+    """Gera a visão completa do Leiaute em texto simples.
+    """
+
+    def __init__(self, modelo_linha=Completo.LINHA_TEXTO):
+        """Inicia uma nova instância da classe EmissorTextoCompleto.
+
+        Args:
+            modelo_linha (str): Modelo de linha comum.
+        """
+        super().__init__()
+        self.modelo_linha = modelo_linha
+
+    def visitar(self, item, campos):
+        """Gera a linha do item.
+        """
+        descricao = campos.obter('descricao_texto')
+
+        self.partes.append(self.modelo_linha.format(
+            nome=item.nome,
+            pai=item.pai.nome if item.pai is not None else '-',
+            tipo_elemento=item.categoria.value,
+            tipo=item.rotulo_tipo,
+            ocorrencia=campos.obter('descricao_ocorrencia'),
+            tamanho=campos.obter('descricao_tamanho'),
+            decimais=item.decimais,
+            descricao=descricao,
+        ))
+
+        return True
+
+
+class EmissorBusca(Emissor):
+    """Gera os documentos do índice de busca do Leiaute, um por item com
+        âncora na visão completa em HTML.
+
+    Cada parte é uma tupla com a âncora, o rótulo e os termos do item: nome,
+    caminho, descrição, regras e valores válidos.
+    """
+
+    def visitar(self, item, campos):
+        """Gera o documento do item. Os filhos de um item repetido não têm
+            âncoras próprias e não são visitados.
+        """
+        # O caminho sem o código do evento; o item do evento tem como caminho
+        # apenas o código.
+        relativo = item.caminho.partition('_')[2] or item.nome
+
+        textos = [item.nome, item.caminho, relativo]
+        textos.extend(item.descricao_completa or item.descricao)
+        textos.extend(item.regras)
+
+        termos = busca.extrair_termos(textos)
+
+        if item.valores_validos:
+            termos |= item.facetas.obter_termos()
+
+        self.partes.append((
+            item.caminho,
+            '{} {}'.format(item.leiaute.codigo, relativo.replace('_', '/')),
+            tuple(sorted(termos))))
+
+        return item.referencia is None or item.referencia == item
+
+
+def percorrer(item, emissores):
+    """Percorre uma única vez a árvore de itens a partir de um item,
+        alimentando todos os emissores.
+
+    O item inicial é visitado por todos os emissores. Cada filho é visitado
+    apenas pelos emissores que visitaram o pai, pediram os seus filhos e
+    aceitam o filho; a ordem das partes de cada emissor é a do percurso em
+    pré-ordem.
+
+    Args:
+        item (ItemLeiaute): Item inicial.
+
+        emissores (iterable): Emissores alimentados pelo percurso.
+    """
+    item.leiaute.contadores['percursos'] += 1
+
+    percorrer_item(item, list(emissores))
+
+
+def percorrer_item(item, emissores):
+    """Visita um item e os seus descendentes.
+
+    Args:
+        item (ItemLeiaute): Item visitado.
+
+        emissores (list): Emissores que visitam o item.
+    """
+    item.leiaute.contadores['visitas'] += 1
+
+    campos = CamposItem(item)
+    emissores = [
+        emissor for emissor in emissores if emissor.visitar(item, campos)]
+
+    if not emissores:
+        return
+
+    for filho in item.filhos:
+        aceitos = [emissor for emissor in emissores if emissor.aceitar(filho)]
+
+        if aceitos:
+            percorrer_item(filho, aceitos)
@@ -0,0 +1,124 @@
+from collections import deque
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+import cinto_utilidades as cinto
+
+
+def gravar_arquivo(caminho, partes):
+    """Grava o conteúdo de um arquivo texto.
+
+    Args:
+        caminho (str): Caminho do arquivo.
+
+        partes (list): Partes do conteúdo, gravadas na ordem da lista.
+    """
+    with cinto.obter_arquivo(caminho, 'w') as arquivo:
+        arquivo.writelines(partes)
+
+
+class EscritorArquivos:
+    """Representa a etapa de gravação dos arquivos gerados.
+
+    Os arquivos são gravados por um pool de threads enquanto a geração
+    continua; as threads liberam o GIL durante a escrita, o que sobrepõe a
+    espera pelo disco, em especial em sistemas de arquivos de rede, à
+    montagem das demais páginas. As falhas são reunidas e informadas apenas
+    quando todas as gravações terminam.
+    """
+
+    def __init__(self, threads=4, limite=None):
+        """Inicia uma nova instância da classe EscritorArquivos.
+
+        Args:
+            threads (int, optional): Quantidade de threads de gravação.
+                Defaults to 4.
+
+            limite (int, optional): Tamanho máximo, em bytes, do conteúdo que
+                aguarda gravação, estimado pelo comprimento dos textos. Ao
+                atingi-lo, o agendamento espera o término das gravações mais
+                antigas. Defaults to None, sem limite.
+        """
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix='escrita')
+        self.agendadas = 0
+        self.falhas = []
+        self.limite = limite
+        self.pendentes = deque()
+        self.tamanho_pendente = 0
+
+    def gravar(self, caminho, conteudo):
+        """Agenda a gravação de um arquivo.
+
+        O conteúdo não deve ser alterado depois de entregue ao escritor. Um
+        conteúdo que não seja texto nem lista, como um gerador, é consumido
+        durante a gravação e não é contado no limite.
+
+        Args:
+            caminho (str): Caminho do arquivo.
+
+            conteudo (str | list | iterable): Conteúdo do arquivo ou as suas
+                partes.
+
+        Returns:
+            Future: Resultado da gravação.
+        """
+        if isinstance(conteudo, str):
+            conteudo = (conteudo,)
+
+        futuro = self.executor.submit(gravar_arquivo, caminho, conteudo)
+        futuro.add_done_callback(
+            partial(self.registrar, self.agendadas, caminho))
+        self.agendadas += 1
+
+        if self.limite is not None and isinstance(conteudo, (list, tuple)):
+            self.limitar(sum([len(parte) for parte in conteudo]), futuro)
+
+        return futuro
+
+    def registrar(self, ordem, caminho, futuro):
+        """Registra o término de uma gravação, guardando apenas as falhas.
+
+        Args:
+            ordem (int): Ordem em que a gravação foi agendada.
+
+            caminho (str): Caminho do arquivo.
+
+            futuro (Future): Resultado da gravação.
+        """
+        erro = futuro.exception()
+
+        if erro is not None:
+            self.falhas.append((ordem, caminho, erro))
+
+    def limitar(self, tamanho, futuro):
+        """Contabiliza uma gravação agendada e espera o término das mais
+            antigas enquanto o conteúdo pendente exceder o limite.
+
+        Args:
+            tamanho (int): Tamanho do conteúdo agendado.
+
+            futuro (Future): Resultado da gravação agendada.
+        """
+        self.pendentes.append((tamanho, futuro))
+        self.tamanho_pendente += tamanho
+
+        while self.tamanho_pendente > self.limite and self.pendentes:
+            tamanho, futuro = self.pendentes.popleft()
+            wait((futuro,))
+            self.tamanho_pendente -= tamanho
+
+    def aguardar(self):
+        """Aguarda o término de todas as gravações agendadas.
+
+        Returns:
+            list: Caminho e erro de cada gravação que falhou, na ordem em que
+                foram agendadas.
+        """
+        self.executor.shutdown()
+
+        falhas = [(caminho, erro) for _, caminho, erro in sorted(
+            self.falhas, key=lambda falha: falha[0])]
+        self.falhas = []
+
+        return falhas
@@ -0,0 +1,154 @@
+import analise_xml
+import cinto_utilidades as cinto
+
+
+class NoEsquema:
+    """Representa um elemento de um XSD em uma forma normalizada e compacta.
+
+    O XSD é convertido uma única vez: os filhos são agrupados pela tag, sem o
+    namespace, e os textos dos elementos documentation de cada annotation já
+    ficam separados em uma tupla. A construção dos leiautes e a análise dos
+    tipos consultam apenas essa representação, sem depender da biblioteca
+    usada na análise do XML.
+    """
+
+    __slots__ = ('tag', 'atributos', 'filhos', 'grupos', 'documentacoes',
+                 'assinatura')
+
+    def __init__(self, tag, atributos, filhos=(), documentacoes=None):
+        """Inicia uma nova instância da classe NoEsquema.
+
+        Args:
+            tag (str): Tag do elemento, sem o namespace.
+
+            atributos (dict): Atributos do elemento.
+
+            filhos (iterable, optional): Filhos do elemento, na ordem do XSD.
+                Defaults to ().
+
+            documentacoes (tuple, optional): Textos dos elementos
+                documentation, para um elemento annotation. Nos demais
+                elementos, são obtidos do primeiro annotation filho.
+                Defaults to None.
+        """
+        self.tag = tag
+        self.atributos = atributos
+        self.filhos = tuple(filhos)
+        self.grupos = {}
+        self.documentacoes = documentacoes
+        self.assinatura = None
+
+        for filho in self.filhos:
+            grupo = self.grupos.get(filho.tag)
+
+            if grupo is None:
+                self.grupos[filho.tag] = [filho]
+            else:
+                grupo.append(filho)
+
+        if documentacoes is None and 'annotation' in self.grupos:
+            self.documentacoes = self.grupos['annotation'][0].documentacoes
+
+    def get(self, nome, padrao=None):
+        """Obtém o valor de um atributo.
+
+        Args:
+            nome (str): Nome do atributo.
+
+            padrao (object, optional): Valor retornado quando o atributo não
+                existe. Defaults to None.
+
+        Returns:
+            str: Valor do atributo.
+        """
+        return self.atributos.get(nome, padrao)
+
+    def filho(self, tag):
+        """Obtém o primeiro filho com uma tag.
+
+        Args:
+            tag (str): Tag do filho, sem o namespace.
+
+        Returns:
+            NoEsquema: Primeiro filho com a tag ou None.
+        """
+        grupo = self.grupos.get(tag)
+
+        return grupo[0] if grupo else None
+
+    def filhos_tag(self, tag):
+        """Obtém os filhos com uma tag.
+
+        Args:
+            tag (str): Tag dos filhos, sem o namespace.
+
+        Returns:
+            list: Filhos com a tag, na ordem do XSD.
+        """
+        return self.grupos.get(tag, ())
+
+    def iterar(self):
+        """Percorre o elemento e os seus descendentes.
+
+        Yields:
+            NoEsquema: O próprio elemento e cada descendente, em pré-ordem.
+        """
+        yield self
+
+        for filho in self.filhos:
+            yield from filho.iterar()
+
+    def obter_assinatura(self):
+        """Obtém uma representação imutável do conteúdo do elemento, usada em
+            chaves e hashes.
+
+        Returns:
+            tuple: Tag, atributos, documentações e assinaturas dos filhos.
+        """
+        if self.assinatura is None:
+            self.assinatura = (
+                self.tag, tuple(sorted(self.atributos.items())),
+                self.documentacoes if self.tag == 'annotation' else None,
+                tuple([filho.obter_assinatura() for filho in self.filhos]))
+
+        return self.assinatura
+
+
+def converter(elemento):
+    """Converte um elemento do XSD, e os seus descendentes, em NoEsquema.
+
+    Args:
+        elemento (Element): Elemento do XSD.
+
+    Returns:
+        NoEsquema: Representação normalizada do elemento.
+    """
+    tag = elemento.tag[34:]
+    atributos = elemento.attrib
+
+    # Os atributos do ElementTree já são um dicionário e não são alterados;
+    # os do lxml são copiados.
+    if type(atributos) is not dict:
+        atributos = dict(atributos)
+
+    if tag == 'annotation':
+        return NoEsquema(tag, atributos, documentacoes=tuple([
+            cinto.internalizar(documentation.text)
+            for documentation in elemento]))
+
+    return NoEsquema(tag, atributos, [converter(filho) for filho in elemento])
+
+
+def ler_esquema(caminho, backend=None):
+    """Analisa um arquivo XSD e o converte em NoEsquema.
+
+    Args:
+        caminho (str): Caminho do arquivo.
+
+        backend (str, optional): Backend de análise, 'lxml' ou 'etree'.
+            Defaults to None, que usa o backend padrão do processo.
+
+    Returns:
+        NoEsquema: Representação normalizada do elemento raiz do XSD.
+    """
+    return converter(analise_xml.analisar(caminho, backend))
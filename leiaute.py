@@ -1,16 +1,21 @@
-import copy
 from enum import Enum
+import copy
 import itertools
-import sys
-import re
+from time import perf_counter
 from modelos import Completo
 from modelos import Resumo
 from modelos import Geral
+from referencias import EVENTO
+from referencias import criar_referencias
+from referencias import registrar_referencia
+from tipos import combinar_extensao
 import cinto_utilidades as cinto
+import emissores
 
 
-NS = {'base': 'http://www.w3.org/2001/XMLSchema'}
-ANNOTATION = 'base:annotation'
+CONDICOES_PADRAO = {'O': None}
+VALORES_VAZIOS = {}
+OCORRENCIAS = {}
 
 
 class CategoriaItem(Enum):
@@ -38,55 +43,100 @@ class Leiaute:
         """Inicia uma nova instância da classe Leiaute.
 
         Args:
-            xml (Element): XSD que descreve o leiaute.
+            xml (NoEsquema): XSD que descreve o leiaute.
 
-            tipos_globais (dict): Conjunto de tipos reutilizáveis.
+            tipos_globais (RegistroTipos): Conjunto de tipos reutilizáveis.
 
         Raises:
             Exception: O primeiro elemento documentation não inicia com S-XXXX.
         """
+        inicio = perf_counter()
+
         self.tipos_locais = {}
 
-        self.referencias_regras = {}
+        self.referencias = criar_referencias()
+
+        self.ancoras = set()
+        self.links = set()
+
+        self.raiz = None
+        self.ancestrais = {}
+        self.referencias_invalidas = set()
+
+        self.tempos = {}
+        self.contadores = dict.fromkeys((
+            'itens', 'resolver_referencias', 'enumeracoes',
+            'valores_contextuais', 'percursos', 'visitas'), 0)
+        self.lido_cache = False
 
-        esocial = xml.find('base:element', NS)
+        esocial = xml.filho('element')
 
-        doc = list(esocial.find(ANNOTATION, NS))[0]
+        doc = esocial.documentacoes[0]
 
-        if not doc.text.startswith('S-'):
+        if not doc.startswith('S-'):
             raise Exception(
                 'O primeiro elemento documentation não inicia com S-XXXX')
 
-        self.codigo, self.descricao = doc.text.split(' - ', 1)
+        self.codigo, self.descricao = doc.split(' - ', 1)
+        self.tipos_referenciados = cinto.obter_tipos_referenciados(xml)
         self.primeira_ocorrencia_tipo = {}
         self.ultimo_numero = itertools.count(1)
 
-        for complex_type in xml.findall('base:complexType', NS):
-            complex_content = complex_type.find('base:complexContent', NS);
+        for complex_type in xml.filhos_tag('complexType'):
+            complex_content = complex_type.filho('complexContent')
 
             if complex_content is not None:
-                extension = complex_content.find('base:extension', NS)
+                extension = complex_content.filho('extension')
 
-                tipo = extension.attrib['base']
+                tipo = extension.atributos['base']
+                nome = complex_type.atributos['name']
 
                 if tipo in tipos_globais:
-                    copia = copy.deepcopy(tipos_globais[tipo])
+                    self.tipos_locais[nome] = tipos_globais.obter_extensao(
+                        nome, tipo, extension)
                 else:
-                    copia = copy.deepcopy(self.tipos_locais[tipo])
-
-                copia.attrib['name'] = complex_type.attrib['name']
-
-                for element in extension.find('base:sequence', NS):
-                    copia.find('base:sequence', NS).append(element)
-
-                self.tipos_locais[copia.attrib['name']] = copia
+                    self.tipos_locais[nome] = combinar_extensao(
+                        nome, self.tipos_locais[tipo], extension)
             else:
-                self.tipos_locais[complex_type.attrib['name']] = complex_type
+                self.tipos_locais[complex_type.atributos['name']] = complex_type
 
         self.raiz = ItemLeiaute(esocial, tipos_globais, self)
 
         self.nome = self.raiz.filhos[0].nome
 
+        # As referências resolvidas durante a construção só podem ser
+        # verificadas depois que o índice de ancestrais estiver completo.
+        self.referencias_invalidas.update(
+            (ancora, origem) for pagina, ancora, origem in self.links
+            if pagina == 'index.html' and ancora not in self.ancestrais)
+
+        self.tempos['construcao'] = perf_counter() - inicio
+
+    def __getstate__(self):
+        """Obtém o estado do Leiaute para serialização.
+
+        Os tipos locais (elementos XML) e o contador de numeração só são usados
+        durante a construção e não são serializados.
+
+        Returns:
+            dict: Estado do Leiaute.
+        """
+        estado = self.__dict__.copy()
+        del estado['tipos_locais']
+        del estado['ultimo_numero']
+
+        return estado
+
+    def __setstate__(self, estado):
+        """Restaura o estado do Leiaute após a serialização.
+
+        Args:
+            estado (dict): Estado do Leiaute.
+        """
+        self.__dict__.update(estado)
+        self.tipos_locais = {}
+        self.ultimo_numero = itertools.count(1)
+
     def imprimir_estrutura(
             self, item_atual=None, ultimo_filho=True, prefixo=''):
         """Imprime a estrutura do Leiaute.
@@ -128,14 +178,30 @@ class Leiaute:
         Returns:
             str: Representação do Leiaute em texto simples.
         """
+        resumo = emissores.EmissorTextoResumo()
+        completo = emissores.EmissorTextoCompleto()
 
-        txt = f'{self.codigo} - {self.nome}\n{self.descricao}\n\n'
+        emissores.percorrer(self.raiz, (resumo, completo))
 
-        txt += self.raiz.gerar_texto_resumo()
+        return ''.join(self.iterar_partes_texto(resumo, completo))
 
-        txt += self.raiz.gerar_texto_completo()
+    def iterar_partes_texto(self, resumo, completo):
+        """Monta a representação do Leiaute em texto simples a partir dos
+            emissores já alimentados pelo percurso.
 
-        return txt
+        Args:
+            resumo (EmissorTextoResumo): Emissor da visão resumida.
+
+            completo (EmissorTextoCompleto): Emissor da visão completa.
+
+        Yields:
+            str: Parte da representação do Leiaute em texto simples.
+        """
+        yield f'{self.codigo} - {self.nome}\n{self.descricao}\n\n'
+
+        yield from resumo.partes
+
+        yield from completo.partes
 
     def gerar_html(self):
         """Gera a representação do Leiaute em HTML.
@@ -143,32 +209,130 @@ class Leiaute:
         Returns:
             str: Representação do Leiaute em HTML.
         """
-        html = (
-            Resumo.CABECALHO.format(
-                self.nome, self.codigo, self.descricao)
-            + self.raiz.gerar_html_resumo()
-            + Geral.RODAPE_TABELA
-            + Resumo.LEGENDA)
+        resumo = emissores.EmissorHtmlResumo()
+        completo = emissores.EmissorHtmlCompleto()
+
+        emissores.percorrer(self.raiz, (resumo, completo))
+
+        return ''.join(self.iterar_partes_html(resumo, completo))
+
+    def iterar_partes_html(self, resumo, completo):
+        """Monta a representação do Leiaute em HTML a partir dos emissores já
+            alimentados pelo percurso.
+
+        Args:
+            resumo (EmissorHtmlResumo): Emissor da visão resumida.
+
+            completo (EmissorHtmlCompleto): Emissor da visão completa.
+
+        Yields:
+            str: Parte da representação do Leiaute em HTML.
+        """
+        self.ancoras.add(self.nome)
+
+        yield Resumo.CABECALHO.format(self.nome, self.codigo, self.descricao)
+        yield from resumo.partes
+        yield Geral.RODAPE_TABELA
+        yield Resumo.LEGENDA
 
         self.ultimo_numero = itertools.count(1)
 
-        html += (
-            Completo.CABECALHO.format(self.codigo, self.descricao)
-            + self.raiz.gerar_html_completo()
-            + Geral.RODAPE_TABELA)
+        yield Completo.CABECALHO.format(self.codigo, self.descricao)
+        yield from completo.partes
+        yield Geral.RODAPE_TABELA
+
+    def renderizar(self):
+        """Gera as representações do Leiaute em texto simples e em HTML e os
+            documentos do índice de busca com um único percurso da árvore de
+            itens.
 
-        return html
+        Os campos derivados de cada item, como a ocorrência e o tamanho, são
+        calculados uma vez e compartilhados por todos os emissores.
+
+        Returns:
+            tuple: Representações em texto simples e em HTML e documentos do
+                índice de busca.
+        """
+        texto = (emissores.EmissorTextoResumo(),
+                 emissores.EmissorTextoCompleto())
+        html = (emissores.EmissorHtmlResumo(),
+                emissores.EmissorHtmlCompleto())
+        busca = emissores.EmissorBusca()
+
+        emissores.percorrer(self.raiz, texto + html + (busca,))
+
+        return (''.join(self.iterar_partes_texto(*texto)),
+                ''.join(self.iterar_partes_html(*html)),
+                busca.partes)
+
+
+class LeiauteRenderizado:
+    """Representa as saídas geradas para um Leiaute, sem a árvore de itens.
+    """
+
+    def __init__(self, leiaute):
+        """Inicia uma nova instância da classe LeiauteRenderizado.
+
+        Args:
+            leiaute (Leiaute): Leiaute que será renderizado.
+        """
+        self.codigo = leiaute.codigo
+        self.nome = leiaute.nome
+        self.descricao = leiaute.descricao
+        self.referencias = leiaute.referencias
+        self.tipos_referenciados = leiaute.tipos_referenciados
+        self.tempos = dict(leiaute.tempos)
+        self.contadores = leiaute.contadores
+        self.lido_cache = leiaute.lido_cache
+
+        inicio = perf_counter()
+        self.texto, self.html, self.busca = leiaute.renderizar()
+        self.tempos['renderizacao'] = perf_counter() - inicio
+        self.ancoras = leiaute.ancoras
+        self.links = leiaute.links
+        self.referencias_invalidas = leiaute.referencias_invalidas
+
+    def resumir(self):
+        """Obtém uma cópia do leiaute sem o texto, o HTML, os documentos de
+            busca, os links e as referências gerados.
+
+        Os links devem ser registrados no grafo de links e as referências no
+        índice de referências antes do resumo. O próprio leiaute não é
+        alterado, pois pode estar guardado em um cache em memória.
+
+        Returns:
+            LeiauteRenderizado: Cópia com os metadados usados no sumário, no
+                mapa de âncoras e no relatório de tempos.
+        """
+        resumo = copy.copy(self)
+        resumo.texto = resumo.html = resumo.busca = resumo.referencias = None
+        resumo.links = ()
+
+        return resumo
 
 
 class ItemLeiaute:
     """Representa um item do leiaute.
+
+    Os atributos são declarados em __slots__ para reduzir a memória ocupada
+    por cada item, já que as árvores de todos os eventos ficam carregadas ao
+    mesmo tempo.
     """
 
+    __slots__ = (
+        'leiaute', 'nivel', 'pai', 'numeracao', 'nome', 'referencia',
+        'categoria', 'filhos', 'caminho', 'descricao', 'tipo', 'validacao',
+        'origem', 'evento_origem', 'descricao_completa', 'chaves', 'regras',
+        'condicoes', 'ocorrencia', 'valores_validos', 'tamanho_fixo',
+        'tamanho_lista', 'tamanho_faixa', 'decimais', 'rotulo_tipo',
+        'facetas',
+    )
+
     def __init__(self, xml, tipos_globais, leiaute, nivel=1, pai=None):
         """Inicia uma nova instância da classe ItemLeiaute.
 
         Args:
-            xml (Element): XSD que descreve o item.
+            xml (NoEsquema): XSD que descreve o item.
 
             tipos_globais (dict): Conjunto de tipos reutilizáveis.
 
@@ -179,6 +343,8 @@ class ItemLeiaute:
 
             pai (ItemLeiaute, optional): Pai do item. Defaults to None.
         """
+        leiaute.contadores['itens'] += 1
+
         self.analisar_definicao_item(xml, tipos_globais, leiaute, nivel, pai)
 
     def analisar_definicao_item(
@@ -186,7 +352,7 @@ class ItemLeiaute:
         """Analisa a definição do item para identificar suas propriedades.
 
         Args:
-            xml (Element): XSD que descreve o item.
+            xml (NoEsquema): XSD que descreve o item.
 
             tipos_globais (dict): Conjunto de tipos reutilizáveis.
 
@@ -200,14 +366,15 @@ class ItemLeiaute:
         Raises:
             Exception: Definição de tipo não encontrada.
         """
-        tag = xml.tag[34:]
+        tag = xml.tag
+        atributos = xml.atributos
 
         if tag == 'element' or tag == 'attribute':
             self.leiaute = leiaute
             self.nivel = nivel
             self.pai = pai
             self.numeracao = next(leiaute.ultimo_numero)
-            self.nome = xml.attrib['name']
+            self.nome = cinto.internalizar(atributos['name'])
             self.referencia = None
             self.categoria = CategoriaItem.GRUPO
             self.filhos = []
@@ -220,10 +387,18 @@ class ItemLeiaute:
             else:
                 self.caminho = '_'.join([self.pai.caminho, self.nome])
 
+            self.caminho = cinto.internalizar(self.caminho)
+
+            if pai is None:
+                leiaute.ancestrais[self.caminho] = (self.caminho,)
+            else:
+                leiaute.ancestrais[self.caminho] = \
+                    (self.caminho,) + leiaute.ancestrais[pai.caminho]
+
             definicao_tipo = None
 
-            if 'type' in xml.attrib:
-                self.tipo = xml.attrib['type']
+            if 'type' in atributos:
+                self.tipo = cinto.internalizar(atributos['type'])
 
                 if self.tipo.startswith(('T_', 'TS_')):
                     if self.tipo in leiaute.tipos_locais:
@@ -235,6 +410,9 @@ class ItemLeiaute:
                                         .format(self.tipo))
 
                 if self.tipo.startswith('T_'):
+                    registrar_referencia(
+                        leiaute.referencias, 'tipos', self.tipo, self)
+
                     if self.tipo not in leiaute.primeira_ocorrencia_tipo:
                         leiaute.primeira_ocorrencia_tipo[self.tipo] = self
                     else:
@@ -253,7 +431,7 @@ class ItemLeiaute:
                 if definicao_tipo is not None:
                     self.analisar_annotation(definicao_tipo)
             else:
-                definicao_tipo = xml.find('base:simpleType', NS)
+                definicao_tipo = xml.filho('simpleType')
 
                 if definicao_tipo is not None:
                     self.categoria = CategoriaItem.ELEMENTO
@@ -261,10 +439,10 @@ class ItemLeiaute:
                 self.tipo = None
 
             self.analisar_restrictions(
-                xml.attrib, definicao_tipo, tipos_globais)
+                atributos, definicao_tipo, tipos_globais)
 
-            for filho in xml:
-                tag_filho = filho.tag[34:]
+            for filho in xml.filhos:
+                tag_filho = filho.tag
 
                 if tag_filho == 'simpleType':
                     self.categoria = CategoriaItem.ELEMENTO
@@ -279,21 +457,22 @@ class ItemLeiaute:
                     self.analisar_definicao_item(
                         filho, tipos_globais, leiaute, nivel, self)
 
+            self.registrar_citacoes()
+            self.compactar()
+
         elif tag == 'complexType':
-            atributo = xml.find('base:attribute', NS)
+            atributo = xml.filho('attribute')
 
-            if atributo is not None and atributo.attrib['name'] == 'Id':
+            if atributo is not None and atributo.atributos['name'] == 'Id':
                 self.filhos.append(ItemLeiaute(
                     atributo, tipos_globais, leiaute, nivel + 1, self))
 
-            for filho in xml.findall('base:attribute', NS):
-                tag_filho = filho.tag[34:]
-
-                if tag_filho == 'attribute' and filho.attrib['name'] != 'Id':
+            for filho in xml.filhos_tag('attribute'):
+                if filho.atributos['name'] != 'Id':
                     self.filhos.append(ItemLeiaute(filho, tipos_globais, leiaute, nivel, self))
 
-            for filho in xml:
-                tag_filho = filho.tag[34:]
+            for filho in xml.filhos:
+                tag_filho = filho.tag
 
                 if tag_filho == 'annotation':
                     self.analisar_annotation(xml)
@@ -305,10 +484,10 @@ class ItemLeiaute:
             if tag == 'choice':
                 self.categoria = CategoriaItem.CHOICE
 
-            for filho in xml:
-                tag_filho = filho.tag[34:]
+            for filho in xml.filhos:
+                tag_filho = filho.tag
 
-                if 'ref' in filho.attrib:
+                if 'ref' in filho.atributos:
                     continue
                 elif tag_filho == 'choice':
                     self.analisar_definicao_item(
@@ -317,19 +496,66 @@ class ItemLeiaute:
                     self.filhos.append(ItemLeiaute(
                         filho, tipos_globais, leiaute, nivel + 1, self))
 
+    def registrar_citacoes(self):
+        """Registra no Leiaute as tabelas citadas na documentação do item e os
+            seus eventos de origem.
+        """
+        tabelas = {}
+
+        for nome in ('descricao', 'descricao_completa', 'validacao', 'origem',
+                     'evento_origem'):
+            for texto in getattr(self, nome, ()):
+                if 'Tabela ' in texto:
+                    tabelas.update(dict.fromkeys(cinto.TABELA.findall(texto)))
+
+        for texto in getattr(self, 'condicoes', CONDICOES_PADRAO).values():
+            if texto is not None and 'Tabela ' in texto:
+                tabelas.update(dict.fromkeys(cinto.TABELA.findall(texto)))
+
+        if self.valores_validos:
+            tabelas.update(dict.fromkeys(self.facetas.obter_tabelas()))
+
+        for tabela in tabelas:
+            registrar_referencia(
+                self.leiaute.referencias, 'tabelas', tabela, self)
+
+        if getattr(self, 'evento_origem', None):
+            for origem in dict.fromkeys(EVENTO.findall(
+                    '\n'.join(self.evento_origem))):
+                registrar_referencia(
+                    self.leiaute.referencias, 'eventos_origem', origem, self)
+
+    def compactar(self):
+        """Substitui os contêineres do item, já construído, por versões
+            imutáveis e compartilhadas.
+
+        As listas passam a tuplas, o que faz as vazias compartilharem a
+        mesma tupla vazia, e a falta de valores válidos passa a usar um único
+        dicionário vazio.
+        """
+        self.filhos = tuple(self.filhos)
+
+        for nome in ('descricao', 'validacao', 'origem', 'evento_origem',
+                     'descricao_completa', 'chaves', 'regras'):
+            if hasattr(self, nome):
+                setattr(self, nome, tuple(getattr(self, nome)))
+
+        if not self.valores_validos:
+            self.valores_validos = VALORES_VAZIOS
+
     def analisar_annotation(self, xml):
         """Analisa o elemento annotation para identificar a documentação e as
             restrições de preenchimento do item.
 
         Args:
-            xml (Element): XSD que descreve o item.
+            xml (NoEsquema): XSD que descreve o item.
         """
-        annotation = xml.find(ANNOTATION, NS)
-        if annotation is not None:
+        documentacoes = xml.documentacoes
+        if documentacoes is not None:
 
             if (not hasattr(self, 'descricao')
                     or self.descricao[0] != self.nome):
-                self.descricao = [annotation[0].text]
+                self.descricao = [documentacoes[0]]
 
             self.validacao = []
             self.origem = []
@@ -337,7 +563,7 @@ class ItemLeiaute:
             self.descricao_completa = []
             self.chaves = []
             self.regras = []
-            self.condicoes = {'O': None}
+            self.condicoes = CONDICOES_PADRAO
 
             documentacao = {
                 'validacao': self.validacao,
@@ -349,8 +575,7 @@ class ItemLeiaute:
 
             destino_documentacao = 'descricao'
 
-            for documentation in annotation[1:]:
-                texto = documentation.text
+            for texto in documentacoes[1:]:
 
                 if texto.startswith('Validação: '):
                     self.validacao.append(texto[11:])
@@ -372,11 +597,8 @@ class ItemLeiaute:
                     nome_regra = texto[6:]
                     self.regras.append(nome_regra)
 
-                    if nome_regra not in self.leiaute.referencias_regras:
-                        self.leiaute.referencias_regras[nome_regra] = []
-
-                    self.leiaute.referencias_regras[nome_regra].append(
-                        (self.caminho, self.gerar_trilha()))
+                    registrar_referencia(
+                        self.leiaute.referencias, 'regras', nome_regra, self)
 
                 elif texto.startswith('CONDICAO_GRUPO: '):
                     if ';' in texto:
@@ -404,9 +626,10 @@ class ItemLeiaute:
         Args:
             atributos (dict): Conjunto de atributos de um elemento.
 
-            definicao_tipo (Element): Elemento que contém a definição do tipo.
+            definicao_tipo (NoEsquema): Elemento que contém a definição do
+                tipo.
 
-            tipos_globais (dict): Conjunto de tipos reutilizáveis.
+            tipos_globais (RegistroTipos): Conjunto de tipos reutilizáveis.
         """
         minimo = '1'
         maximo = '1'
@@ -426,121 +649,32 @@ class ItemLeiaute:
             if 'use' in atributos and atributos['use'] == 'optional':
                 minimo = 0
 
-        self.ocorrencia = (minimo, maximo)
+        self.ocorrencia = OCORRENCIAS.setdefault(
+            (minimo, maximo), (minimo, maximo))
         self.valores_validos = {}
 
         if not self.categoria.agrupadora():
-            self.tamanho_fixo = None
-            self.tamanho_lista = None
-            self.tamanho_faixa = None
-
             if definicao_tipo is not None:
-                restriction = definicao_tipo.find('base:restriction', NS)
-
-                if restriction is not None:
-                    restriction = cinto.obter_restriction_final(
-                        restriction, tipos_globais)
-
-                    base = restriction.get('base')
-
-                    menor_tamanho = sys.maxsize
-                    maior_tamanho = 0
-
-                    for enum in restriction.findall('base:enumeration', NS):
-                        annotation = enum.find(ANNOTATION, NS)
-                        if annotation:
-                            descricoes = list(annotation)
-
-                            if len(descricoes) == 1:
-                                valor = cinto.codificar_sobrescrito(
-                                    cinto.resolver_referencias(
-                                        descricoes[0].text, self))
-
-                            else:
-                                self.valores_validos[descricoes[0].text] = ''
-
-                                valor = cinto.codificar_sobrescrito(
-                                    cinto.resolver_referencias(
-                                        descricoes[1].text, self))
-                        else:
-                            valor = None
-
-                        menor_tamanho = min(
-                            menor_tamanho, len(enum.attrib['value']))
-
-                        maior_tamanho = max(
-                            maior_tamanho, len(enum.attrib['value']))
-
-                        self.valores_validos[enum.attrib['value']] = valor
-
-                    if self.valores_validos:
-                        if menor_tamanho == maior_tamanho:
-                            self.tamanho_fixo = menor_tamanho
-                        else:
-                            self.tamanho_faixa = (menor_tamanho, maior_tamanho)
-
-                    tamanho_fixo = restriction.find('base:length', NS)
-                    if tamanho_fixo is not None:
-                        self.tamanho_fixo = int(tamanho_fixo.attrib['value'])
-
-                    tamanho_minimo = restriction.find('base:minLength', NS)
-                    tamanho_maximo = restriction.find('base:maxLength', NS)
-                    if tamanho_minimo is not None:
-                        self.tamanho_faixa = (
-                            tamanho_minimo.attrib['value'],
-                            tamanho_maximo.attrib['value'])
-
-                    padrao = restriction.find('base:pattern', NS)
-                    if padrao is not None and self.tamanho_fixo is None:
-                        regex = padrao.attrib['value']
-
-                        self.tamanho_lista = [int(item) for item in re.findall(
-                            r'\\d{(\d+)}', regex)]
-
-                        if len(self.tamanho_lista) == 1:
-                            if r'\d' in regex:
-                                posicao = regex.index(r'\d')
-                            else:
-                                posicao = 0
-
-                            self.tamanho_fixo = posicao + self.tamanho_lista[0]
-                            self.tamanho_lista = None
-
-                        if not self.tamanho_lista:
-                            match = re.match(r'(\\d|\\w){(\d+),(\d+)}', regex)
-                            if match:
-                                self.tamanho_faixa = (
-                                    match.group(2), match.group(3))
-
-                        if definicao_tipo.get('name') == 'TS_perApur':
-                            self.tamanho_lista = [4, 7]
-                            self.tamanho_fixo = None
-                            self.tamanho_faixa = None
-
-                    digitos_totais = restriction.find('base:totalDigits', NS)
-                    if digitos_totais is not None:
-                        self.tamanho_faixa = (1, digitos_totais.get('value'))
-
-                    fracao = restriction.find('base:fractionDigits', NS)
-                    if fracao is not None:
-                        self.decimais = fracao.get('value')
-                    else:
-                        self.decimais = '-'
-
-            elif 'type' in atributos:
-                base = atributos['type']
-
-            if base == 'xs:date':
-                self.rotulo_tipo = 'D'
-                self.tamanho_fixo = 10
-                self.decimais = '-'
-            elif base == 'xs:string' or base == 'xs:ID':
-                self.rotulo_tipo = 'C'
+                facetas = tipos_globais.obter_facetas(definicao_tipo)
             else:
-                self.rotulo_tipo = 'N'
+                facetas = tipos_globais.obter_facetas_primitivas(
+                    atributos.get('type'))
+
+            self.tamanho_fixo = facetas.tamanho_fixo
+            self.tamanho_lista = facetas.tamanho_lista
+            self.tamanho_faixa = facetas.tamanho_faixa
+            self.decimais = facetas.decimais
+            self.rotulo_tipo = facetas.rotulo_tipo
+            self.valores_validos = facetas.obter_valores_validos(self)
+            self.facetas = facetas
+
+            self.leiaute.contadores['enumeracoes'] += len(facetas.enumeracoes)
+            if facetas.contextual:
+                self.leiaute.contadores['valores_contextuais'] += 1
         else:
             self.rotulo_tipo = '-'
             self.decimais = '-'
+            self.facetas = None
 
     def gerar_html_completo(self, modelo_linha=Completo.LINHA,
                             modelo_referencia=Completo.REFERENCIA):
@@ -554,47 +688,10 @@ class ItemLeiaute:
         Returns:
             str: Representação do item em HTML.
         """
-        marcador_grupo = ''
-        nome = self.nome
-        id = nome
+        emissor = emissores.EmissorHtmlCompleto(modelo_linha, modelo_referencia)
+        emissores.percorrer(self, (emissor,))
 
-        if self.categoria.agrupadora():
-            marcador_grupo = ' class="grupo"'
-            if self.categoria == CategoriaItem.CHOICE:
-                marcador_grupo = ' class="grupo-choice"'
-
-            if self.referencia is not None and self.referencia != self:
-                id = '_'.join((self.pai.nome, id))
-
-            nome = Geral.LINK.format('r_{}'.format(self.caminho), self.nome)
-
-        html = modelo_linha.format(
-            indice='',
-            caminho=self.caminho,
-            marcador_grupo=marcador_grupo,
-            nome=nome,
-            pai=self.gerar_link_pai(),
-            tipo_elemento=self.categoria.value,
-            tipo=self.rotulo_tipo,
-            ocorrencia=self.gerar_descricao_ocorrencia(),
-            tamanho=self.gerar_descricao_tamanho(),
-            decimais=self.decimais,
-            descricao=self.gerar_descricao(),
-        )
-
-        if self.referencia is not None and self.referencia != self:
-            html += modelo_referencia.format(
-                nome=self.referencia.nome,
-                id=self.referencia.caminho,
-                nome_pai=self.referencia.pai.nome,
-                id_pai=self.referencia.pai.caminho
-            )
-            return html
-
-        for filho in self.filhos:
-            html += filho.gerar_html_completo(modelo_linha, modelo_referencia)
-
-        return html
+        return ''.join(emissor.partes)
 
     def gerar_html_resumo(self, modelo_linha=Resumo.LINHA,
                           modelo_referencia=Resumo.REFERENCIA):
@@ -608,41 +705,10 @@ class ItemLeiaute:
         Returns:
             str: Representação do item em HTML.
         """
-        identificador = self.nome
-
-        if self.referencia is not None:
-            identificador = '_'.join((self.pai.nome, identificador))
-
-        html = modelo_linha.format(
-            link_completo=self.caminho,
-            identificador_evento=self.leiaute.nome,
-            id_nome=identificador,
-            nome=self.nome,
-            pai=self.gerar_link_pai(),
-            nivel=self.nivel,
-            descricao=cinto.resolver_referencias(
-                self.descricao[0].rstrip('.'), None),
-            ocorrencia=self.gerar_descricao_ocorrencia(),
-            chave=self.gerar_descricao_chaves(),
-            condicao=self.gerar_descricao_condicoes(),
-        )
-
-        for filho in self.filhos:
-            if filho.categoria.agrupadora():
-                if self.referencia is None:
-                    html += filho.gerar_html_resumo(
-                        modelo_linha, modelo_referencia)
-                else:
-                    html += modelo_referencia.format(
-                        nome=self.referencia.nome,
-                        nome_pai=self.referencia.pai.nome,
-                        id_pai=self.referencia.pai.caminho,
-                        id=self.referencia.caminho
-                    )
+        emissor = emissores.EmissorHtmlResumo(modelo_linha, modelo_referencia)
+        emissores.percorrer(self, (emissor,))
 
-                    break
-
-        return html
+        return ''.join(emissor.partes)
 
     def gerar_descricao(self):
         """Gera a descrição do item.
@@ -650,6 +716,14 @@ class ItemLeiaute:
         Returns:
             str: Descrição do item.
         """
+        return ''.join(self.iterar_descricao())
+
+    def iterar_descricao(self):
+        """Gera a descrição do item, em partes.
+
+        Yields:
+            str: Parte da descrição do item.
+        """
         if self.descricao_completa:
             descricoes = self.descricao_completa
         else:
@@ -661,48 +735,48 @@ class ItemLeiaute:
             descricao, self) for descricao in descricoes])
 
         if self.valores_validos:
-            descricao += rotulo.format('Valores válidos:')
+            partes = [descricao, rotulo.format('Valores válidos:')]
             linha_cabecalho = ''
 
             for chave in self.valores_validos:
                 if self.valores_validos[chave] == '':
-                    descricao += '{}<br>\n{}'.format(linha_cabecalho, chave)
+                    partes.append('{}<br>\n{}'.format(linha_cabecalho, chave))
                 elif self.valores_validos[chave] is not None:
-                    descricao += ' - '.join((
-                        rotulo.format(chave), self.valores_validos[chave]))
+                    partes.append(' - '.join((
+                        rotulo.format(chave), self.valores_validos[chave])))
 
                     if linha_cabecalho == '':
                         linha_cabecalho = '<br>\n'
                 else:
-                    descricao += ' {},'.format(chave)
+                    partes.append(' {},'.format(chave))
+
+            descricao = ''.join(partes).rstrip(',')
 
-            descricao = descricao.rstrip(',')
+        yield descricao
 
         if self.origem:
-            descricao += rotulo.format('Origem:') + ' '
-            descricao += '<br>\n'.join([cinto.resolver_referencias(
+            yield rotulo.format('Origem:') + ' '
+            yield '<br>\n'.join([cinto.resolver_referencias(
                 origem, self) for origem in self.origem])
 
         if self.evento_origem:
-            descricao += rotulo.format('Evento de origem:') + ' '
-            descricao += '<br>\n'.join([cinto.resolver_referencias(
+            yield rotulo.format('Evento de origem:') + ' '
+            yield '<br>\n'.join([cinto.resolver_referencias(
                 origem, self) for origem in self.evento_origem])
 
         if self.validacao:
-            descricao += rotulo.format('Validação:') + ' '
-            descricao += '<br>\n'.join([cinto.resolver_referencias(
+            yield rotulo.format('Validação:') + ' '
+            yield '<br>\n'.join([cinto.resolver_referencias(
                 validacao, self) for validacao in self.validacao])
 
         if self.regras:
-            descricao += (
-                rotulo.format('Regra{} de validação:'.format(
-                    's' if len(self.regras) > 1 else '')))
+            yield rotulo.format('Regra{} de validação:'.format(
+                's' if len(self.regras) > 1 else ''))
 
             for regra in self.regras:
-                descricao += '<br>\n' + \
-                    Geral.LINK.format(regra, regra)
+                self.registrar_link('index.html', regra)
 
-        return descricao
+                yield '<br>\n' + Geral.LINK.format(regra, regra)
 
     def gerar_descricao_condicoes(self):
         """Gera a descrição das condições de uso do item.
@@ -744,6 +818,8 @@ class ItemLeiaute:
                 if '_' in chave:
                     rotulo = rotulo.replace('_', '/')
 
+                self.registrar_link('index.html', '{}_{}'.format(caminho, chave))
+
                 chaves.append(Geral.LINK.format('{}_{}'.format(
                     caminho, chave), rotulo) + marca_chave_evento)
 
@@ -779,17 +855,21 @@ class ItemLeiaute:
         elif self.tamanho_faixa:
             return '{}-{}'.format(*self.tamanho_faixa)
         elif self.tamanho_lista:
-            self.tamanho_lista.sort()
+            tamanho_lista = sorted(self.tamanho_lista)
             return '{} ou {}'.format(
-                ', '.join([str(item) for item in self.tamanho_lista[:-1]]),
-                self.tamanho_lista[-1])
+                ', '.join([str(item) for item in tamanho_lista[:-1]]),
+                tamanho_lista[-1])
         else:
             raise Exception(
                 'O tamanho do item {} não foi identificado.'.format(self.nome))
 
-    def gerar_trilha(self):
+    def gerar_trilha(self, separador=' &gt; '):
         """Gera uma trilha da hierarquia do item.
 
+        Args:
+            separador (str, optional): Separador entre os níveis da trilha.
+                Defaults to ' &gt; ', para uso em HTML.
+
         Returns:
             str: Trilha com hierarquia até o item.
         """
@@ -799,7 +879,7 @@ class ItemLeiaute:
             if self.pai.pai is None:
                 trilha = ''
             else:
-                trilha = self.pai.gerar_trilha() + ' &gt; '
+                trilha = self.pai.gerar_trilha(separador) + separador
         else:
             return ''
 
@@ -814,10 +894,22 @@ class ItemLeiaute:
         if self.pai is None:
             return ''
         else:
+            self.registrar_link('index.html', 'r_{}'.format(self.pai.caminho))
+
             return Geral.LINK.format(
                 'r_{}'.format(self.pai.caminho),
                 self.pai.nome)
 
+    def registrar_link(self, pagina, ancora):
+        """Registra no Leiaute um link gerado para o item.
+
+        Args:
+            pagina (str): Página de destino do link.
+
+            ancora (str): Âncora de destino do link.
+        """
+        self.leiaute.links.add((pagina, ancora, self.caminho))
+
     def gerar_texto_resumo(self, modelo_linha=Resumo.LINHA_TEXTO):
         """Gera a representação do item em texto simples para a visão resumida.
 
@@ -827,21 +919,10 @@ class ItemLeiaute:
         Returns:
             str: Representação do item em texto simples.
         """
-        texto = modelo_linha.format(
-            nivel=self.nivel,
-            nome=self.nome,
-            pai='-' if self.pai is None else self.pai.nome,
-            descricao=self.descricao[0],
-            ocorrencia=self.gerar_descricao_ocorrencia(),
-            chave=self.gerar_descricao_chaves_texto(),
-            condicao=self.gerar_descricao_condicoes_texto(),
-        )
+        emissor = emissores.EmissorTextoResumo(modelo_linha)
+        emissores.percorrer(self, (emissor,))
 
-        for filho in self.filhos:
-            if filho.categoria.agrupadora():
-                texto += filho.gerar_texto_resumo()
-
-        return texto
+        return ''.join(emissor.partes)
 
     def gerar_texto_completo(self, modelo_linha=Completo.LINHA_TEXTO):
         """Gera a representação do item em texto simples para a visão completa.
@@ -852,24 +933,10 @@ class ItemLeiaute:
         Returns:
             str: Representação do item em texto simples.
         """
-        html = modelo_linha.format(
-            nome=self.nome,
-            pai=self.pai.nome if self.pai is not None else '-',
-            tipo_elemento=self.categoria.value,
-            tipo=self.rotulo_tipo,
-            ocorrencia=self.gerar_descricao_ocorrencia(),
-            tamanho=self.gerar_descricao_tamanho(),
-            decimais=self.decimais,
-            descricao=self.gerar_descricao_texto(),
-        )
-
-        if '\n\n' in self.gerar_descricao_texto():
-            print('aqui')
-
-        for filho in self.filhos:
-            html += filho.gerar_texto_completo(modelo_linha)
+        emissor = emissores.EmissorTextoCompleto(modelo_linha)
+        emissores.percorrer(self, (emissor,))
 
-        return html
+        return ''.join(emissor.partes)
 
     def gerar_descricao_texto(self):
         """Gera a descrição do item.
@@ -0,0 +1,92 @@
+class GrafoLinks:
+    """Representa as âncoras e os links das páginas geradas.
+
+    As âncoras e os links são registrados durante a renderização, o que
+    permite verificar os links sem examinar o HTML produzido.
+    """
+
+    def __init__(self):
+        """Inicia uma nova instância da classe GrafoLinks.
+        """
+        self.ancoras = {}
+        self.links = {}
+
+    def registrar_ancora(self, pagina, ancora):
+        """Registra uma âncora de uma página.
+
+        Args:
+            pagina (str): Página que contém a âncora.
+
+            ancora (str): Identificador da âncora.
+        """
+        self.ancoras.setdefault(pagina, set()).add(ancora)
+
+    def registrar_ancoras(self, pagina, ancoras):
+        """Registra um conjunto de âncoras de uma página.
+
+        Args:
+            pagina (str): Página que contém as âncoras.
+
+            ancoras (iterable): Identificadores das âncoras.
+        """
+        self.ancoras.setdefault(pagina, set()).update(ancoras)
+
+    def registrar_link(self, pagina, destino, ancora, origem):
+        """Registra um link de uma página.
+
+        Args:
+            pagina (str): Página que contém o link.
+
+            destino (str): Página de destino do link.
+
+            ancora (str): Âncora de destino do link.
+
+            origem (str): Item, regra ou tabela que contém o link.
+        """
+        self.links.setdefault((pagina, destino, ancora), origem)
+
+    def registrar_links(self, pagina, links):
+        """Registra um conjunto de links de uma página.
+
+        Args:
+            pagina (str): Página que contém os links.
+
+            links (iterable): Tuplas com a página de destino, a âncora de
+                destino e a origem de cada link.
+        """
+        for destino, ancora, origem in links:
+            self.registrar_link(pagina, destino, ancora, origem)
+
+    def registrar_links_pendentes(self, pagina, links):
+        """Registra os links de uma página cujas âncoras de destino ainda não
+            foram registradas.
+
+        Os links já resolvidos não precisam ser guardados até a verificação;
+        registrar as âncoras de cada evento antes dos seus links mantém
+        apenas os links para outros eventos, regras e tabelas.
+
+        Args:
+            pagina (str): Página que contém os links.
+
+            links (iterable): Tuplas com a página de destino, a âncora de
+                destino e a origem de cada link.
+        """
+        vazio = frozenset()
+
+        for destino, ancora, origem in links:
+            if ancora not in self.ancoras.get(destino, vazio):
+                self.registrar_link(pagina, destino, ancora, origem)
+
+    def verificar(self):
+        """Verifica os links cujas âncoras de destino não existem.
+
+        Returns:
+            list: Tuplas com a página, a página de destino, a âncora de destino
+                e a origem de cada link quebrado.
+        """
+        vazio = frozenset()
+
+        return [
+            (pagina, destino, ancora, origem)
+            for (pagina, destino, ancora), origem in self.links.items()
+            if ancora not in self.ancoras.get(destino, vazio)]
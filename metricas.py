@@ -0,0 +1,95 @@
+import datetime
+import json
+from time import perf_counter
+import cinto_utilidades as cinto
+
+
+class RelatorioTempos:
+    """Representa o relatório de tempos da geração da documentação de uma
+        versão.
+
+    O relatório acumula o tempo de cada etapa da geração, marcada ao seu
+    término, e reúne os tempos e contadores registrados em cada Leiaute
+    durante a sua construção e renderização.
+    """
+
+    def __init__(self, caminho_leiaute):
+        """Inicia uma nova instância da classe RelatorioTempos.
+
+        Args:
+            caminho_leiaute (str): Diretório que contém os XSD da versão.
+        """
+        self.caminho_leiaute = caminho_leiaute
+        self.data = datetime.datetime.now().isoformat(timespec='seconds')
+        self.etapas = {}
+        self.contadores = {}
+        self.eventos = []
+        self.inicio = perf_counter()
+        self.ultimo = self.inicio
+
+    def marcar(self, etapa):
+        """Registra o tempo de uma etapa, medido desde a marcação anterior ou
+            desde o início do relatório. Os tempos de marcações repetidas da
+            mesma etapa são somados.
+
+        Args:
+            etapa (str): Nome da etapa.
+        """
+        agora = perf_counter()
+
+        self.etapas[etapa] = self.etapas.get(etapa, 0) + agora - self.ultimo
+        self.ultimo = agora
+
+    def contar(self, contador, quantidade=1):
+        """Incrementa um contador da versão.
+
+        Args:
+            contador (str): Nome do contador.
+
+            quantidade (int, optional): Valor somado ao contador.
+                Defaults to 1.
+        """
+        self.contadores[contador] = self.contadores.get(contador, 0) + \
+            quantidade
+
+    def registrar_eventos(self, leiautes):
+        """Registra os tempos e contadores de cada evento da versão.
+
+        Args:
+            leiautes (list): Leiautes renderizados da versão.
+        """
+        for leiaute in leiautes:
+            self.eventos.append({
+                'codigo': leiaute.codigo,
+                'nome': leiaute.nome,
+                'lido_cache': leiaute.lido_cache,
+                'tempos': dict(leiaute.tempos),
+                'contadores': dict(leiaute.contadores),
+            })
+
+            for contador, quantidade in leiaute.contadores.items():
+                self.contar(contador, quantidade)
+
+    def gerar(self):
+        """Gera o conteúdo do relatório.
+
+        Returns:
+            dict: Etapas, contadores e eventos da versão.
+        """
+        return {
+            'versao': self.caminho_leiaute,
+            'data': self.data,
+            'etapas': dict(self.etapas, total=self.ultimo - self.inicio),
+            'contadores': self.contadores,
+            'eventos': self.eventos,
+        }
+
+    def gravar(self, caminho):
+        """Grava o relatório em JSON.
+
+        Args:
+            caminho (str): Caminho do arquivo do relatório.
+        """
+        with cinto.obter_arquivo(caminho, 'w') as arquivo:
+            json.dump(self.gerar(), arquivo, ensure_ascii=False, indent=2)
+            arquivo.write('\n')
@@ -28,7 +28,8 @@ class Tabela:
         ' class="table is-fullwidth is-bordered tabela quebra-anterior">\n'
         '<thead>\n'
         '<tr>\n'
-        '<th id="t_{}" colspan="{}">Tabela {} - {}</th>\n'
+        '<th id="t_{}" colspan="{}">'
+        '<a title="Ver citações">Tabela {} - {}</a></th>\n'
         '</tr>\n'
         '<tr class="grupo">\n'
         '{}'
@@ -36,6 +37,23 @@ class Tabela:
         '</thead>\n'
         '<tbody>\n')
 
+    LINHA_REFERENCIA = (
+        '<li><a href="index.html#{id}">{evento} - {trilha}</a></li>')
+
+    LINHA_MODAL_REFERENCIA = (
+        '<div class="modal" id="r_t_{numero}">\n'
+        '<div class="modal-background"></div>\n'
+        '<div class="modal-card">\n'
+        '<header class="modal-card-head">\n'
+        '<p class="modal-card-title">Campos que citam a Tabela {numero}</p>\n'
+        '<button class="delete" aria-label="close"></button>\n'
+        '</header>\n'
+        '<div class="modal-card-body">\n'
+        '<ul>{texto}</ul>\n'
+        '</div>\n'
+        '</div>\n'
+        '</div>\n')
+
 
 class Regra:
     LINHA = (
@@ -112,6 +130,8 @@ class Resumo:
         '<a href="#{nome}">{codigo} - {descricao}</a>'
         '</li>\n')
 
+    PAGINA_EVENTO = '<div class="evento" data-pagina="{pagina}"></div>\n'
+
     REFERENCIA = (
         '<tr>\n'
         '<td>...</td>\n'
@@ -219,3 +239,33 @@ class Completo:
         '<th>Dec.</th>\n'
         '<th>Descrição</th>\n'
         '</tr>\n')
+
+
+class Diferenca:
+    LINHA_INDICE = (
+        '<li>'
+        '<a href="#{codigo}">{codigo} - {descricao}</a> ({situacao})'
+        '</li>\n')
+
+    CABECALHO = (
+        '\n'
+        '<h3 id="{codigo}" class="title has-text-centered quebra-anterior">'
+        '{codigo} - {descricao} ({situacao})</h3>\n'
+        '<table class="table is-fullwidth is-bordered diferencas">\n'
+        '<tbody>\n'
+        '<tr>\n'
+        '<th>Situação</th>\n'
+        '<th>Campo</th>\n'
+        '<th>Alterações</th>\n'
+        '</tr>\n')
+
+    LINHA = (
+        '<tr>\n'
+        '<td>{situacao}</td>\n'
+        '<td>{campo}</td>\n'
+        '<td>{alteracoes}</td>\n'
+        '</tr>\n')
+
+    LINK = '<a href="index.html#{}">{}</a>'
+
+    ALTERACAO = '<strong>{rotulo}:</strong> {antes} &rarr; {depois}'
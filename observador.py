@@ -0,0 +1,132 @@
+import os
+import time
+from time import perf_counter
+
+
+def capturar_estado(caminhos):
+    """Obtém a data de modificação e o tamanho de um conjunto de arquivos.
+
+    Os diretórios são percorridos recursivamente. Caminhos inexistentes são
+    ignorados, o que permite observar arquivos que ainda serão criados.
+
+    Args:
+        caminhos (iterable): Caminhos dos arquivos e diretórios observados.
+
+    Returns:
+        dict: Data de modificação em nanossegundos e tamanho, indexados pelo
+            caminho de cada arquivo.
+    """
+    arquivos = []
+
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            for raiz, _, nomes in os.walk(caminho):
+                arquivos.extend([os.path.join(raiz, nome) for nome in nomes])
+        else:
+            arquivos.append(caminho)
+
+    estado = {}
+
+    for arquivo in arquivos:
+        try:
+            situacao = os.stat(arquivo)
+        except OSError:
+            continue
+
+        estado[arquivo] = (situacao.st_mtime_ns, situacao.st_size)
+
+    return estado
+
+
+class ObservadorVersoes:
+    """Representa a observação, por consulta periódica, dos arquivos de
+        entrada de um conjunto de versões.
+
+    A consulta usa apenas os.stat, sem depender de notificações do sistema
+    operacional.
+    """
+
+    def __init__(self, caminhos, obter_arquivos, intervalo=0.25):
+        """Inicia uma nova instância da classe ObservadorVersoes.
+
+        Args:
+            caminhos (list): Diretórios das versões.
+
+            obter_arquivos (callable): Função que recebe o diretório de uma
+                versão e retorna os arquivos e diretórios observados.
+
+            intervalo (float, optional): Intervalo entre as consultas, em
+                segundos. Defaults to 0.25.
+        """
+        self.caminhos = caminhos
+        self.obter_arquivos = obter_arquivos
+        self.intervalo = intervalo
+        self.estados = {caminho: capturar_estado(obter_arquivos(caminho))
+                        for caminho in caminhos}
+
+    def verificar(self):
+        """Identifica as versões com arquivos alterados, criados ou removidos
+            desde a verificação anterior.
+
+        Returns:
+            list: Diretórios das versões alteradas.
+        """
+        alteradas = []
+
+        for caminho in self.caminhos:
+            estado = capturar_estado(self.obter_arquivos(caminho))
+
+            if estado != self.estados[caminho]:
+                self.estados[caminho] = estado
+                alteradas.append(caminho)
+
+        return alteradas
+
+    def aguardar_alteracoes(self):
+        """Aguarda até que alguma versão seja alterada e que as gravações
+            terminem.
+
+        Um editor pode gravar um arquivo em várias etapas; as alterações só são
+        informadas depois de uma consulta sem novas alterações.
+
+        Returns:
+            list: Diretórios das versões alteradas.
+        """
+        alteradas = []
+
+        while True:
+            time.sleep(self.intervalo)
+            novas = self.verificar()
+
+            if not novas and alteradas:
+                return alteradas
+
+            alteradas.extend(
+                [caminho for caminho in novas if caminho not in alteradas])
+
+    def observar(self, gerar):
+        """Gera novamente as versões alteradas até a interrupção pelo
+            usuário.
+
+        Os erros da geração, como um XSD salvo pela metade, são informados
+        sem encerrar a observação.
+
+        Args:
+            gerar (callable): Função que recebe a lista de diretórios das
+                versões alteradas e gera a sua documentação.
+        """
+        print('Observando alterações. Pressione Ctrl+C para encerrar.')
+
+        while True:
+            alteradas = self.aguardar_alteracoes()
+            inicio = perf_counter()
+
+            try:
+                gerar(alteradas)
+            except Exception as erro:
+                print('Erro na geração: {}: {}'.format(
+                    type(erro).__name__, erro))
+                continue
+
+            print('Versões geradas novamente em {:.3f} s: {}'.format(
+                perf_counter() - inicio, ', '.join(alteradas)))
@@ -0,0 +1,525 @@
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+import multiprocessing
+import threading
+from time import perf_counter
+from esquema import ler_esquema
+from leiaute import Leiaute
+from leiaute import LeiauteRenderizado
+import cinto_utilidades as cinto
+
+tipos_processo = {}
+backend_processo = None
+
+
+def iniciar_processo(backend_xml):
+    """Prepara um processo do pool com o backend de análise do orquestrador
+        que o criou.
+
+    Args:
+        backend_xml (str): Backend de análise, 'lxml' ou 'etree', ou None
+            para o backend padrão.
+    """
+    global backend_processo
+
+    backend_processo = backend_xml
+
+
+def obter_tipos_processo(caminho_tipos, chave_tipos):
+    """Obtém os tipos reutilizáveis no processo atual.
+
+    O arquivo tipos.xsd é analisado uma única vez por processo enquanto o seu
+    conteúdo não mudar. Apenas os tipos do conteúdo atual de cada arquivo são
+    mantidos, para que as edições do modo de observação não acumulem tipos
+    nos processos do pool.
+
+    Args:
+        caminho_tipos (str): Caminho do arquivo tipos.xsd.
+
+        chave_tipos (str): Hash do conteúdo do arquivo tipos.xsd.
+
+    Returns:
+        RegistroTipos: Conjunto de tipos reutilizáveis.
+    """
+    atual = tipos_processo.get(caminho_tipos)
+
+    if atual is None or atual[0] != chave_tipos:
+        atual = tipos_processo[caminho_tipos] = (
+            chave_tipos,
+            cinto.obter_tipos_globais(caminho_tipos, backend_processo))
+
+    return atual[1]
+
+
+def analisar_leiaute(caminho, tipos_globais, backend_xml=None):
+    """Analisa o XSD de um evento e constrói o seu Leiaute, registrando o
+        tempo da análise.
+
+    Args:
+        caminho (str): Caminho do XSD do evento.
+
+        tipos_globais (RegistroTipos): Conjunto de tipos reutilizáveis.
+
+        backend_xml (str, optional): Backend de análise, 'lxml' ou 'etree'.
+            Defaults to None, que usa o backend padrão do processo.
+
+    Returns:
+        Leiaute: Leiaute do evento.
+    """
+    inicio = perf_counter()
+    xml = ler_esquema(caminho, backend_xml)
+    tempo = perf_counter() - inicio
+
+    leiaute = Leiaute(xml, tipos_globais)
+    leiaute.tempos['analise'] = tempo
+
+    return leiaute
+
+
+def construir_leiaute(caminho, caminho_tipos, chave_tipos):
+    """Analisa o XSD de um evento e constrói o seu Leiaute.
+
+    Args:
+        caminho (str): Caminho do XSD do evento.
+
+        caminho_tipos (str): Caminho do arquivo tipos.xsd.
+
+        chave_tipos (str): Hash do conteúdo do arquivo tipos.xsd.
+
+    Returns:
+        Leiaute: Leiaute do evento.
+    """
+    return analisar_leiaute(
+        caminho, obter_tipos_processo(caminho_tipos, chave_tipos),
+        backend_processo)
+
+
+def marcar_lidos_cache(leiautes):
+    """Marca os leiautes lidos do cache e descarta os tempos e os contadores
+        registrados na execução que os gerou.
+
+    Os contadores são zerados, e não removidos, para que o trabalho feito em
+    uma execução anterior não seja somado aos totais da versão.
+
+    Args:
+        leiautes (list): Leiautes lidos do cache. Posições sem leiaute têm o
+            valor None e são ignoradas.
+    """
+    for leiaute in leiautes:
+        if leiaute is not None:
+            leiaute.tempos = {}
+            leiaute.contadores = dict.fromkeys(leiaute.contadores, 0)
+            leiaute.lido_cache = True
+
+
+class RegistroCompartilhado:
+    """Representa um registro de insumos compartilhados entre as versões.
+
+    Cada insumo é produzido uma única vez, mesmo quando solicitado por várias
+    threads ao mesmo tempo; as demais aguardam o resultado da primeira. Como
+    no CacheMemoria, cada chamada de descartar_excedentes remove os insumos
+    que não foram solicitados desde a chamada anterior.
+    """
+
+    def __init__(self):
+        """Inicia uma nova instância da classe RegistroCompartilhado.
+        """
+        self.trava = threading.Lock()
+        self.itens = {}
+        self.usadas = set()
+
+    def obter(self, chave, fabrica, *argumentos):
+        """Obtém um insumo do registro, produzindo-o caso não exista.
+
+        Args:
+            chave (object): Chave do insumo.
+
+            fabrica (callable): Função que produz o insumo.
+
+            argumentos: Argumentos repassados para a função.
+
+        Returns:
+            object: Insumo produzido pela função.
+        """
+        with self.trava:
+            futuro = self.itens.get(chave)
+            produtor = futuro is None
+            self.usadas.add(chave)
+
+            if produtor:
+                futuro = self.itens[chave] = Future()
+
+        if produtor:
+            try:
+                futuro.set_result(fabrica(*argumentos))
+            except BaseException as erro:
+                futuro.set_exception(erro)
+
+                # Um insumo que falhou não fica registrado, para que uma
+                # próxima geração no mesmo processo possa produzi-lo.
+                with self.trava:
+                    del self.itens[chave]
+
+        return futuro.result()
+
+    def obter_por_conteudo(self, caminho, fabrica, *argumentos):
+        """Obtém um insumo produzido a partir de um arquivo ou diretório,
+            indexado pelo hash do seu conteúdo.
+
+        Args:
+            caminho (str): Caminho do arquivo ou diretório.
+
+            fabrica (callable): Função que recebe o caminho e produz o insumo.
+
+            argumentos: Demais argumentos repassados para a função.
+
+        Returns:
+            object: Insumo produzido pela função.
+        """
+        return self.obter(
+            (fabrica, cinto.calcular_hash(caminho)), fabrica, caminho,
+            *argumentos)
+
+    def descartar_excedentes(self):
+        """Remove os insumos que não foram solicitados desde a chamada
+            anterior.
+
+        Returns:
+            int: Quantidade de insumos removidos.
+        """
+        with self.trava:
+            removidas = [chave for chave in self.itens
+                         if chave not in self.usadas]
+
+            for chave in removidas:
+                del self.itens[chave]
+
+            self.usadas = set()
+
+        return len(removidas)
+
+    def limpar(self):
+        """Remove todos os insumos do registro.
+
+        Returns:
+            int: Quantidade de insumos removidos.
+        """
+        with self.trava:
+            removidas = len(self.itens)
+            self.itens = {}
+            self.usadas = set()
+
+        return removidas
+
+
+class Orquestrador:
+    """Representa o agendador da geração simultânea de várias versões.
+    """
+
+    def __init__(self, processos=1, cache=None, relatorio_tempos=False,
+                 paginas_eventos=False, threads_escrita=4, limite_memoria=None,
+                 backend_xml=None):
+        """Inicia uma nova instância da classe Orquestrador.
+
+        Args:
+            processos (int, optional): Quantidade de processos usados na
+                construção dos leiautes. Defaults to 1.
+
+            cache (CacheLeiautes, optional): Cache em disco dos leiautes já
+                construídos. Defaults to None.
+
+            relatorio_tempos (bool, optional): Indica se o relatório de
+                tempos de cada versão deve ser gravado. Defaults to False.
+
+            paginas_eventos (bool, optional): Indica se cada evento deve ser
+                gravado em uma página própria, carregada sob demanda pelo
+                índice. Defaults to False.
+
+            threads_escrita (int, optional): Quantidade de threads que gravam
+                os arquivos de cada versão. Defaults to 4.
+
+            limite_memoria (int, optional): Tamanho máximo aproximado, em
+                bytes, do conteúdo gerado que aguarda gravação e dos termos de
+                busca mantidos em memória. Quando informado, os eventos são
+                construídos, gravados e descartados aos poucos.
+                Defaults to None.
+
+            backend_xml (str, optional): Backend de análise dos XSD, 'lxml'
+                ou 'etree', usado pelo orquestrador e pelos processos do seu
+                pool. Defaults to None, que usa o backend padrão do processo.
+        """
+        self.processos = processos
+        self.cache = cache
+        self.relatorio_tempos = relatorio_tempos
+        self.paginas_eventos = paginas_eventos
+        self.threads_escrita = threads_escrita
+        self.limite_memoria = limite_memoria
+        self.backend_xml = backend_xml
+        self.registro = RegistroCompartilhado()
+        self.executor = None
+
+    def obter_ativo(self, caminho):
+        """Obtém o conteúdo de um arquivo de ativos, lido uma única vez para
+            cada conteúdo.
+
+        Args:
+            caminho (str): Caminho do arquivo.
+
+        Returns:
+            str: Conteúdo do arquivo.
+        """
+        return self.registro.obter_por_conteudo(caminho, cinto.ler_arquivo)
+
+    def obter_tipos(self, caminho_tipos):
+        """Obtém os tipos reutilizáveis de um arquivo tipos.xsd, analisado uma
+            única vez para cada conteúdo.
+
+        Args:
+            caminho_tipos (str): Caminho do arquivo tipos.xsd.
+
+        Returns:
+            RegistroTipos: Conjunto de tipos reutilizáveis.
+        """
+        return self.registro.obter_por_conteudo(
+            caminho_tipos, cinto.obter_tipos_globais, self.backend_xml)
+
+    def carregar_eventos(self, caminhos, caminho_tipos, mensagens=None):
+        """Obtém os leiautes renderizados de um conjunto de eventos.
+
+        Com o cache ativo, o HTML e o texto de um evento só são gerados
+        novamente quando o seu XSD ou algum tipo de tipos.xsd do qual ele
+        depende for alterado.
+
+        Args:
+            caminhos (list): Caminhos dos XSD dos eventos.
+
+            caminho_tipos (str): Caminho do arquivo tipos.xsd.
+
+            mensagens (list, optional): Mensagens da versão, que recebem os
+                tempos do cache. Defaults to None, que não os informa.
+
+        Returns:
+            list: Leiautes renderizados na mesma ordem dos caminhos informados.
+        """
+        if self.cache is None:
+            return [LeiauteRenderizado(item) for item in
+                    self.construir_leiautes(caminhos, caminho_tipos)]
+
+        tipos_globais = self.obter_tipos(caminho_tipos)
+        resumos_tipos = self.registro.obter(
+            (cinto.resumir_tipos, cinto.calcular_hash(caminho_tipos)),
+            cinto.resumir_tipos, tipos_globais)
+
+        inicio = perf_counter()
+        hashes = [cinto.calcular_hash(caminho) for caminho in caminhos]
+        eventos = []
+
+        for hash_evento in hashes:
+            tipos_referenciados = self.cache.obter(
+                self.cache.calcular_chave('tipos', hash_evento))
+
+            if tipos_referenciados is None:
+                eventos.append(None)
+            else:
+                eventos.append(self.cache.obter(self.cache.calcular_chave(
+                    'evento', hash_evento, cinto.calcular_assinatura_tipos(
+                        tipos_referenciados, resumos_tipos))))
+
+        tempo_cache = perf_counter() - inicio
+
+        ausentes = [indice for indice, item in enumerate(eventos)
+                    if item is None]
+
+        marcar_lidos_cache(eventos)
+
+        # As árvores não são guardadas no cache: a chave do leiaute inclui
+        # todo o tipos.xsd e é mais restrita que a do evento, então um evento
+        # ausente do cache nunca encontraria a sua árvore.
+        inicio = perf_counter()
+        leiautes = self.construir_leiautes(
+            [caminhos[indice] for indice in ausentes], caminho_tipos)
+
+        for indice, item in zip(ausentes, leiautes):
+            eventos[indice] = LeiauteRenderizado(item)
+
+            self.cache.gravar(
+                self.cache.calcular_chave('tipos', hashes[indice]),
+                item.tipos_referenciados)
+            self.cache.gravar(
+                self.cache.calcular_chave(
+                    'evento', hashes[indice], cinto.calcular_assinatura_tipos(
+                        item.tipos_referenciados, resumos_tipos)),
+                eventos[indice])
+
+        tempo_renderizacao = perf_counter() - inicio
+
+        if mensagens is not None:
+            mensagens.append(
+                'Eventos lidos do cache: {} ({:.3f} s); renderizados: {} ({:.3f} s)'
+                .format(len(caminhos) - len(ausentes), tempo_cache,
+                        len(ausentes), tempo_renderizacao))
+
+        return eventos
+
+    def iterar_eventos(self, caminhos, caminho_tipos):
+        """Percorre os leiautes renderizados de um conjunto de eventos,
+            construídos aos poucos.
+
+        Cada vez são construídos apenas tantos eventos quanto os processos do
+        pool; as árvores de itens de um grupo são descartadas antes que o
+        grupo seguinte seja construído.
+
+        Args:
+            caminhos (list): Caminhos dos XSD dos eventos.
+
+            caminho_tipos (str): Caminho do arquivo tipos.xsd.
+
+        Yields:
+            LeiauteRenderizado: Leiaute de cada evento, na mesma ordem dos
+                caminhos informados.
+        """
+        tamanho_grupo = max(1, self.processos)
+
+        for inicio in range(0, len(caminhos), tamanho_grupo):
+            eventos = self.carregar_eventos(
+                caminhos[inicio:inicio + tamanho_grupo], caminho_tipos)
+            eventos.reverse()
+
+            # Os leiautes são retirados da lista para que cada um seja
+            # liberado assim que o chamador o descartar.
+            while eventos:
+                yield eventos.pop()
+
+    def carregar_leiautes(self, caminhos, caminho_tipos, mensagens=None):
+        """Obtém os leiautes de um conjunto de eventos.
+
+        Com o cache ativo, os leiautes cujos XSD não mudaram são lidos do cache
+        e apenas os demais são construídos.
+
+        Args:
+            caminhos (list): Caminhos dos XSD dos eventos.
+
+            caminho_tipos (str): Caminho do arquivo tipos.xsd.
+
+            mensagens (list, optional): Mensagens da versão, que recebem os
+                tempos das duas etapas. Defaults to None, que não os informa.
+
+        Returns:
+            list: Leiautes na mesma ordem dos caminhos informados.
+        """
+        if self.cache is None or not caminhos:
+            return self.construir_leiautes(caminhos, caminho_tipos)
+
+        chave_tipos = cinto.calcular_hash(caminho_tipos)
+        chaves = [self.cache.calcular_chave(
+            'leiaute', cinto.calcular_hash(caminho), chave_tipos)
+            for caminho in caminhos]
+
+        inicio = perf_counter()
+        leiautes = [self.cache.obter(chave) for chave in chaves]
+        tempo_cache = perf_counter() - inicio
+
+        ausentes = [indice for indice, item in enumerate(leiautes)
+                    if item is None]
+
+        marcar_lidos_cache(leiautes)
+
+        inicio = perf_counter()
+        construidos = self.construir_leiautes(
+            [caminhos[indice] for indice in ausentes], caminho_tipos)
+
+        for indice, item in zip(ausentes, construidos):
+            leiautes[indice] = item
+            self.cache.gravar(chaves[indice], item)
+
+        tempo_construcao = perf_counter() - inicio
+
+        if mensagens is not None:
+            mensagens.append(
+                'Leiautes lidos do cache: {} ({:.3f} s); construídos: {} ({:.3f} s)'
+                .format(len(caminhos) - len(ausentes), tempo_cache,
+                        len(ausentes), tempo_construcao))
+
+        return leiautes
+
+    def construir_leiautes(self, caminhos, caminho_tipos):
+        """Constrói os leiautes de um conjunto de eventos.
+
+        Com o pool de processos ativo, cada evento é analisado em um processo e
+        o Leiaute retorna serializado sem os elementos XML usados na construção.
+
+        Args:
+            caminhos (list): Caminhos dos XSD dos eventos.
+
+            caminho_tipos (str): Caminho do arquivo tipos.xsd.
+
+        Returns:
+            list: Leiautes na mesma ordem dos caminhos informados.
+        """
+        if self.executor is None or len(caminhos) <= 1:
+            tipos_globais = self.obter_tipos(caminho_tipos)
+
+            return [analisar_leiaute(caminho, tipos_globais, self.backend_xml)
+                    for caminho in caminhos]
+
+        return list(self.executor.map(
+            construir_leiaute,
+            caminhos,
+            repeat(caminho_tipos),
+            repeat(cinto.calcular_hash(caminho_tipos))))
+
+    def iniciar(self):
+        """Inicia o pool de processos usado na construção dos leiautes.
+
+        O pool permanece ativo entre as gerações até o encerramento, o que
+        mantém os tipos já analisados em cada processo.
+        """
+        if self.processos > 1 and self.executor is None:
+            # Os processos são criados com spawn porque as threads das versões
+            # já estão em execução quando o pool inicia seus processos.
+            self.executor = ProcessPoolExecutor(
+                self.processos, multiprocessing.get_context('spawn'),
+                initializer=iniciar_processo, initargs=(self.backend_xml,))
+
+    def encerrar(self):
+        """Encerra o pool de processos, caso esteja ativo.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def executar(self, caminhos, gerar):
+        """Gera a documentação de várias versões simultaneamente.
+
+        Um pool de processos iniciado antes da chamada é mantido; caso
+        contrário, o pool é criado para a geração e encerrado ao seu término.
+
+        Args:
+            caminhos (list): Diretórios das versões.
+
+            gerar (callable): Função que recebe o diretório de uma versão e o
+                orquestrador e gera a sua documentação.
+        """
+        temporario = self.executor is None
+        self.iniciar()
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(caminhos)) as versoes:
+                futuros = [versoes.submit(gerar, caminho, self)
+                           for caminho in caminhos]
+
+                for futuro in futuros:
+                    futuro.result()
+
+            if self.cache is not None:
+                self.cache.descartar_excedentes()
+        finally:
+            # Os insumos de conteúdos que já mudaram, como as versões
+            # anteriores de um arquivo editado no modo de observação, não
+            # são mais solicitados e deixam o registro.
+            self.registro.descartar_excedentes()
+
+            if temporario:
+                self.encerrar()
@@ -0,0 +1,251 @@
+import json
+import re
+
+# Categorias de referências registradas por cada Leiaute: campos que usam uma
+# regra, campos de um tipo T_, campos que citam uma tabela e campos que têm um
+# evento de origem.
+CATEGORIAS = ('regras', 'tipos', 'tabelas', 'eventos_origem')
+
+EVENTO = re.compile(r'S-\d{4}')
+
+
+def criar_referencias():
+    """Cria o conjunto vazio de referências de um Leiaute.
+
+    Returns:
+        dict: Referências de cada categoria, indexadas pela chave citada.
+    """
+    return {categoria: {} for categoria in CATEGORIAS}
+
+
+def serializar_objeto(itens):
+    """Serializa aos poucos um objeto em JSON compacto.
+
+    Args:
+        itens (iterable): Chave e partes do valor já serializado de cada
+            item do objeto.
+
+    Yields:
+        str: Partes do objeto serializado.
+    """
+    separador = '{'
+
+    for chave, partes in itens:
+        yield separador + json.dumps(chave, ensure_ascii=False) + ':'
+        yield from partes
+        separador = ','
+
+    yield '}' if separador == ',' else '{}'
+
+
+def serializar_listas(dicionario):
+    """Serializa aos poucos um objeto cujos valores são listas, com as
+        chaves em ordem alfabética.
+
+    Args:
+        dicionario (dict): Itens do objeto; cada valor é um iterável
+            convertido em lista.
+
+    Returns:
+        iterator: Partes do objeto serializado.
+    """
+    return serializar_objeto(
+        (chave, (json.dumps(list(valor), ensure_ascii=False,
+                            separators=(',', ':')),))
+        for chave, valor in sorted(dicionario.items()))
+
+
+def obter_ancora(item):
+    """Obtém a âncora que exibe um item na visão completa em HTML.
+
+    Os filhos de um item repetido não são exibidos na documentação e são
+    representados pelo item repetido mais externo.
+
+    Args:
+        item (ItemLeiaute): Item procurado.
+
+    Returns:
+        str: Caminho do item ou do item repetido que o contém.
+    """
+    destino = item
+    ancestral = item.pai
+
+    while ancestral is not None:
+        if (ancestral.referencia is not None
+                and ancestral.referencia != ancestral):
+            destino = ancestral
+
+        ancestral = ancestral.pai
+
+    return destino.caminho
+
+
+def registrar_referencia(referencias, categoria, chave, item):
+    """Registra uma referência de um item.
+
+    A referência aponta para a âncora que exibe o item e mantém a trilha do
+    próprio item, em texto simples.
+
+    Args:
+        referencias (dict): Referências do Leiaute que contém o item.
+
+        categoria (str): Categoria da referência.
+
+        chave (str): Regra, tipo, número da tabela ou código do evento citado.
+
+        item (ItemLeiaute): Item que contém a referência.
+    """
+    ocorrencia = (obter_ancora(item), item.gerar_trilha(' > '))
+    ocorrencias = referencias[categoria].get(chave)
+
+    if ocorrencias is None:
+        referencias[categoria][chave] = [ocorrencia]
+    else:
+        ocorrencias.append(ocorrencia)
+
+
+class IndiceReferencias:
+    """Representa o índice das referências cruzadas de todos os eventos de uma
+        versão.
+
+    As referências são registradas por cada Leiaute durante a sua construção,
+    que pode ocorrer em outro processo ou ter sido feita em uma execução
+    anterior, e reunidas no índice na ordem da documentação. Cada consulta é
+    uma busca em dicionário:
+
+        - campos que usam a regra X: obter('regras', 'REGRA_X');
+        - eventos que usam o tipo T: obter_eventos('tipos', 'T_...');
+        - campos que citam a Tabela 21: obter('tabelas', '21');
+        - eventos que alimentam o evento Y: obter_origens('S-YYYY').
+    """
+
+    def __init__(self):
+        """Inicia uma nova instância da classe IndiceReferencias.
+        """
+        self.referencias = criar_referencias()
+        self.eventos = criar_referencias()
+        self.origens = {}
+
+    def adicionar_leiaute(self, leiaute):
+        """Adiciona ao índice as referências de um Leiaute.
+
+        Args:
+            leiaute (LeiauteRenderizado): Leiaute cujas referências serão
+                adicionadas.
+        """
+        for categoria, referencias in leiaute.referencias.items():
+            indice = self.referencias[categoria]
+            eventos = self.eventos[categoria]
+
+            for chave, ocorrencias in referencias.items():
+                indice.setdefault(chave, []).extend([
+                    (leiaute.codigo, caminho, trilha)
+                    for caminho, trilha in ocorrencias])
+                eventos.setdefault(chave, {})[leiaute.codigo] = None
+
+        for origem in leiaute.referencias['eventos_origem']:
+            self.origens.setdefault(leiaute.codigo, {})[origem] = None
+
+    def ordenar(self):
+        """Coloca as referências na ordem da documentação, quando os leiautes
+            são adicionados fora de ordem.
+
+        A ordenação é estável: as referências de um mesmo leiaute mantêm a
+        ordem em que foram registradas.
+        """
+        for categoria in CATEGORIAS:
+            for ocorrencias in self.referencias[categoria].values():
+                ocorrencias.sort(key=lambda ocorrencia: ocorrencia[0])
+
+            eventos = self.eventos[categoria]
+
+            for chave, codigos in eventos.items():
+                eventos[chave] = dict.fromkeys(sorted(codigos))
+
+    def obter(self, categoria, chave):
+        """Obtém os campos que citam uma chave.
+
+        Args:
+            categoria (str): Categoria da referência.
+
+            chave (str): Regra, tipo, número da tabela ou código do evento.
+
+        Returns:
+            list: Evento, caminho e trilha de cada campo, na ordem da
+                documentação.
+        """
+        return self.referencias[categoria].get(chave, [])
+
+    def obter_eventos(self, categoria, chave):
+        """Obtém os eventos com campos que citam uma chave.
+
+        Args:
+            categoria (str): Categoria da referência.
+
+            chave (str): Regra, tipo, número da tabela ou código do evento.
+
+        Returns:
+            list: Códigos dos eventos, na ordem da documentação.
+        """
+        return list(self.eventos[categoria].get(chave, ()))
+
+    def obter_origens(self, codigo):
+        """Obtém os eventos de origem dos campos de um evento.
+
+        Args:
+            codigo (str): Código do evento.
+
+        Returns:
+            list: Códigos dos eventos que alimentam o evento.
+        """
+        return list(self.origens.get(codigo, ()))
+
+    def gerar(self):
+        """Gera o conteúdo do índice.
+
+        Returns:
+            dict: Referências de cada categoria, eventos de cada chave e
+                eventos de origem de cada evento.
+        """
+        conteudo = {categoria: {
+            chave: [list(ocorrencia) for ocorrencia in ocorrencias]
+            for chave, ocorrencias in sorted(
+                self.referencias[categoria].items())}
+            for categoria in CATEGORIAS}
+
+        conteudo['eventos'] = {categoria: {
+            chave: list(eventos)
+            for chave, eventos in sorted(self.eventos[categoria].items())}
+            for categoria in CATEGORIAS}
+
+        conteudo['origens'] = {
+            codigo: list(origens)
+            for codigo, origens in sorted(self.origens.items())}
+
+        return conteudo
+
+    def serializar(self):
+        """Serializa o índice em JSON compacto.
+
+        Returns:
+            str: Conteúdo do arquivo do índice.
+        """
+        return json.dumps(
+            self.gerar(), ensure_ascii=False, separators=(',', ':'))
+
+    def serializar_partes(self):
+        """Serializa o índice em JSON compacto, aos poucos e sem copiar as
+            referências, com o mesmo conteúdo de serializar.
+
+        Returns:
+            iterator: Partes do conteúdo do arquivo do índice.
+        """
+        itens = [(categoria, serializar_listas(self.referencias[categoria]))
+                 for categoria in CATEGORIAS]
+
+        itens.append(('eventos', serializar_objeto([
+            (categoria, serializar_listas(self.eventos[categoria]))
+            for categoria in CATEGORIAS])))
+        itens.append(('origens', serializar_listas(self.origens)))
+
+        return serializar_objeto(itens)
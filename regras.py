@@ -0,0 +1,198 @@
+import re
+import threading
+from modelos import Geral
+from modelos import Regra
+import cinto_utilidades as cinto
+
+REFERENCIA_REGRA = re.compile(r'REGRA_\w+')
+
+
+class CatalogoRegras:
+    """Representa as regras de validação de uma versão, lidas do arquivo
+        regras.txt.
+
+    O arquivo é lido em uma única passagem; as citações a outras regras são
+    convertidas em links durante a leitura. O texto HTML de cada regra e os
+    trechos das páginas que listam todas as regras são gerados uma única vez
+    e compartilhados entre o index.html e o regras.html.
+    """
+
+    def __init__(self):
+        """Inicia uma nova instância da classe CatalogoRegras.
+        """
+        self.regras = {}
+        self.citacoes = {}
+        self.textos = {}
+        self.trechos = {}
+        self.trava = threading.Lock()
+
+    def ler(self, caminho_regras):
+        """Lê um arquivo de regras.
+
+        Cada regra começa com uma linha com o seu nome, seguida pelas linhas
+        do texto, e termina com uma linha em branco.
+
+        Args:
+            caminho_regras (str): Caminho do arquivo regras.txt.
+
+        Returns:
+            CatalogoRegras: O próprio catálogo.
+        """
+        nome = None
+
+        with cinto.obter_arquivo(caminho_regras) as arquivo:
+            for linha in arquivo:
+                if nome is None:
+                    nome = linha.rstrip()
+                    self.regras[nome] = []
+                elif linha.strip() == '':
+                    nome = None
+                else:
+                    self.adicionar_linha(nome, linha.rstrip())
+
+        return self
+
+    def adicionar_linha(self, nome, linha):
+        """Adiciona uma linha ao texto de uma regra, convertendo as citações a
+            outras regras em links.
+
+        Args:
+            nome (str): Nome da regra.
+
+            linha (str): Linha do texto original.
+        """
+        def converter(ocorrencia):
+            citada = ocorrencia[0]
+            self.citacoes.setdefault((citada, nome), None)
+
+            return Geral.LINK.format(citada, citada)
+
+        # str.translate com substituições de vários caracteres é bem mais
+        # lento que duas chamadas a str.replace.
+        linha = linha.replace('>', '&gt;').replace('<', '&lt;')
+
+        self.regras[nome].append(REFERENCIA_REGRA.sub(converter, linha))
+
+    def obter(self, nome):
+        """Obtém as linhas do texto de uma regra.
+
+        Args:
+            nome (str): Nome da regra.
+
+        Returns:
+            list: Linhas do texto em HTML ou None, caso a regra não exista.
+        """
+        return self.regras.get(nome)
+
+    def obter_texto(self, nome):
+        """Obtém o texto HTML de uma regra, com as linhas separadas por <br>.
+
+        Args:
+            nome (str): Nome da regra.
+
+        Returns:
+            str: Texto da regra.
+        """
+        texto = self.textos.get(nome)
+
+        if texto is None:
+            texto = self.textos[nome] = '<br>\n'.join(self.regras[nome])
+
+        return texto
+
+    def obter_trecho(self, modelo):
+        """Obtém o trecho HTML com todas as regras formatadas por um modelo.
+
+        O catálogo pode ser compartilhado entre versões com o mesmo arquivo de
+        regras; cada trecho é gerado apenas uma vez.
+
+        Args:
+            modelo (str): Modelo de cada regra, com os campos id, nome e
+                texto.
+
+        Returns:
+            str: Regras formatadas, na ordem do arquivo.
+        """
+        with self.trava:
+            trecho = self.trechos.get(modelo)
+
+            if trecho is None:
+                trecho = self.trechos[modelo] = ''.join([modelo.format(
+                    id=nome, nome=nome, texto=self.obter_texto(nome))
+                    for nome in self.regras])
+
+        return trecho
+
+    def iterar_trecho(self, modelo):
+        """Percorre as regras formatadas por um modelo, sem guardar o trecho
+            nem os textos gerados.
+
+        Args:
+            modelo (str): Modelo de cada regra, com os campos id, nome e
+                texto.
+
+        Yields:
+            str: Cada regra formatada, na ordem do arquivo.
+        """
+        for nome, linhas in self.regras.items():
+            texto = self.textos.get(nome)
+
+            if texto is None:
+                texto = '<br>\n'.join(linhas)
+
+            yield modelo.format(id=nome, nome=nome, texto=texto)
+
+    def gerar_modais(self):
+        """Gera os modais das regras exibidos no index.html.
+
+        Returns:
+            str: Modais de todas as regras.
+        """
+        return self.obter_trecho(Regra.LINHA_MODAL)
+
+    def gerar_linhas(self):
+        """Gera as linhas da tabela do regras.html.
+
+        Returns:
+            str: Linhas de todas as regras.
+        """
+        return self.obter_trecho(Regra.LINHA)
+
+    def iterar_modais(self):
+        """Percorre os modais das regras exibidos no index.html.
+
+        Returns:
+            iterator: Modal de cada regra.
+        """
+        return self.iterar_trecho(Regra.LINHA_MODAL)
+
+    def iterar_linhas(self):
+        """Percorre as linhas da tabela do regras.html.
+
+        Returns:
+            iterator: Linha de cada regra.
+        """
+        return self.iterar_trecho(Regra.LINHA)
+
+    def registrar_links(self, grafo):
+        """Registra no grafo de links as citações entre regras, presentes no
+            index.html e no regras.html.
+
+        Args:
+            grafo (GrafoLinks): Grafo que recebe os links.
+        """
+        for citada, nome in self.citacoes:
+            grafo.registrar_link('index.html', 'index.html', citada, nome)
+            grafo.registrar_link('regras.html', 'regras.html', citada, nome)
+
+
+def ler_catalogo(caminho_regras):
+    """Lê o catálogo de regras de uma versão.
+
+    Args:
+        caminho_regras (str): Caminho do arquivo regras.txt.
+
+    Returns:
+        CatalogoRegras: Catálogo das regras.
+    """
+    return CatalogoRegras().ler(caminho_regras)
@@ -0,0 +1,129 @@
+from esquema import ler_esquema
+from leiaute import Leiaute
+import cinto_utilidades as cinto
+
+import argparse
+import os
+import sys
+
+IGNORADOS = ('leiaute', 'pai', 'referencia', 'filhos')
+
+
+def obter_atributos(objeto):
+    """Obtém os atributos de um objeto, com ou sem __slots__.
+
+    Args:
+        objeto (object): Objeto analisado.
+
+    Returns:
+        list: Valores dos atributos definidos no objeto.
+    """
+    if hasattr(objeto, '__dict__'):
+        return list(vars(objeto).items())
+
+    nomes = [nome for classe in type(objeto).__mro__
+             for nome in getattr(classe, '__slots__', ())]
+
+    return [(nome, getattr(objeto, nome)) for nome in nomes
+            if hasattr(objeto, nome)]
+
+
+def medir_objeto(objeto, vistos):
+    """Mede o tamanho de um valor e dos contêineres que ele contém.
+
+    Objetos já contabilizados, como textos internalizados e contêineres
+    compartilhados, são contados uma única vez.
+
+    Args:
+        objeto (object): Valor medido.
+
+        vistos (set): Identificadores dos objetos já contabilizados.
+
+    Returns:
+        int: Tamanho em bytes.
+    """
+    if id(objeto) in vistos:
+        return 0
+
+    vistos.add(id(objeto))
+    tamanho = sys.getsizeof(objeto)
+
+    if isinstance(objeto, dict):
+        tamanho += sum(medir_objeto(chave, vistos) + medir_objeto(valor, vistos)
+                       for chave, valor in objeto.items())
+    elif isinstance(objeto, (list, tuple, set, frozenset)):
+        tamanho += sum(medir_objeto(valor, vistos) for valor in objeto)
+
+    return tamanho
+
+
+def medir_item(item, vistos):
+    """Mede o tamanho de um ItemLeiaute e de seus descendentes.
+
+    Args:
+        item (ItemLeiaute): Item medido.
+
+        vistos (set): Identificadores dos objetos já contabilizados.
+
+    Returns:
+        tuple: Tamanho em bytes e quantidade de itens.
+    """
+    tamanho = sys.getsizeof(item)
+    quantidade = 1
+
+    if hasattr(item, '__dict__'):
+        tamanho += sys.getsizeof(vars(item))
+
+    for nome, valor in obter_atributos(item):
+        if nome not in IGNORADOS:
+            tamanho += medir_objeto(valor, vistos)
+
+    tamanho += sys.getsizeof(item.filhos)
+
+    for filho in item.filhos:
+        tamanho_filho, quantidade_filho = medir_item(filho, vistos)
+        tamanho += tamanho_filho
+        quantidade += quantidade_filho
+
+    return tamanho, quantidade
+
+
+def main():
+    """Ponto de entrada da linha de comando.
+    """
+    analisador = argparse.ArgumentParser(
+        description='Mede a memória ocupada pelas árvores de itens dos '
+                    'leiautes de uma versão.')
+    analisador.add_argument(
+        'caminho', metavar='CAMINHO_LEIAUTES',
+        help='Diretório que contém os XSD da versão.')
+    argumentos = analisador.parse_args()
+
+    tipos_globais = cinto.obter_tipos_globais(
+        os.path.join(argumentos.caminho, 'tipos.xsd'))
+
+    # Os textos compartilhados entre eventos são contados uma única vez, como
+    # na geração, em que todas as árvores ficam na memória ao mesmo tempo.
+    vistos = set()
+    leiautes = []
+    total = 0
+    itens = 0
+
+    for identificador in sorted(os.listdir(argumentos.caminho)):
+        if identificador.startswith('evt'):
+            leiaute = Leiaute(ler_esquema(os.path.join(
+                argumentos.caminho, identificador)), tipos_globais)
+            leiautes.append(leiaute)
+
+            tamanho, quantidade = medir_item(leiaute.raiz, vistos)
+            total += tamanho
+            itens += quantidade
+
+    print('Eventos: ', len(leiautes))
+    print('Itens: ', itens)
+    print('Tamanho total das árvores: {:.1f} KiB'.format(total / 1024))
+    print('Bytes por item: {:.0f}'.format(total / itens if itens else 0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,414 @@
+from modelos import Geral
+from modelos import Tabela
+import busca
+import cinto_utilidades as cinto
+
+import os
+import re
+
+ITALICO = re.compile('__(.*?)__')
+NEGRITO = re.compile('##(.*?)##')
+
+
+class Celula:
+    """Representa uma célula da grade de uma tabela.
+
+    Células sem modelo ocupam o lugar das posições mescladas com outra célula
+    e não são renderizadas.
+    """
+
+    __slots__ = ('modelo', 'conteudo', 'classe', 'dimensao', 'linhas',
+                 'colunas')
+
+    def __init__(self, modelo=None, conteudo='', classe='', dimensao=''):
+        """Inicia uma nova instância da classe Celula.
+
+        Args:
+            modelo (str, optional): Modelo HTML da célula. Defaults to None.
+
+            conteudo (str, optional): Conteúdo da célula. Defaults to ''.
+
+            classe (str, optional): Atributo class da célula. Defaults to ''.
+
+            dimensao (str, optional): Atributo style com a largura da
+                célula. Defaults to ''.
+        """
+        self.modelo = modelo
+        self.conteudo = conteudo
+        self.classe = classe
+        self.dimensao = dimensao
+        self.linhas = None
+        self.colunas = None
+
+    def mesclar_linhas(self, quantidade):
+        """Define a quantidade de linhas ocupadas pela célula, caso ainda não
+            tenha sido definida.
+
+        Args:
+            quantidade (int): Quantidade de linhas.
+        """
+        if self.linhas is None:
+            self.linhas = quantidade
+
+    def mesclar_colunas(self, quantidade):
+        """Define a quantidade de colunas ocupadas pela célula, caso ainda não
+            tenha sido definida.
+
+        Args:
+            quantidade (int): Quantidade de colunas.
+        """
+        if self.colunas is None:
+            self.colunas = quantidade
+
+    def renderizar(self):
+        """Gera a representação da célula em HTML.
+
+        Returns:
+            str: Representação da célula em HTML ou texto vazio, caso a
+                posição esteja mesclada com outra célula.
+        """
+        if self.modelo is None:
+            return ''
+
+        texto = self.modelo.format(
+            classe=self.classe, dimensao=self.dimensao, conteudo=self.conteudo)
+
+        if self.linhas is not None:
+            texto = texto.replace(
+                'rowspan=""', 'rowspan="{}"'.format(self.linhas))
+
+        if self.colunas is not None:
+            texto = texto.replace(
+                'colspan=""', 'colspan="{}"'.format(self.colunas))
+
+        return texto
+
+    def renderizar_corpo(self):
+        """Gera a representação HTML final de uma célula do corpo da tabela
+            cujo conteúdo não contém marcações de mesclagem nem atributos.
+
+        Returns:
+            str: Representação da célula em HTML ou texto vazio, caso a
+                posição esteja mesclada com outra célula.
+        """
+        if self.modelo is None:
+            return ''
+
+        inicio = '<td'
+        conteudo = self.conteudo
+
+        if '--C3--' in conteudo:
+            inicio = '<td class="sub-cabecalho"'
+            conteudo = conteudo.replace('--C3--', '')
+
+        if self.linhas is not None:
+            inicio += ' rowspan="{}"'.format(self.linhas)
+
+        if self.colunas is not None:
+            inicio += ' colspan="{}"'.format(self.colunas)
+
+        return '{}{}>{}</td>\n'.format(inicio, self.classe, conteudo)
+
+
+class GradeTabela:
+    """Representa uma tabela do eSocial como uma grade de células.
+
+    A grade é montada em uma única passagem pelo arquivo da tabela: as
+    mesclagens de linhas e colunas são registradas nas células de origem
+    assim que cada sequência termina. Quando nenhuma linha contém atributos
+    HTML, as células do corpo são renderizadas diretamente na forma final.
+    """
+
+    def __init__(self, numero):
+        """Inicia uma nova instância da classe GradeTabela.
+
+        Args:
+            numero (str): Número da tabela.
+        """
+        self.numero = numero
+        self.titulo = ''
+        self.linhas = []
+        self.cabecalho = []
+        self.linhas_cabecalho = 1
+        self.colunas = 0
+        self.anexos = []
+        self.simples = True
+
+    def analisar(self, arquivo):
+        """Analisa as linhas do arquivo de uma tabela.
+
+        Args:
+            arquivo (iterable): Linhas do arquivo da tabela.
+        """
+        rowspan_linha = {}
+
+        fim_da_tabela = False
+        texto_largura_fixa = False
+        indices_texto = []
+        dimensoes = None
+        indice_linha = 0
+        indice_item = 0
+
+        for indice_linha, linha in enumerate(arquivo):
+            if indice_linha == 2 and linha.startswith('^'):
+                self.linhas_cabecalho = 2
+
+            if '__' in linha:
+                linha = ITALICO.sub(
+                    lambda marcacao: '<i>{}</i>'.format(marcacao[1]), linha)
+            if '##' in linha:
+                linha = NEGRITO.sub(
+                    lambda marcacao: '<b>{}</b>'.format(marcacao[1]), linha)
+
+            if linha.rstrip() == '===':
+                fim_da_tabela = True
+                continue
+            elif fim_da_tabela:
+                if (linha.startswith('>')):
+                    if not texto_largura_fixa:
+                        self.anexos.append(
+                            '<pre>{}'.format(linha.rstrip()[1:]))
+                        texto_largura_fixa = True
+                    else:
+                        self.anexos.append(linha.rstrip()[1:])
+                else:
+                    if texto_largura_fixa:
+                        texto_largura_fixa = False
+                        self.anexos.append('</pre>')
+                    self.anexos.append('<p>{}</p>'.format(linha.rstrip()))
+                continue
+            elif indice_linha == 0:
+                if '#' in linha:
+                    self.titulo, dimensoes = linha.rstrip().split('#')
+                    dimensoes = dimensoes.split(' ')
+                else:
+                    self.titulo = linha.rstrip()
+                continue
+
+            if self.simples:
+                texto = linha.replace('--C3--', '')
+                self.simples = not (
+                    '=""' in texto or 'class=' in texto or '<td' in texto)
+
+            celulas = []
+            extensao_colspan = 0
+
+            for indice_item, item in enumerate(linha.rstrip().split('|')):
+                if indice_linha == 1:
+                    rowspan_linha[indice_item] = 0
+
+                    if '>' in item:
+                        celulas.append(Celula())
+                        extensao_colspan += 1
+                    else:
+                        if '<' in item:
+                            item = item[1:]
+                            indices_texto.append(indice_item)
+
+                        if dimensoes is not None:
+                            dimensao = ' style="width: {}%"'.format(
+                                dimensoes[indice_item])
+                        else:
+                            dimensao = ''
+
+                        celulas.append(Celula(
+                            Tabela.CELULA_CABECALHO, item, dimensao=dimensao))
+
+                elif item.startswith('^'):
+                    celulas.append(Celula())
+                    rowspan_linha[indice_item] += 1
+
+                elif item.startswith('>'):
+                    celulas.append(Celula())
+                    extensao_colspan += 1
+
+                    if rowspan_linha[indice_item] > 0:
+                        self.linhas[
+                            indice_linha - rowspan_linha[indice_item] - 2][
+                            indice_item].mesclar_linhas(
+                                rowspan_linha[indice_item] + 1)
+                        rowspan_linha[indice_item] = 0
+
+                else:
+                    if extensao_colspan != 0:
+                        celulas[indice_item - extensao_colspan - 1] \
+                            .mesclar_colunas(extensao_colspan + 1)
+                        extensao_colspan = 0
+
+                    if rowspan_linha[indice_item] > 0:
+                        self.linhas[
+                            indice_linha - rowspan_linha[indice_item] - 2][
+                            indice_item].mesclar_linhas(
+                                rowspan_linha[indice_item] + 1)
+
+                    rowspan_linha[indice_item] = 0
+
+                    classe = ''
+                    if indice_item in indices_texto:
+                        classe = ' class="texto"'
+
+                    celulas.append(Celula(Tabela.CELULA, item, classe=classe))
+
+            if extensao_colspan > 0:
+                celulas[indice_item - extensao_colspan].mesclar_colunas(
+                    extensao_colspan + 1)
+
+            if indice_linha <= self.linhas_cabecalho:
+                self.cabecalho.append(celulas)
+
+            self.linhas.append(celulas)
+
+        # As mesclagens de linhas que chegam ao fim do arquivo são registradas
+        # a partir do índice da última linha lida, inclusive a dos anexos.
+        for i in range(indice_item):
+            if rowspan_linha[i] > 0:
+                self.linhas[indice_linha - rowspan_linha[i] - 1][i] \
+                    .mesclar_linhas(rowspan_linha[i] + 1)
+
+        self.colunas = indice_item + 1
+
+    def extrair_termos(self):
+        """Extrai os termos de busca do título, das células e dos anexos da
+            tabela.
+
+        Returns:
+            set: Termos normalizados.
+        """
+        textos = [self.titulo, self.numero]
+        textos.extend([
+            celula.conteudo.replace('--C3--', '')
+            for celulas in self.linhas for celula in celulas])
+        textos.extend(self.anexos)
+
+        return busca.extrair_termos(textos)
+
+    def renderizar(self):
+        """Gera a representação da tabela em HTML.
+
+        Returns:
+            str: Representação da tabela em HTML.
+        """
+        cabecalho = Tabela.CABECALHO
+
+        if self.numero == '04':
+            cabecalho = Tabela.CABECALHO.replace(
+                'thead', 'thead style="display: table-row-group;"', 1)
+
+        linha_cabecalho = '</tr>\n<tr>\n'.join([
+            ''.join([celula.renderizar() for celula in celulas]).replace(
+                ' class="grupo"', '').replace(
+                ' rowspan=""', '').replace(' colspan=""', '')
+            for celulas in self.cabecalho])
+
+        partes = [cabecalho.format(
+            self.numero, self.numero, self.colunas, self.numero, self.titulo,
+            linha_cabecalho)]
+
+        if self.simples:
+            for celulas in self.linhas[self.linhas_cabecalho:]:
+                partes.append('<tr>\n')
+                partes.extend([celula.renderizar_corpo() for celula in celulas])
+                partes.append('</tr>\n')
+        else:
+            self.renderizar_linhas(partes)
+
+        partes.append(Geral.RODAPE_TABELA)
+
+        if self.anexos:
+            partes.append(Tabela.ANEXO.format(
+                ''.join([anexo + '\n' for anexo in self.anexos])))
+
+        return ''.join(partes)
+
+    def renderizar_linhas(self, partes):
+        """Gera as linhas do corpo da tabela em HTML, removendo as marcações
+            de mesclagem do texto de cada célula.
+
+        Args:
+            partes (list): Lista que recebe as partes do HTML.
+        """
+        for celulas in self.linhas[self.linhas_cabecalho:]:
+            textos = [celula.renderizar() for celula in celulas]
+
+            if 'class="grupo"' in textos[0]:
+                partes.append('<tr class="grupo">\n')
+            else:
+                partes.append('<tr>\n')
+
+            for texto in textos:
+                if '--C3--' in texto:
+                    texto = texto.replace(
+                        '--C3--', '').replace(
+                            '<td', '<td class="sub-cabecalho"')
+
+                if texto != '':
+                    partes.append(texto.replace(
+                        ' class="grupo"', '').replace(
+                        ' rowspan=""', '').replace(' colspan=""', ''))
+
+            partes.append('</tr>\n')
+
+
+def gerar_tabela(caminho):
+    """Gera o conteúdo HTML de uma tabela do eSocial.
+
+    Args:
+        caminho (str): Caminho do arquivo da tabela.
+
+    Returns:
+        tuple: Número da tabela, linha do índice em HTML, conteúdo da
+            tabela em HTML e documento do índice de busca.
+    """
+    grade = GradeTabela(os.path.basename(caminho)[:-4])
+
+    with cinto.obter_arquivo(caminho) as arquivo:
+        grade.analisar(arquivo)
+
+    return (
+        grade.numero,
+        Tabela.LINHA_INDICE.format(numero=grade.numero, titulo=grade.titulo),
+        grade.renderizar(),
+        (grade.numero, 'Tabela {} - {}'.format(grade.numero, grade.titulo),
+         tuple(sorted(grade.extrair_termos()))),
+    )
+
+
+def listar_tabelas(caminho_tabelas):
+    """Lista os arquivos das tabelas do eSocial, na ordem da documentação.
+
+    Args:
+        caminho_tabelas (str): Diretório que contém os arquivos das tabelas.
+
+    Returns:
+        list: Caminhos dos arquivos das tabelas.
+    """
+    return [os.path.join(caminho_tabelas, tabela)
+            for tabela in sorted(os.listdir(caminho_tabelas))]
+
+
+def gerar_tabelas(caminho_tabelas, executor=None):
+    """Gera o conteúdo HTML das tabelas do eSocial.
+
+    Args:
+        caminho_tabelas (str): Diretório que contém os arquivos das tabelas.
+
+        executor (Executor, optional): Pool que gera as tabelas
+            simultaneamente. Defaults to None.
+
+    Returns:
+        tuple: Índice das tabelas em HTML, conteúdo das tabelas em HTML,
+            lista com os números das tabelas e documentos do índice de busca.
+    """
+    caminhos = listar_tabelas(caminho_tabelas)
+
+    if executor is None:
+        resultados = list(map(gerar_tabela, caminhos))
+    else:
+        resultados = list(executor.map(gerar_tabela, caminhos))
+
+    return (
+        ''.join([resultado[1] for resultado in resultados]),
+        ''.join([resultado[2] for resultado in resultados]),
+        [resultado[0] for resultado in resultados],
+        [resultado[3] for resultado in resultados],
+    )
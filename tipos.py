@@ -0,0 +1,356 @@
+import busca
+import esquema
+import re
+import sys
+import cinto_utilidades as cinto
+
+
+def combinar_extensao(nome, definicao_base, extension):
+    """Combina a definição de um tipo base com os elementos de uma extensão.
+
+    Os elementos das duas definições não são copiados: o tipo combinado só
+    cria um novo complexType e uma nova sequence que os referenciam.
+
+    Args:
+        nome (str): Nome do tipo combinado.
+
+        definicao_base (NoEsquema): complexType do tipo base.
+
+        extension (NoEsquema): Elemento extension que estende o tipo base.
+
+    Returns:
+        NoEsquema: complexType com os elementos do tipo base e da extensão.
+    """
+    sequencia_base = definicao_base.filho('sequence')
+    filhos = []
+
+    for filho in definicao_base.filhos:
+        if filho is sequencia_base:
+            filho = esquema.NoEsquema(
+                filho.tag, filho.atributos,
+                filho.filhos + extension.filho('sequence').filhos)
+
+        filhos.append(filho)
+
+    return esquema.NoEsquema(definicao_base.tag, dict(
+        definicao_base.atributos, name=nome), filhos)
+
+
+class FacetasTipo:
+    """Representa as restrições de preenchimento de um tipo simples.
+
+    As restrições são analisadas uma única vez por tipo. Somente as descrições
+    de valores válidos que contêm referências dependem do item que usa o tipo
+    e são resolvidas para cada item.
+    """
+
+    def __init__(self, base, restriction=None, nome=None):
+        """Inicia uma nova instância da classe FacetasTipo.
+
+        Args:
+            base (str): Tipo primitivo do tipo simples.
+
+            restriction (NoEsquema, optional): Elemento restriction final da
+                cadeia de reuso do tipo. Defaults to None.
+
+            nome (str, optional): Nome do tipo. Defaults to None.
+        """
+        self.base = base
+        self.tamanho_fixo = None
+        self.tamanho_lista = None
+        self.tamanho_faixa = None
+        self.decimais = '-'
+        self.enumeracoes = ()
+        self.valores_validos = {}
+        self.contextual = False
+        self.termos = None
+        self.tabelas = None
+
+        if restriction is not None:
+            self.analisar_restriction(restriction, nome)
+
+        if base == 'xs:date':
+            self.rotulo_tipo = 'D'
+            self.tamanho_fixo = 10
+            self.decimais = '-'
+        elif base == 'xs:string' or base == 'xs:ID':
+            self.rotulo_tipo = 'C'
+        else:
+            self.rotulo_tipo = 'N'
+
+    def analisar_restriction(self, restriction, nome):
+        """Analisa as enumerações, os tamanhos e as casas decimais do tipo.
+
+        Args:
+            restriction (NoEsquema): Elemento restriction final da cadeia de
+                reuso do tipo.
+
+            nome (str): Nome do tipo.
+        """
+        menor_tamanho = sys.maxsize
+        maior_tamanho = 0
+        enumeracoes = []
+
+        for enum in restriction.filhos_tag('enumeration'):
+            valor = cinto.internalizar(enum.atributos['value'])
+            cabecalho = None
+            texto = None
+
+            descricoes = enum.documentacoes
+            if descricoes:
+                texto = descricoes[0]
+
+                if len(descricoes) > 1:
+                    cabecalho = descricoes[0]
+                    texto = descricoes[1]
+
+                if cinto.possui_referencias(texto):
+                    self.contextual = True
+
+            menor_tamanho = min(menor_tamanho, len(valor))
+            maior_tamanho = max(maior_tamanho, len(valor))
+
+            enumeracoes.append((valor, cabecalho, texto))
+
+        self.enumeracoes = tuple(enumeracoes)
+
+        if not self.contextual:
+            self.valores_validos = self.resolver_valores_validos(
+                cinto.escapar_html)
+
+        if self.enumeracoes:
+            if menor_tamanho == maior_tamanho:
+                self.tamanho_fixo = menor_tamanho
+            else:
+                self.tamanho_faixa = (menor_tamanho, maior_tamanho)
+
+        tamanho_fixo = restriction.filho('length')
+        if tamanho_fixo is not None:
+            self.tamanho_fixo = int(tamanho_fixo.atributos['value'])
+
+        tamanho_minimo = restriction.filho('minLength')
+        tamanho_maximo = restriction.filho('maxLength')
+        if tamanho_minimo is not None:
+            self.tamanho_faixa = (
+                tamanho_minimo.atributos['value'],
+                tamanho_maximo.atributos['value'])
+
+        padrao = restriction.filho('pattern')
+        if padrao is not None and self.tamanho_fixo is None:
+            regex = padrao.atributos['value']
+
+            self.tamanho_lista = tuple(int(item) for item in re.findall(
+                r'\\d{(\d+)}', regex))
+
+            if len(self.tamanho_lista) == 1:
+                if r'\d' in regex:
+                    posicao = regex.index(r'\d')
+                else:
+                    posicao = 0
+
+                self.tamanho_fixo = posicao + self.tamanho_lista[0]
+                self.tamanho_lista = None
+
+            if not self.tamanho_lista:
+                match = re.match(r'(\\d|\\w){(\d+),(\d+)}', regex)
+                if match:
+                    self.tamanho_faixa = (match.group(2), match.group(3))
+
+            if nome == 'TS_perApur':
+                self.tamanho_lista = (4, 7)
+                self.tamanho_fixo = None
+                self.tamanho_faixa = None
+
+        digitos_totais = restriction.filho('totalDigits')
+        if digitos_totais is not None:
+            self.tamanho_faixa = (1, digitos_totais.get('value'))
+
+        fracao = restriction.filho('fractionDigits')
+        if fracao is not None:
+            self.decimais = fracao.get('value')
+
+    def resolver_valores_validos(self, resolver):
+        """Gera os valores válidos do tipo com as descrições resolvidas.
+
+        Args:
+            resolver (callable): Função que recebe a descrição de um valor e
+                a converte para HTML.
+
+        Returns:
+            dict: Descrições indexadas pelos valores válidos. Cabeçalhos de
+                grupos de valores têm descrição vazia.
+        """
+        valores_validos = {}
+
+        for valor, cabecalho, texto in self.enumeracoes:
+            if cabecalho is not None:
+                valores_validos[cabecalho] = ''
+
+            if texto is None:
+                valores_validos[valor] = None
+            else:
+                valores_validos[valor] = cinto.internalizar(
+                    cinto.codificar_sobrescrito(resolver(texto)))
+
+        return valores_validos
+
+    def obter_termos(self):
+        """Obtém os termos de busca dos valores válidos do tipo, extraídos
+            uma única vez das descrições originais.
+
+        Returns:
+            set: Termos normalizados.
+        """
+        if self.termos is None:
+            textos = []
+
+            for enumeracao in self.enumeracoes:
+                textos.extend(enumeracao)
+
+            self.termos = busca.extrair_termos(textos)
+
+        return self.termos
+
+    def obter_tabelas(self):
+        """Obtém os números das tabelas citadas nas descrições dos valores
+            válidos do tipo, extraídos uma única vez.
+
+        Returns:
+            tuple: Números das tabelas, sem repetições.
+        """
+        if self.tabelas is None:
+            self.tabelas = tuple(dict.fromkeys([
+                tabela for _, cabecalho, texto in self.enumeracoes
+                for tabela in cinto.TABELA.findall(
+                    '{} {}'.format(cabecalho or '', texto or ''))]))
+
+        return self.tabelas
+
+    def obter_valores_validos(self, item):
+        """Obtém os valores válidos do tipo para um item.
+
+        Quando nenhuma descrição contém referências, todos os itens
+        compartilham os mesmos valores válidos.
+
+        Args:
+            item (ItemLeiaute): Item que usa o tipo.
+
+        Returns:
+            dict: Descrições indexadas pelos valores válidos.
+        """
+        if not self.contextual:
+            return self.valores_validos
+
+        return self.resolver_valores_validos(
+            lambda texto: cinto.resolver_referencias(texto, item))
+
+
+class RegistroTipos(dict):
+    """Representa os tipos reutilizáveis de um arquivo tipos.xsd, indexados
+        pelo nome.
+
+    O registro também guarda os tipos combinados a partir das extensões dos
+    tipos globais e as restrições de preenchimento dos tipos simples. Cada
+    combinação e cada análise é feita uma única vez e compartilhada por todos
+    os leiautes que usam o mesmo registro. Os tipos do registro não devem ser
+    alterados.
+    """
+
+    def __init__(self, tipos):
+        """Inicia uma nova instância da classe RegistroTipos.
+
+        Args:
+            tipos (dict): Elementos do XSD indexados pelo atributo name.
+        """
+        super().__init__(tipos)
+        self.extensoes = {}
+        self.facetas = {}
+        self.facetas_primitivas = {}
+
+    def obter_extensao(self, nome, tipo_base, extension):
+        """Obtém o tipo combinado de uma extensão de um tipo global.
+
+        Args:
+            nome (str): Nome do tipo combinado.
+
+            tipo_base (str): Nome do tipo global estendido.
+
+            extension (NoEsquema): Elemento extension que estende o tipo
+                base.
+
+        Returns:
+            NoEsquema: complexType com os elementos do tipo base e da
+                extensão.
+        """
+        chave = (nome, tipo_base, extension.obter_assinatura())
+        combinado = self.extensoes.get(chave)
+
+        if combinado is None:
+            combinado = self.extensoes.setdefault(chave, combinar_extensao(
+                nome, self[tipo_base], extension))
+
+        return combinado
+
+    def obter_facetas(self, definicao_tipo):
+        """Obtém as restrições de preenchimento de um tipo simples.
+
+        As restrições dos tipos do registro são analisadas uma única vez; as
+        dos tipos anônimos, a cada chamada.
+
+        Args:
+            definicao_tipo (NoEsquema): Elemento que contém a definição do
+                tipo.
+
+        Returns:
+            FacetasTipo: Restrições de preenchimento do tipo.
+        """
+        nome = definicao_tipo.get('name')
+
+        if nome is None or self.get(nome) is not definicao_tipo:
+            return self.analisar_facetas(definicao_tipo)
+
+        facetas = self.facetas.get(nome)
+
+        if facetas is None:
+            facetas = self.facetas.setdefault(
+                nome, self.analisar_facetas(definicao_tipo))
+
+        return facetas
+
+    def obter_facetas_primitivas(self, base):
+        """Obtém as restrições de preenchimento de um tipo primitivo.
+
+        Args:
+            base (str): Nome do tipo primitivo.
+
+        Returns:
+            FacetasTipo: Restrições de preenchimento do tipo.
+        """
+        facetas = self.facetas_primitivas.get(base)
+
+        if facetas is None:
+            facetas = self.facetas_primitivas.setdefault(
+                base, FacetasTipo(base))
+
+        return facetas
+
+    def analisar_facetas(self, definicao_tipo):
+        """Analisa as restrições de preenchimento de um tipo simples.
+
+        Args:
+            definicao_tipo (NoEsquema): Elemento que contém a definição do
+                tipo.
+
+        Returns:
+            FacetasTipo: Restrições de preenchimento do tipo.
+        """
+        restriction = definicao_tipo.filho('restriction')
+
+        if restriction is not None:
+            restriction = cinto.obter_restriction_final(restriction, self)
+
+        if restriction is None:
+            return FacetasTipo(None)
+
+        return FacetasTipo(
+            restriction.get('base'), restriction, definicao_tipo.get('name'))
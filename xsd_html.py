@@ -1,32 +1,435 @@
-from leiaute import Leiaute
 from modelos import Regra
 from modelos import Geral
-from modelos import Tabela
 from modelos import Resumo
+from modelos import Tabela
+from busca import IndiceBusca
+from busca import IndiceBuscaExterno
+from busca import extrair_termos
+from cache import CacheLeiautes
+from cache import CacheMemoria
+from escrita import EscritorArquivos
+from links import GrafoLinks
+from metricas import RelatorioTempos
+from observador import ObservadorVersoes
+from referencias import IndiceReferencias
+from regras import ler_catalogo
+import analise_xml
+from tabelas import gerar_tabela
+from tabelas import gerar_tabelas
+from tabelas import listar_tabelas
 import cinto_utilidades as cinto
+import paralelo
 
-import locale
+import argparse
+import json
 import os
 import re
-import sys
+import tempfile
 import datetime
 from time import perf_counter
-from xml.etree.ElementTree import parse
-sys.dont_write_bytecode = True
-locale.setlocale(locale.LC_TIME, "pt_BR")
 
-if len(sys.argv) < 2:
-    print('Uso: python xsd_html.py CAMINHOS_LEIAUTES')
-    exit()
 
-for indice in range(1, len(sys.argv)):
-    print('Caminho: ', sys.argv[indice])
+def agrupar_referencias(leiautes):
+    """Reúne as referências cruzadas de todos os leiautes de uma versão.
+
+    Args:
+        leiautes (list): Leiautes da versão, na ordem da documentação.
+
+    Returns:
+        IndiceReferencias: Índice das referências da versão.
+    """
+    referencias = IndiceReferencias()
+
+    for leiaute in leiautes:
+        referencias.adicionar_leiaute(leiaute)
+
+    return referencias
+
+
+def registrar_regras(regras, referencias, grafo):
+    """Registra as âncoras e os links da página de regras.
+
+    Args:
+        regras (CatalogoRegras): Catálogo das regras da versão.
+
+        referencias (IndiceReferencias): Referências cruzadas da versão.
+
+        grafo (GrafoLinks): Grafo que recebe as âncoras e os links da página.
+    """
+    for regra in regras.regras:
+        grafo.registrar_ancora('regras.html', 'r_{}'.format(regra))
+
+        for _, caminho, _ in referencias.obter('regras', regra):
+            grafo.registrar_link('regras.html', 'index.html', caminho, regra)
+
+    grafo.registrar_ancoras('regras.html', regras.regras)
+
+
+def iterar_regras(regras, referencias, linhas):
+    """Percorre os modais de ocorrências e a tabela de regras da página de
+        regras, uma regra por vez.
+
+    Args:
+        regras (CatalogoRegras): Catálogo das regras da versão.
+
+        referencias (IndiceReferencias): Referências cruzadas da versão.
+
+        linhas (iterable): Linhas da tabela de regras.
+
+    Yields:
+        str: Partes do conteúdo HTML.
+    """
+    for regra in regras.regras:
+        texto_modal = '\n'.join([Regra.LINHA_REFERENCIA.format(
+            id=caminho, trilha=cinto.escapar_html(trilha))
+            for _, caminho, trilha in referencias.obter('regras', regra)])
+
+        yield Regra.LINHA_MODAL_REFERENCIA.format(nome=regra, texto=texto_modal)
+
+    yield Regra.CABECALHO
+    yield from linhas
+    yield Geral.RODAPE_TABELA
+
+
+def escrever_regras(partes, regras, referencias, grafo):
+    """Escreve os modais de ocorrências e a tabela de regras da página de
+        regras.
+
+    Args:
+        partes (list): Partes do conteúdo HTML, que recebe as novas partes.
+
+        regras (CatalogoRegras): Catálogo das regras da versão.
+
+        referencias (IndiceReferencias): Referências cruzadas da versão.
+
+        grafo (GrafoLinks): Grafo que recebe as âncoras e os links da página.
+    """
+    registrar_regras(regras, referencias, grafo)
+    partes.extend(iterar_regras(
+        regras, referencias, (regras.gerar_linhas(),)))
+
+
+def registrar_referencias_tabelas(tabelas, referencias, grafo):
+    """Registra as âncoras e os links dos modais de referências da página de
+        tabelas.
+
+    Args:
+        tabelas (list): Números das tabelas.
+
+        referencias (IndiceReferencias): Referências cruzadas da versão.
+
+        grafo (GrafoLinks): Grafo que recebe as âncoras e os links da página.
+    """
+    for tabela in tabelas:
+        grafo.registrar_ancora('tabelas.html', 'r_t_{}'.format(tabela))
+
+        for _, caminho, _ in referencias.obter('tabelas', tabela):
+            grafo.registrar_link(
+                'tabelas.html', 'index.html', caminho, 'Tabela {}'.format(tabela))
+
+
+def iterar_referencias_tabelas(tabelas, referencias):
+    """Percorre os modais com os campos que citam cada tabela da página de
+        tabelas, uma tabela por vez.
+
+    Args:
+        tabelas (list): Números das tabelas.
+
+        referencias (IndiceReferencias): Referências cruzadas da versão.
+
+    Yields:
+        str: Modal de cada tabela.
+    """
+    for tabela in tabelas:
+        ocorrencias = referencias.obter('tabelas', tabela)
+
+        texto_modal = '\n'.join([Tabela.LINHA_REFERENCIA.format(
+            id=caminho, evento=evento, trilha=cinto.escapar_html(trilha))
+            for evento, caminho, trilha in ocorrencias])
+
+        yield Tabela.LINHA_MODAL_REFERENCIA.format(
+            numero=tabela, texto=texto_modal)
+
+
+def escrever_referencias_tabelas(partes, tabelas, referencias, grafo):
+    """Escreve os modais com os campos que citam cada tabela da página de
+        tabelas.
+
+    Args:
+        partes (list): Partes do conteúdo HTML, que recebe as novas partes.
+
+        tabelas (list): Números das tabelas.
+
+        referencias (IndiceReferencias): Referências cruzadas da versão.
+
+        grafo (GrafoLinks): Grafo que recebe as âncoras e os links da página.
+    """
+    registrar_referencias_tabelas(tabelas, referencias, grafo)
+    partes.extend(iterar_referencias_tabelas(tabelas, referencias))
+
+
+def obter_caminho_tabelas(caminho_leiaute):
+    """Obtém o diretório das tabelas de uma versão.
+
+    As versões de simplificação têm tabelas próprias; as demais usam as
+    tabelas do diretório que contém a versão.
+
+    Args:
+        caminho_leiaute (str): Diretório que contém os XSD da versão.
+
+    Returns:
+        str: Diretório que contém os arquivos das tabelas.
+    """
+    itens_caminho = os.path.split(caminho_leiaute)
+
+    if (itens_caminho[-1].endswith('simplificacao')):
+        return os.path.join(caminho_leiaute, 'tabelas')
+
+    return os.path.join(os.path.dirname(caminho_leiaute), 'tabelas')
+
+
+def obter_arquivos_observados(caminho_leiaute):
+    """Obtém os arquivos de entrada da documentação de uma versão, observados
+        no modo de observação.
+
+    Args:
+        caminho_leiaute (str): Diretório que contém os XSD da versão.
+
+    Returns:
+        list: Caminhos dos arquivos e diretórios de entrada.
+    """
+    caminhos = [
+        os.path.join(caminho_leiaute, identificador)
+        for identificador in os.listdir(caminho_leiaute)
+        if identificador.startswith('evt')]
+
+    caminhos.extend([
+        os.path.join(caminho_leiaute, 'tipos.xsd'),
+        os.path.join(caminho_leiaute, 'regras.txt'),
+        os.path.join(caminho_leiaute, 'doc', 'menu'),
+        os.path.join(caminho_leiaute, 'doc', 'parametros_texto_inicial'),
+        obter_caminho_tabelas(caminho_leiaute),
+        cinto.DIRETORIO_ATIVOS,
+    ])
+
+    return caminhos
+
+
+def escrever_paginas_eventos(caminho_saida, leiautes, escritor):
+    """Grava o HTML de cada evento em uma página própria e o mapa das âncoras
+        de cada página, usado pelo índice para carregar os eventos sob
+        demanda.
+
+    Args:
+        caminho_saida (str): Modelo do caminho dos arquivos de saída.
+
+        leiautes (list): Leiautes renderizados da versão.
+
+        escritor (EscritorArquivos): Escritor que grava os arquivos.
+    """
+    paginas_ancoras = {}
+
+    for leiaute in leiautes:
+        pagina = f'{leiaute.codigo}.html'
+
+        # Com o limite de memória, as páginas já foram gravadas durante a
+        # construção dos eventos.
+        if leiaute.html is not None:
+            escritor.gravar(caminho_saida.format(pagina), leiaute.html)
+
+        paginas_ancoras[pagina] = sorted(leiaute.ancoras)
+
+    escritor.gravar(caminho_saida.format('mapa_ancoras.js'), [
+        'var PAGINAS_ANCORAS = ',
+        json.dumps(paginas_ancoras, ensure_ascii=False, separators=(',', ':')),
+        ';\n'])
+
+
+def gravar_eventos(eventos, caminho_texto, caminho_saida, caminho_temporario,
+                   escritor, grafo, indice_busca, paginas_eventos):
+    """Grava as saídas de cada evento assim que ele é construído e mantém
+        apenas os seus metadados.
+
+    O texto e, com as páginas por evento, a página de cada evento são
+    gravados no destino final. Sem as páginas por evento, o HTML é gravado em
+    um arquivo temporário, lido novamente na montagem do index.html. Os
+    documentos de busca são entregues ao índice de busca em disco e as
+    referências, ao índice de referências. Dos links de cada evento, o grafo
+    guarda apenas os ainda não resolvidos.
+
+    Args:
+        eventos (iterable): Leiautes renderizados da versão.
+
+        caminho_texto (str): Modelo do caminho dos arquivos texto.
+
+        caminho_saida (str): Modelo do caminho dos arquivos de saída.
+
+        caminho_temporario (str): Diretório dos arquivos temporários.
+
+        escritor (EscritorArquivos): Escritor que grava os arquivos.
+
+        grafo (GrafoLinks): Grafo que recebe as âncoras e os links.
+
+        indice_busca (IndiceBuscaExterno): Índice que recebe os documentos de
+            busca.
 
-    caminho_xsd = os.path.join(sys.argv[indice], '{}')
-    caminho_ativos = os.path.join(os.getcwd(), 'ativos', '{}')
-    caminho_doc = os.path.join(sys.argv[indice], 'doc', '{}')
-    caminho_saida = os.path.join(sys.argv[indice], 'doc', 'saida', '{}')
-    caminho_texto = os.path.join(sys.argv[indice], 'doc', 'txt', '{}')
+        paginas_eventos (bool): Indica se cada evento tem uma página própria.
+
+    Returns:
+        tuple: Leiautes sem as saídas geradas, o caminho e o resultado da
+            gravação do HTML temporário de cada código de evento e o índice
+            das referências da versão.
+    """
+    leiautes = []
+    partes_eventos = {}
+    referencias = IndiceReferencias()
+
+    for leiaute in eventos:
+        escritor.gravar(
+            caminho_texto.format(f'{leiaute.codigo}.txt'), leiaute.texto)
+
+        if paginas_eventos:
+            escritor.gravar(
+                caminho_saida.format(f'{leiaute.codigo}.html'), leiaute.html)
+        else:
+            caminho = os.path.join(caminho_temporario, f'{leiaute.codigo}.html')
+            partes_eventos[leiaute.codigo] = (
+                caminho, escritor.gravar(caminho, leiaute.html))
+
+        indice_busca.adicionar_evento(leiaute.codigo, leiaute.busca)
+        grafo.registrar_ancoras('index.html', leiaute.ancoras)
+        grafo.registrar_links_pendentes('index.html', leiaute.links)
+        referencias.adicionar_leiaute(leiaute)
+        leiautes.append(leiaute.resumir())
+
+    # Os eventos são construídos na ordem em que os processos terminam.
+    referencias.ordenar()
+
+    return leiautes, partes_eventos, referencias
+
+
+def gravar_tabelas(caminho_tabelas, caminho_temporario, escritor):
+    """Gera as tabelas uma a uma, gravando o HTML de cada uma em um arquivo
+        temporário, lido novamente na montagem do tabelas.html.
+
+    Args:
+        caminho_tabelas (str): Diretório que contém os arquivos das tabelas.
+
+        caminho_temporario (str): Diretório dos arquivos temporários.
+
+        escritor (EscritorArquivos): Escritor que grava os arquivos.
+
+    Returns:
+        tuple: Índice das tabelas em HTML, caminho e resultado da gravação
+            do HTML temporário de cada tabela, lista com os números das
+            tabelas e documentos do índice de busca.
+    """
+    indice = []
+    partes = []
+    tabelas = []
+    documentos = []
+
+    for caminho_tabela in listar_tabelas(caminho_tabelas):
+        numero, linha, conteudo, documento = gerar_tabela(caminho_tabela)
+
+        caminho = os.path.join(caminho_temporario, f'tabela_{numero}.html')
+        partes.append((caminho, escritor.gravar(caminho, conteudo)))
+
+        indice.append(linha)
+        tabelas.append(numero)
+        documentos.append(documento)
+
+    return ''.join(indice), partes, tabelas, documentos
+
+
+def ler_partes_gravadas(partes):
+    """Percorre as partes de uma página, lendo do disco as partes gravadas em
+        arquivos temporários.
+
+    Cada parte gravada só é lida depois do término da sua gravação e é
+    liberada antes da leitura da seguinte. As partes geradas sob demanda são
+    percorridas durante a gravação da página.
+
+    Args:
+        partes (list): Textos, iteráveis de textos ou caminho e resultado da
+            gravação de cada arquivo temporário.
+
+    Yields:
+        str: Conteúdo de cada parte.
+    """
+    for parte in partes:
+        if isinstance(parte, str):
+            yield parte
+        elif isinstance(parte, tuple):
+            caminho, futuro = parte
+            futuro.result()
+
+            yield cinto.ler_arquivo(caminho)
+        else:
+            yield from parte
+
+
+def gerar_documentacao(caminho_leiaute, orquestrador=None):
+    """Gera a documentação HTML e texto de um diretório de leiautes.
+
+    Args:
+        caminho_leiaute (str): Diretório que contém os XSD da versão.
+
+        orquestrador (Orquestrador, optional): Orquestrador que fornece os
+            insumos compartilhados entre versões. Defaults to None.
+    """
+    if orquestrador is None:
+        orquestrador = paralelo.Orquestrador()
+
+    # As páginas são montadas como listas de partes e entregues ao escritor,
+    # que as grava em segundo plano enquanto as páginas seguintes são
+    # montadas.
+    escritor = EscritorArquivos(
+        orquestrador.threads_escrita, orquestrador.limite_memoria)
+    temporario = None
+
+    if orquestrador.limite_memoria is not None:
+        temporario = tempfile.TemporaryDirectory(prefix='gerador-doc-')
+
+    # Mesmo em caso de erro, as gravações em andamento terminam antes da
+    # remoção dos arquivos temporários.
+    try:
+        montar_documentacao(caminho_leiaute, orquestrador, escritor,
+                            None if temporario is None else temporario.name)
+    finally:
+        escritor.aguardar()
+
+        if temporario is not None:
+            temporario.cleanup()
+
+
+def montar_documentacao(caminho_leiaute, orquestrador, escritor,
+                        caminho_temporario):
+    """Monta as páginas e os arquivos da documentação de um diretório de
+        leiautes e os entrega ao escritor.
+
+    Args:
+        caminho_leiaute (str): Diretório que contém os XSD da versão.
+
+        orquestrador (Orquestrador): Orquestrador que fornece os insumos
+            compartilhados entre versões.
+
+        escritor (EscritorArquivos): Escritor que grava os arquivos.
+
+        caminho_temporario (str): Diretório dos arquivos temporários, usado
+            com o limite de memória, ou None.
+    """
+    relatorio = RelatorioTempos(caminho_leiaute)
+
+    # As versões são geradas em paralelo; as mensagens de cada uma são
+    # reunidas e exibidas de uma só vez, identificadas pelo caminho.
+    mensagens = ['Caminho: {}'.format(caminho_leiaute)]
+
+    caminho_xsd = os.path.join(caminho_leiaute, '{}')
+    caminho_ativos = os.path.join(cinto.DIRETORIO_ATIVOS, '{}')
+    caminho_doc = os.path.join(caminho_leiaute, 'doc', '{}')
+    caminho_saida = os.path.join(caminho_leiaute, 'doc', 'saida', '{}')
+    caminho_texto = os.path.join(caminho_leiaute, 'doc', 'txt', '{}')
 
     parametros = cinto.obter_arquivo(caminho_doc.format('parametros_texto_inicial')).read().split('\n')
     menu = cinto.obter_arquivo(caminho_doc.format('menu')).read()
@@ -43,58 +446,58 @@ for indice in range(1, len(sys.argv)):
         if 'DATA' in parametro:
             _, data = parametro.split(' = ')
 
-            data_atual = datetime.date.today().strftime('%B de %Y').capitalize()
+            data_atual = cinto.formatar_mes(datetime.date.today())
 
             if data != data_atual:
-                print('A data informada no parâmetro de configuração é diferente da data atual.')
+                mensagens.append('A data informada no parâmetro de configuração é diferente da data atual.')
 
         if 'DETALHES' in parametro:
             _, detalhes_publicacao = parametro.split(' = ')
 
-    inicio = cinto.obter_arquivo(caminho_ativos.format('inicio.html')).read()
-    fim = cinto.obter_arquivo(caminho_ativos.format('fim.html')).read().replace(
+    inicio = orquestrador.obter_ativo(caminho_ativos.format('inicio.html'))
+    fim = orquestrador.obter_ativo(caminho_ativos.format('fim.html')).replace(
         'MENU', menu)
 
-    regras = {}
-
-    arquivo = cinto.obter_arquivo(caminho_xsd.format('regras.txt'))
-    id = None
-
-    for linha in arquivo.readlines():
-        if id is None:
-            id = linha.rstrip()
-            regras[id] = []
-        else:
-            if linha.strip() == '':
-                id = None
-            else:
-                texto = linha.rstrip().translate(str.maketrans({
-                    '>': '&gt;',
-                    '<': '&lt;',
-                }))
-
-                for regra in set(re.findall(r'(REGRA_\w+)', texto)):
-                    texto = texto.replace(
-                        regra, Geral.LINK.format(regra, regra))
-
-                regras[id].append(texto)
-    arquivo.close()
+    grafo = GrafoLinks()
+    # O catálogo de regras é compartilhado entre as versões com o mesmo
+    # arquivo de regras.
+    regras = orquestrador.registro.obter_por_conteudo(
+        caminho_xsd.format('regras.txt'), ler_catalogo)
+    regras.registrar_links(grafo)
+    relatorio.marcar('entradas')
 
     inicio_tempo = perf_counter()
 
+    orquestrador.obter_tipos(caminho_xsd.format('tipos.xsd'))
+    relatorio.marcar('tipos')
+
     # LEIAUTES
-    leiautes = []
     identificadores = [item for item in os.listdir(
-        sys.argv[indice]) if item.startswith('evt')]
-
-    tipos_globais = {tipo.get('name'): tipo
-                    for tipo in parse(caminho_xsd.format('tipos.xsd')).getroot()}
-
-    for identificador in identificadores:
-        raiz = parse(caminho_xsd.format(identificador)).getroot()
-        leiautes.append(Leiaute(raiz, tipos_globais))
-
-    leiautes.sort(key=lambda item: item.codigo)
+        caminho_leiaute) if item.startswith('evt')]
+
+    caminhos_eventos = [
+        caminho_xsd.format(identificador) for identificador in identificadores]
+
+    if caminho_temporario is None:
+        partes_eventos = {}
+        indice_busca = IndiceBusca()
+        leiautes = orquestrador.carregar_eventos(
+            caminhos_eventos, caminho_xsd.format('tipos.xsd'), mensagens)
+        leiautes.sort(key=lambda item: item.codigo)
+        referencias = agrupar_referencias(leiautes)
+    else:
+        # Cada evento é gravado e liberado logo após a sua construção; o HTML
+        # e os documentos de busca aguardam a montagem das páginas em disco.
+        indice_busca = IndiceBuscaExterno(
+            caminho_temporario, 'index.html', orquestrador.limite_memoria)
+        leiautes, partes_eventos, referencias = gravar_eventos(
+            orquestrador.iterar_eventos(
+                caminhos_eventos, caminho_xsd.format('tipos.xsd')),
+            caminho_texto, caminho_saida, caminho_temporario, escritor, grafo,
+            indice_busca, orquestrador.paginas_eventos)
+        leiautes.sort(key=lambda item: item.codigo)
+
+    relatorio.marcar('eventos')
 
     conteudo = inicio.replace(
         'SUBTITULO', f'eSocial {versao} - Leiautes {publicacao_reduzida}').replace(
@@ -108,40 +511,64 @@ for indice in range(1, len(sys.argv)):
             .format(f'{versao_m} {publicacao}'))).replace(
         'TEXTO_2', f'<h1 class="title has-text-centered is-3">{data}</h1>')
 
-    conteudo_indice = ''
+    if caminho_temporario is None:
+        for leiaute in leiautes:
+            escritor.gravar(
+                caminho_texto.format(f'{leiaute.codigo}.txt'), leiaute.texto)
+
+    relatorio.marcar('escrita_textos')
+
+    partes = [conteudo]
+    partes.append('<h2 class="title has-text-centered is-3">Sumário</h2>\n')
+    partes.append('<ul class="sumario">\n')
+
     for leiaute in leiautes:
-        conteudo_indice += Resumo.LINHA_INDICE.format(
-            nome=leiaute.nome, codigo=leiaute.codigo, descricao=leiaute.descricao)
+        partes.append(Resumo.LINHA_INDICE.format(
+            nome=leiaute.nome, codigo=leiaute.codigo, descricao=leiaute.descricao))
+
+        grafo.registrar_link('index.html', 'index.html', leiaute.nome, 'Sumário')
 
-        with cinto.obter_arquivo(caminho_texto.format(f'{leiaute.codigo}.txt'), 'w') as f:
-            f.write(leiaute.gerar_texto())
+    partes.append('</ul>\n')
 
-    conteudo += '<h2 class="title has-text-centered is-3">Sumário</h2>\n'
-    conteudo += '<ul class="sumario">\n'
-    conteudo += conteudo_indice
-    conteudo += '</ul>\n'
+    # Com o limite de memória, os trechos com todas as regras são gerados
+    # durante a gravação, uma regra por vez.
+    if caminho_temporario is None:
+        partes.append(regras.gerar_modais())
+    else:
+        partes.append(regras.iterar_modais())
 
-    html = ''
-    for regra in regras:
-        texto = '<br>\n'.join(regras[regra])
-        html += Regra.LINHA_MODAL.format(nome=regra, texto=texto)
+    for regra in regras.regras:
+        grafo.registrar_ancora('index.html', regra)
+        grafo.registrar_link('index.html', 'regras.html', regra, regra)
 
-    html += ''.join([item.gerar_html() for item in leiautes])
+    if orquestrador.paginas_eventos:
+        partes.append('<div id="eventos">\n')
 
-    conteudo += html
-    conteudo += fim
+        for leiaute in leiautes:
+            partes.append(Resumo.PAGINA_EVENTO.format(
+                pagina=f'{leiaute.codigo}.html'))
 
-    with cinto.obter_arquivo(caminho_saida.format('index.html'), 'w') as f:
-        f.write(conteudo)
+        partes.append('</div>\n')
+        partes.append(orquestrador.obter_ativo(
+            caminho_ativos.format('carregamento_eventos.html')))
 
-    referencias_regras = {}
+        escrever_paginas_eventos(caminho_saida, leiautes, escritor)
 
+    # Com as páginas por evento, as âncoras continuam registradas no
+    # índice, que as resolve pelo mapa de âncoras.
     for leiaute in leiautes:
-        for regra in leiaute.referencias_regras:
-            if regra not in referencias_regras:
-                referencias_regras[regra] = []
+        if not orquestrador.paginas_eventos:
+            partes.append(partes_eventos.get(leiaute.codigo, leiaute.html))
+
+        grafo.registrar_ancoras('index.html', leiaute.ancoras)
+        grafo.registrar_links('index.html', leiaute.links)
+
+    partes.append(fim)
+    escritor.gravar(caminho_saida.format('index.html'), partes
+                    if caminho_temporario is None
+                    else ler_partes_gravadas(partes))
 
-            referencias_regras[regra].extend(leiaute.referencias_regras[regra])
+    relatorio.marcar('pagina_leiautes')
 
     # REGRAS
     conteudo = inicio.replace(
@@ -152,232 +579,38 @@ for indice in range(1, len(sys.argv)):
         'TEXTO_2', '<h1 class="title has-text-centered is-3">{}</h1>'.format(
             f'{versao_m} {publicacao}'))
 
-    conteudo += '_referencias_' + Regra.CABECALHO
-    conteudo_modal = ''
+    partes = [conteudo]
 
-    for regra in regras:
-        texto = '<br>\n'.join(regras[regra])
-        conteudo += Regra.LINHA.format(
-            id=regra, nome=regra, texto=texto)
-
-        texto_modal = '\n'.join([Regra.LINHA_REFERENCIA.format(
-            id=ocorrencia[0], trilha=ocorrencia[1]) for ocorrencia in referencias_regras[regra]])
-
-        conteudo_modal += Regra.LINHA_MODAL_REFERENCIA.format(
-            nome=regra, texto=texto_modal)
-
-    conteudo = conteudo.replace('_referencias_', conteudo_modal)
+    if caminho_temporario is None:
+        escrever_regras(partes, regras, referencias, grafo)
+    else:
+        registrar_regras(regras, referencias, grafo)
+        partes.append(iterar_regras(
+            regras, referencias, regras.iterar_linhas()))
 
-    conteudo += Geral.RODAPE_TABELA
-    conteudo += fim
+    partes.append(fim)
+    escritor.gravar(caminho_saida.format('regras.html'), partes
+                    if caminho_temporario is None
+                    else ler_partes_gravadas(partes))
 
-    with cinto.obter_arquivo(caminho_saida.format('regras.html'), 'w') as f:
-        f.write(conteudo)
+    relatorio.marcar('pagina_regras')
 
     # TABELAS
-    tabelas = []
-    conteudo_tabela = ''
-    conteudo_indice = ''
-
-    itens_caminho = os.path.split(sys.argv[indice])
-
-    if (itens_caminho[-1].endswith('simplificacao')):
-        caminho_tabelas = os.path.join(sys.argv[indice], 'tabelas', '{}')
+    caminho_tabelas = obter_caminho_tabelas(caminho_leiaute)
+
+    # Com o limite de memória, o HTML de cada tabela é gravado em disco
+    # assim que gerado e não é compartilhado entre as versões.
+    if caminho_temporario is None:
+        conteudo_indice, conteudo_tabela, tabelas, documentos_tabelas = \
+            orquestrador.registro.obter_por_conteudo(
+                caminho_tabelas, gerar_tabelas, orquestrador.executor)
     else:
-        caminho_tabelas = os.path.join(os.path.dirname(sys.argv[indice]), 'tabelas', '{}')
-
-
-    for tabela in sorted(os.listdir(caminho_tabelas.replace('{}', ''))):
-        texto_tabela = []
-        anexos_tabela = []
-        itens_cabecalho = []
-        linhas_cabecalho = 1
-
-        with cinto.obter_arquivo(caminho_tabelas.format(tabela)) as arquivo_tabela:
-            rowspan_linha = {}
-
-            fim_da_tabela = False
-            texto_largura_fixa = False
-            indices_texto = []
-
-            for indice_linha, linha in enumerate(arquivo_tabela):
-                if indice_linha == 2 and linha.startswith('^'):
-                    linhas_cabecalho = 2
-
-                if '__' in linha:
-                    linha = re.sub('__(.*?)__', '<i>\\1</i>', linha)
-                if '##' in linha:
-                    linha = re.sub('##(.*?)##', '<b>\\1</b>', linha)
-
-                itens_linha = []
-
-                if linha.rstrip() == '===':
-                    fim_da_tabela = True
-                    continue
-                elif fim_da_tabela:
-                    if (linha.startswith('>')):
-                        if not texto_largura_fixa:
-                            anexos_tabela.append(
-                                '<pre>{}'.format(linha.rstrip()[1:]))
-                            texto_largura_fixa = True
-                        else:
-                            anexos_tabela.append(linha.rstrip()[1:])
-                    else:
-                        if texto_largura_fixa:
-                            texto_largura_fixa = False
-                            anexos_tabela.append('</pre>')
-                        anexos_tabela.append(
-                            '<p>{}</p>'.format(linha.rstrip()))
-                    continue
-                elif indice_linha == 0:
-                    if '#' in linha:
-                        titulo, dimensoes = linha.rstrip().split('#')
-                        dimensoes = dimensoes.split(' ')
-                    else:
-                        titulo = linha.rstrip()
-                        dimensoes = None
-                    continue
-                else:
-                    extensao_colspan = 0
-
-                    for indice_item, item in enumerate(linha.rstrip().split('|')):
-                        if indice_linha == 1:
-                            rowspan_linha[indice_item] = 0
-
-                            if '>' in item:
-                                itens_linha.append('')
-                                extensao_colspan += 1
-                            else:
-                                if '<' in item:
-                                    item = item[1:]
-                                    indices_texto.append(indice_item)
-
-                                if dimensoes is not None:
-                                    dimensao = ' style="width: {}%"'.format(
-                                        dimensoes[indice_item])
-                                else:
-                                    dimensao = ''
-                                itens_linha.append(
-                                    Tabela.CELULA_CABECALHO.format(
-                                        dimensao=dimensao,
-                                        conteudo=item))
-                        else:
-                            if item.startswith('^'):
-                                itens_linha.append('')
-                                rowspan_linha[indice_item] += 1
-                            elif item.startswith('>'):
-                                itens_linha.append('')
-                                extensao_colspan += 1
-
-                                if rowspan_linha[indice_item] > 0:
-                                    indice = indice_linha \
-                                        - rowspan_linha[indice_item] - 2
-
-                                    valor = texto_tabela[indice][indice_item]
-                                    valor = valor.replace(
-                                        'rowspan=""', 'rowspan="{}"'.format(
-                                            rowspan_linha[indice_item] + 1))
-
-                                    texto_tabela[indice][indice_item] = valor
-                                    rowspan_linha[indice_item] = 0
-
-                            else:
-                                if extensao_colspan != 0:
-                                    indice = indice_item - extensao_colspan - 1
-                                    valor = itens_linha[indice].replace(
-                                        'colspan=""', 'colspan="{}"'.format(
-                                            extensao_colspan + 1))
-
-                                    itens_linha[indice] = valor
-                                    extensao_colspan = 0
-
-                                if rowspan_linha[indice_item] > 0:
-                                    indice = indice_linha \
-                                        - rowspan_linha[indice_item] - 2
-
-                                    valor = texto_tabela[indice][indice_item]
-                                    valor = valor.replace(
-                                        'rowspan=""', 'rowspan="{}"'.format(
-                                            rowspan_linha[indice_item] + 1))
-
-                                    texto_tabela[indice][indice_item] = valor
-
-                                rowspan_linha[indice_item] = 0
-
-                                classe = ''
-                                if indice_item in indices_texto:
-                                    classe = ' class="texto"'
-
-                                itens_linha.append(Tabela.CELULA.format(
-                                    classe=classe,
-                                    conteudo=item))
-
-                    if extensao_colspan > 0:
-                        item = itens_linha[indice_item - extensao_colspan]
-                        item = item.replace('colspan=""', 'colspan="{}"'.format(
-                            extensao_colspan + 1))
-                        itens_linha[indice_item - extensao_colspan] = item
-
-                    if indice_linha <= linhas_cabecalho:
-                        itens_cabecalho.append(itens_linha)
-
-                texto_tabela.append(itens_linha)
-
-            for i in range(indice_item):
-                if rowspan_linha[i] > 0:
-                    texto = texto_tabela[indice_linha - rowspan_linha[i] - 1][i]
-                    texto = texto.replace('rowspan=""', 'rowspan="{}"'.format(
-                        rowspan_linha[i] + 1))
-                    texto_tabela[indice_linha - rowspan_linha[i] - 1][i] = texto
-
-            cabecalho = Tabela.CABECALHO
-
-            if tabela[:-4] == '04':
-                cabecalho = Tabela.CABECALHO.replace(
-                    'thead', 'thead style="display: table-row-group;"', 1)
-
-            conteudo_cabecalho = []
-
-            for itens in itens_cabecalho:
-                conteudo_cabecalho.append(''.join(itens).replace(
-                    ' class="grupo"', '').replace(
-                    ' rowspan=""', '').replace(' colspan=""', ''))
-
-            linha_cabecalho = '</tr>\n<tr>\n'.join(
-                conteudo_cabecalho)
-
-            conteudo_tabela += cabecalho.format(
-                tabela[:-4], tabela[:-4], indice_item + 1, tabela[:-4], titulo, linha_cabecalho)
-
-            for indice_linha, linha in enumerate(texto_tabela[linhas_cabecalho:]):
-                if 'class="grupo"' in linha[0]:
-                    conteudo_tabela += '<tr class="grupo">\n'
-                else:
-                    conteudo_tabela += '<tr>\n'
-
-                for item in linha:
-                    if '--C3--' in item:
-                        item = item.replace(
-                            '--C3--', '').replace(
-                                '<td', '<td class="sub-cabecalho"')
-
-                    if item != '':
-                        conteudo_tabela += item.replace(
-                            ' class="grupo"', '').replace(
-                            ' rowspan=""', '').replace(' colspan=""', '')
-
-                conteudo_tabela += '</tr>\n'
-
-            conteudo_tabela += Geral.RODAPE_TABELA
+        conteudo_indice, partes_tabelas, tabelas, documentos_tabelas = \
+            gravar_tabelas(caminho_tabelas, caminho_temporario, escritor)
+    relatorio.marcar('tabelas')
 
-            if len(anexos_tabela) > 0:
-                conteudo_tabela += Tabela.ANEXO.format(
-                    ''.join([anexo + '\n' for anexo in anexos_tabela]))
-
-        conteudo_indice += Tabela.LINHA_INDICE.format(
-            numero=tabela[:-4], titulo=titulo)
-
-        tabelas.append(tabela[:-4])
+    grafo.registrar_ancoras('tabelas.html', tabelas)
+    grafo.registrar_ancoras('tabelas.html', ['t_{}'.format(tabela) for tabela in tabelas])
 
     conteudo = inicio.replace(
         'SUBTITULO',  f'eSocial {versao} - Tabelas {publicacao_reduzida}').replace(
@@ -387,31 +620,316 @@ for indice in range(1, len(sys.argv)):
         'TEXTO_2', '<h1 class="title has-text-centered is-3">{}</h1>'.format(
             f'{versao_m} {publicacao}'))
 
-    conteudo += '<h2 class="title has-text-centered is-3">Sumário</h2>\n'
-    conteudo += '<ul class="sumario">\n'
-    conteudo += conteudo_indice
-    conteudo += '</ul>\n'
-    conteudo += conteudo_tabela
-    conteudo += fim
+    partes = [
+        conteudo,
+        '<h2 class="title has-text-centered is-3">Sumário</h2>\n',
+        '<ul class="sumario">\n',
+        conteudo_indice,
+        '</ul>\n',
+    ]
+
+    if caminho_temporario is None:
+        escrever_referencias_tabelas(partes, tabelas, referencias, grafo)
+        partes.append(conteudo_tabela)
+    else:
+        registrar_referencias_tabelas(tabelas, referencias, grafo)
+        partes.append(iterar_referencias_tabelas(tabelas, referencias))
+        partes.extend(partes_tabelas)
 
-    with cinto.obter_arquivo(caminho_saida.format('tabelas.html'), 'w') as f:
-        f.write(conteudo)
+    partes.append(fim)
+    escritor.gravar(caminho_saida.format('tabelas.html'), partes
+                    if caminho_temporario is None
+                    else ler_partes_gravadas(partes))
 
-    # VERIFICAÇÃO DE LINKS
+    relatorio.marcar('pagina_tabelas')
+
+    # BUSCA
+    # Com o limite de memória, os documentos dos eventos já estão no índice.
+    if caminho_temporario is None:
+        for leiaute in leiautes:
+            indice_busca.adicionar_documentos('index.html', leiaute.busca)
 
-    links = []
-    [links.append(item)
-        for item in re.findall(r'"\#(\S+)"', html) if item not in links]
+    for regra, linhas in regras.regras.items():
+        indice_busca.adicionar(
+            'regras.html', regra, regra, extrair_termos([regra] + linhas))
 
-    ids = []
-    [ids.append(item)
-        for item in re.findall(r'id="(\S+)"', html) if item not in ids]
-    ids = ids + tabelas
+    indice_busca.adicionar_documentos('tabelas.html', documentos_tabelas)
+    escritor.gravar(
+        caminho_saida.format('busca.json'), indice_busca.serializar())
 
-    ausentes = [link for link in links if link not in ids]
+    relatorio.marcar('busca')
+
+    # REFERÊNCIAS
+    escritor.gravar(caminho_saida.format('referencias.json'),
+                    referencias.serializar() if caminho_temporario is None
+                    else referencias.serializar_partes())
+
+    relatorio.marcar('referencias')
+
+    # VERIFICAÇÃO DE LINKS
+    ausentes = grafo.verificar()
 
     if ausentes:
-        print('Links quebrados:')
-        [print(link) for link in ausentes]
+        mensagens.append('Links quebrados:')
+        mensagens.extend([
+            '{} -> {}#{} (origem: {})'.format(*ausente)
+            for ausente in sorted(ausentes)])
+
+    invalidas = sorted(set().union(
+        *[leiaute.referencias_invalidas for leiaute in leiautes]))
+
+    if invalidas:
+        mensagens.append('Referências a itens inexistentes:')
+        mensagens.extend([
+            '{} (origem: {})'.format(*invalida) for invalida in invalidas])
+
+    relatorio.marcar('links')
+
+    # ESCRITA
+    falhas = escritor.aguardar()
+    relatorio.marcar('escrita')
+
+    if falhas:
+        mensagens.append('Falhas na gravação:')
+        mensagens.extend([
+            '{}: {}'.format(caminho, erro) for caminho, erro in falhas])
+        print('\n'.join(mensagens), '\n')
+
+        raise Exception('Falha na gravação de {} arquivo(s) de {}'.format(
+            len(falhas), caminho_leiaute))
+
+    if orquestrador.relatorio_tempos:
+        relatorio.registrar_eventos(leiautes)
+        relatorio.gravar(caminho_doc.format('relatorio_tempos.json'))
+
+    mensagens.append('Tempo de execução: {} ({})'.format(
+        perf_counter() - inicio_tempo, caminho_leiaute))
+    print('\n'.join(mensagens), '\n')
+
+
+class Construtor:
+    """Representa a geração da documentação de várias versões em um mesmo
+        processo.
+
+    O construtor mantém o orquestrador entre as chamadas: os tipos.xsd, os
+    ativos, as regras e as tabelas já lidos são reutilizados pelas gerações
+    seguintes enquanto o seu conteúdo não mudar, e o pool de processos
+    permanece ativo até o encerramento. Com um CacheMemoria, os eventos já
+    renderizados também são mantidos. Ao fim de cada geração, apenas os
+    insumos e os eventos usados por ela continuam em memória; limpar libera
+    também esses.
+    """
 
-    print('Tempo de execução: ', perf_counter() - inicio_tempo, '\n')
+    def __init__(self, processos=1, cache=None, relatorio_tempos=False,
+                 paginas_eventos=False, threads_escrita=4, backend_xml=None,
+                 limite_memoria=None):
+        """Inicia uma nova instância da classe Construtor.
+
+        Args:
+            processos (int, optional): Quantidade de processos usados na
+                construção dos leiautes. Defaults to 1.
+
+            cache (CacheLeiautes | CacheMemoria, optional): Cache dos
+                leiautes já construídos. Defaults to None.
+
+            relatorio_tempos (bool, optional): Indica se o relatório de
+                tempos de cada versão deve ser gravado. Defaults to False.
+
+            paginas_eventos (bool, optional): Indica se cada evento deve ser
+                gravado em uma página própria. Defaults to False.
+
+            threads_escrita (int, optional): Quantidade de threads que gravam
+                os arquivos de cada versão. Defaults to 4.
+
+            backend_xml (str, optional): Biblioteca usada na análise dos XSD,
+                'lxml' ou 'etree', apenas pelas gerações deste construtor.
+                Defaults to None, que usa o backend padrão do processo.
+
+            limite_memoria (int, optional): Tamanho máximo aproximado, em
+                bytes, do conteúdo gerado que aguarda gravação e dos termos
+                de busca mantidos em memória. Quando informado, os eventos
+                são gravados e descartados um a um e um CacheMemoria não é
+                usado. Defaults to None.
+
+        Raises:
+            Exception: Backend desconhecido ou lxml não instalado.
+        """
+        if backend_xml is not None:
+            analise_xml.validar_backend(backend_xml)
+
+        # O cache em memória manteria todos os eventos renderizados, o que
+        # anularia o limite; o cache em disco continua disponível.
+        if limite_memoria is not None and isinstance(cache, CacheMemoria):
+            cache = None
+
+        self.orquestrador = paralelo.Orquestrador(
+            processos, cache, relatorio_tempos, paginas_eventos,
+            threads_escrita, limite_memoria, backend_xml)
+
+    def construir(self, caminhos):
+        """Gera a documentação de uma ou mais versões.
+
+        Args:
+            caminhos (str | list): Diretório de uma versão ou lista de
+                diretórios.
+
+        Raises:
+            Exception: Falha na geração de alguma das versões.
+        """
+        if isinstance(caminhos, str):
+            caminhos = [caminhos]
+
+        self.orquestrador.iniciar()
+        self.orquestrador.executar(list(caminhos), gerar_documentacao)
+
+    def limpar(self):
+        """Descarta os insumos e os eventos renderizados mantidos em memória
+            entre as gerações. O cache em disco não é alterado.
+        """
+        self.orquestrador.registro.limpar()
+
+        if isinstance(self.orquestrador.cache, CacheMemoria):
+            self.orquestrador.cache.limpar()
+
+    def encerrar(self):
+        """Encerra o pool de processos do construtor.
+        """
+        self.orquestrador.encerrar()
+
+
+def construir(caminhos, opcoes=None):
+    """Gera a documentação de uma ou mais versões.
+
+    Para várias gerações no mesmo processo, um Construtor reutiliza os
+    insumos já lidos.
+
+    Args:
+        caminhos (str | list): Diretório de uma versão ou lista de
+            diretórios.
+
+        opcoes (dict, optional): Argumentos nomeados do Construtor.
+            Defaults to None.
+    """
+    construtor = Construtor(**(opcoes or {}))
+
+    try:
+        construtor.construir(caminhos)
+    finally:
+        construtor.encerrar()
+
+
+def main():
+    """Ponto de entrada da linha de comando.
+    """
+    analisador = argparse.ArgumentParser(
+        description='Gera a documentação dos leiautes do eSocial.')
+    analisador.add_argument(
+        'caminhos', nargs='*', metavar='CAMINHOS_LEIAUTES',
+        help='Diretórios que contêm os XSD de cada versão.')
+    analisador.add_argument(
+        '-j', '--jobs', type=int, default=1, metavar='N',
+        help='Quantidade de processos usados na construção dos leiautes.')
+    analisador.add_argument(
+        '--cache', metavar='DIRETORIO',
+        help='Diretório do cache dos leiautes já construídos.')
+    analisador.add_argument(
+        '--limite-cache', type=int, default=200, metavar='MB',
+        help='Tamanho máximo do cache em megabytes.')
+    analisador.add_argument(
+        '--backend-xml', choices=analise_xml.BACKENDS,
+        help='Biblioteca usada na análise dos XSD. Por padrão, lxml quando '
+             'instalado e, em caso contrário, xml.etree.ElementTree.')
+    analisador.add_argument(
+        '--relatorio-tempos', action='store_true',
+        help='Grava em doc/relatorio_tempos.json de cada versão os tempos de '
+             'cada etapa e de cada evento.')
+    analisador.add_argument(
+        '--limpar-cache', action='store_true',
+        help='Remove todas as entradas do cache antes da geração.')
+    analisador.add_argument(
+        '--paginas-eventos', action='store_true',
+        help='Grava cada evento em uma página própria (S-XXXX.html), '
+             'carregada sob demanda pelo index.html.')
+    analisador.add_argument(
+        '--threads-escrita', type=int, default=4, metavar='N',
+        help='Quantidade de threads que gravam os arquivos gerados de cada '
+             'versão, em paralelo à montagem das páginas.')
+    analisador.add_argument(
+        '--limite-memoria', type=int, metavar='MB',
+        help='Constrói, grava e descarta os eventos um a um, mantendo apenas '
+             'os dados do sumário, das referências e dos links, e limita o '
+             'conteúdo que aguarda gravação e os termos de busca em memória '
+             'ao tamanho informado em megabytes.')
+    analisador.add_argument(
+        '--observar', '--watch', action='store_true',
+        help='Após a geração, observa os arquivos de entrada e gera '
+             'novamente as versões alteradas. Sem --cache e sem '
+             '--limite-memoria, os eventos já renderizados são mantidos em '
+             'memória.')
+    analisador.add_argument(
+        '--intervalo', type=float, default=0.25, metavar='SEGUNDOS',
+        help='Intervalo entre as consultas aos arquivos observados.')
+    argumentos = analisador.parse_args()
+
+    if not argumentos.caminhos and not argumentos.limpar_cache:
+        analisador.error('informe ao menos um caminho de leiautes')
+
+    if argumentos.jobs < 1:
+        analisador.error('--jobs deve ser maior que zero')
+
+    if argumentos.threads_escrita < 1:
+        analisador.error('--threads-escrita deve ser maior que zero')
+
+    if argumentos.limite_memoria is not None and argumentos.limite_memoria < 1:
+        analisador.error('--limite-memoria deve ser maior que zero')
+
+    cache = None
+
+    if argumentos.cache is not None:
+        cache = CacheLeiautes(
+            argumentos.cache, argumentos.limite_cache * 1024 * 1024)
+    elif argumentos.limpar_cache:
+        analisador.error('--limpar-cache exige --cache')
+
+    if argumentos.limpar_cache:
+        print('Entradas removidas do cache: ', cache.limpar())
+
+    if argumentos.observar:
+        if not argumentos.caminhos:
+            analisador.error('--observar exige ao menos um caminho de leiautes')
+
+        if cache is None and argumentos.limite_memoria is None:
+            cache = CacheMemoria()
+
+    limite_memoria = None
+
+    if argumentos.limite_memoria is not None:
+        limite_memoria = argumentos.limite_memoria * 1024 * 1024
+
+    if argumentos.caminhos:
+        construtor = Construtor(
+            argumentos.jobs, cache, argumentos.relatorio_tempos,
+            argumentos.paginas_eventos, argumentos.threads_escrita,
+            argumentos.backend_xml, limite_memoria)
+
+        # O estado inicial é capturado antes da geração, para que as
+        # alterações feitas durante a geração também sejam percebidas.
+        if argumentos.observar:
+            observador = ObservadorVersoes(
+                argumentos.caminhos, obter_arquivos_observados,
+                argumentos.intervalo)
+
+        try:
+            construtor.construir(argumentos.caminhos)
+
+            if argumentos.observar:
+                try:
+                    observador.observar(construtor.construir)
+                except KeyboardInterrupt:
+                    print('Observação encerrada.')
+        finally:
+            construtor.encerrar()
+
+
+if __name__ == '__main__':
+    main()